@@ -0,0 +1,115 @@
+# Third-party libraries
+import numpy as np
+import pandas as pd
+
+# Local modules
+from cache import get_shared_cache
+from gamelogs import SEASON, get_game_log_store
+from metrics import timed
+from store import GAME_LOG_STATS
+
+# Rolling windows in days ("season" = every game so far)
+WINDOWS = (7, 14, 30, "season")
+
+# Shooting percentages are made / attempted over the window, never an average of per-game percentages
+PCT_STATS = {"FG_PCT": ("FGM", "FGA"), "FG3_PCT": ("FG3M", "FG3A"), "FT_PCT": ("FTM", "FTA")}
+COUNT_STATS = [col for col in GAME_LOG_STATS if col not in PCT_STATS]
+
+
+@timed("aggregates.compute_windows")
+def compute_window_aggregates(game_logs, as_of=None, windows=WINDOWS):
+    """
+    Totals and per-game averages for every player over every window, in one
+    vectorized pass: cumulative sums over the (player, date)-sorted game log,
+    then each window is a difference of two cumsum rows.
+
+    Returns a DataFrame indexed by (window, mode, PLAYER_ID) with mode "Total"
+    or "Average" and the same columns `get_player_stats` used to produce: GP,
+    the count stats, and (for averages) FG_PCT/FG3_PCT/FT_PCT.
+    """
+    as_of = pd.Timestamp.today() if as_of is None else pd.Timestamp(as_of)
+    game_logs = game_logs.sort_values(["PLAYER_ID", "GAME_DATE"], kind="stable")
+
+    player_ids, starts, codes = np.unique(game_logs["PLAYER_ID"].to_numpy(), return_index=True, return_inverse=True)
+    n_games, n_players = len(game_logs), len(player_ids)
+    ends = np.append(starts[1:], n_games)
+
+    values = game_logs[COUNT_STATS].to_numpy(dtype=np.float64)
+    cumulative = np.vstack([np.zeros((1, len(COUNT_STATS))), np.cumsum(values, axis=0)])
+
+    # (player, day) as one sorted integer key so every window start is a single searchsorted
+    days = game_logs["GAME_DATE"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    span = int(days.max() - days.min()) + 2 if n_games else 1
+    keys = codes.astype(np.int64) * span + (days - (days.min() if n_games else 0))
+    today = np.datetime64(as_of.date(), "D").astype(np.int64)
+
+    frames = []
+    for window in windows:
+        if window == "season":
+            lo = starts
+        else:
+            # Same cut as "the last N days, today included"
+            first_day = today - window + 1 - (days.min() if n_games else 0)
+            first_day = np.clip(first_day, 0, span - 1)
+            lo = np.searchsorted(keys, np.arange(n_players, dtype=np.int64) * span + first_day, side="left")
+            lo = np.maximum(lo, starts)
+        totals = cumulative[ends] - cumulative[lo]
+        games = (ends - lo).astype(np.float64)
+
+        total = pd.DataFrame(totals, columns=COUNT_STATS)
+        total.insert(0, "GP", games)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average = pd.DataFrame(totals / games[:, None], columns=COUNT_STATS)
+            for pct, (made, attempted) in PCT_STATS.items():
+                ratio = total[made].to_numpy() / total[attempted].to_numpy()
+                average[pct] = np.where(total[attempted].to_numpy() > 0, ratio, 0.0)
+        average.insert(0, "GP", games)
+
+        for mode, frame in (("Total", total), ("Average", average)):
+            frame.index = pd.MultiIndex.from_arrays(
+                [[window] * n_players, [mode] * n_players, player_ids], names=["window", "mode", "PLAYER_ID"])
+            frames.append(frame)
+
+    return pd.concat(frames)[["GP"] + GAME_LOG_STATS]
+
+
+def get_window_aggregates(season=SEASON, store=None):
+    """
+    Window aggregates for every stored player, shared across sessions and only
+    recomputed when the game log store changes (or the day rolls over).
+    """
+    store = store or get_game_log_store()
+    today = pd.Timestamp.today().normalize()
+    return get_shared_cache().get_versioned(
+        "player_windows", season, (store.revision, today),
+        lambda: compute_window_aggregates(store.load(season), as_of=today))
+
+
+def get_archived_window_aggregates(season, player_ids):
+    """
+    Window aggregates for some players in a past season, from the archive.
+    Windows count back from the season's last game instead of today.
+    """
+    from archive import get_archive
+
+    game_logs = get_archive().player_games(season, player_ids)
+    as_of = game_logs["GAME_DATE"].max() if not game_logs.empty else None
+    return compute_window_aggregates(game_logs, as_of=as_of)
+
+
+def lookup_player_stats(aggregates, player_id, period, mode):
+    """
+    Returns one player's stats for a period/mode pair from `period_options`,
+    rounded like the comparison table shows them, or None without games.
+    """
+    try:
+        stats = aggregates.loc[(period, mode, player_id)].copy()
+    except KeyError:
+        return None
+    if mode == "Total":
+        stats = stats.drop(list(PCT_STATS)).round(1)
+    else:
+        for col in stats.index:
+            stats[col] = round(stats[col], 3 if col in PCT_STATS else 1)
+    return stats.drop("GP")
@@ -0,0 +1,157 @@
+# Standard library
+import threading
+
+# Third-party libraries
+import numpy as np
+import pandas as pd
+
+# Local modules
+from logic import stat_categories
+from metrics import timed
+
+# Categories where the lower number wins
+LOWER_IS_BETTER = {"TO"}
+
+
+def _week_arrays(scoreboards):
+    """
+    Lays unranked parse_scoreboard rows out as arrays over (week, team):
+    values is weeks x teams x categories (NaN where a team has no row) with
+    lower-is-better categories negated, and opponent holds each team's actual
+    opponent index that week (-1 if none). Rows 2k and 2k+1 of a week played
+    each other.
+    """
+    weeks = np.sort(scoreboards["week"].unique())
+    team_keys = np.sort(scoreboards["team_key"].unique())
+    week_idx = np.searchsorted(weeks, scoreboards["week"].to_numpy())
+    team_idx = np.searchsorted(team_keys, scoreboards["team_key"].to_numpy())
+
+    signs = np.array([-1.0 if cat in LOWER_IS_BETTER else 1.0 for cat in stat_categories])
+    values = np.full((len(weeks), len(team_keys), len(stat_categories)), np.nan)
+    values[week_idx, team_idx] = scoreboards[stat_categories].to_numpy(dtype=np.float64) * signs
+
+    # Partner row within the week: 0<->1, 2<->3, ...
+    position = scoreboards.groupby("week", sort=False).cumcount().to_numpy()
+    first_row = np.arange(len(scoreboards)) - position
+    partner = first_row + (position ^ 1)
+    has_partner = partner < len(scoreboards)
+    partner = np.where(has_partner, partner, 0)
+    has_partner &= week_idx[partner] == week_idx
+
+    opponent = np.full((len(weeks), len(team_keys)), -1)
+    opponent[week_idx, team_idx] = np.where(has_partner, team_idx[partner], -1)
+
+    names = pd.Series(scoreboards["name"].to_numpy(), index=scoreboards["team_key"].to_numpy())
+    names = names[~names.index.duplicated(keep="last")].reindex(team_keys).to_numpy()
+    return weeks, team_keys, names, values, opponent
+
+
+def compute_all_play(scoreboards):
+    """
+    Every team's 9-cat result against every other team, for every week, in one
+    broadcast: (weeks x teams x 1 x cats) vs (weeks x 1 x teams x cats).
+
+    Returns one row per (week, team) with the team's all-play record that week
+    (matchups won/lost/tied against each of the other teams), its all-play win
+    expectation, the actual head-to-head result, and luck (actual minus
+    expected, where a win counts 1 and a tie 0.5).
+    """
+    if scoreboards.empty:
+        return pd.DataFrame(columns=["week", "team_key", "name", "AP_W", "AP_L", "AP_T",
+                                     "Expected", "Actual", "Luck"])
+    weeks, team_keys, names, values, opponent = _week_arrays(scoreboards)
+    n_weeks, n_teams, _ = values.shape
+
+    # weeks x teams x teams x cats: +1 row team wins the category, -1 loses, 0 tie (NaN compares as neither)
+    diff = values[:, :, None, :] - values[:, None, :, :]
+    cats_won = (diff > 0).sum(axis=-1)
+    cats_lost = (diff < 0).sum(axis=-1)
+    result = np.sign(cats_won - cats_lost)  # weeks x teams x teams
+
+    # Only teams that played that week, and never against themselves
+    present = ~np.isnan(values).all(axis=-1)
+    valid = present[:, :, None] & present[:, None, :] & ~np.eye(n_teams, dtype=bool)
+    wins = ((result > 0) & valid).sum(axis=-1)
+    losses = ((result < 0) & valid).sum(axis=-1)
+    ties = ((result == 0) & valid).sum(axis=-1)
+    opponents = valid.sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = np.where(opponents > 0, (wins + 0.5 * ties) / opponents, np.nan)
+
+    # The actual matchup is one cell of the same matrix
+    week_grid, team_grid = np.indices((n_weeks, n_teams))
+    actual_result = result[week_grid, team_grid, np.maximum(opponent, 0)]
+    actual = np.where(opponent >= 0, (actual_result + 1) / 2, np.nan)
+
+    df = pd.DataFrame({
+        "week": np.repeat(weeks, n_teams),
+        "team_key": np.tile(team_keys, n_weeks),
+        "name": np.tile(names, n_weeks),
+        "AP_W": wins.ravel(),
+        "AP_L": losses.ravel(),
+        "AP_T": ties.ravel(),
+        "Expected": expected.ravel(),
+        "Actual": actual.ravel(),
+    })
+    df["Luck"] = df["Actual"] - df["Expected"]
+    return df[present.ravel()].reset_index(drop=True)
+
+
+def all_play_standings(all_play, through_week=None):
+    """
+    Season totals from compute_all_play: all-play record and win %, actual and
+    expected wins, and luck, summed over weeks up to `through_week`.
+    """
+    if through_week is not None:
+        all_play = all_play[all_play["week"] <= through_week]
+    totals = all_play.groupby("team_key", sort=False).agg(
+        Team=("name", "last"), W=("AP_W", "sum"), L=("AP_L", "sum"), T=("AP_T", "sum"),
+        Expected=("Expected", "sum"), Actual=("Actual", "sum"))
+
+    played = totals["W"] + totals["L"] + totals["T"]
+    standings = pd.DataFrame({
+        "Team": totals["Team"],
+        "All-Play Record": totals["W"].astype(str) + "-" + totals["L"].astype(str) + "-" + totals["T"].astype(str),
+        "All-Play %": ((totals["W"] + 0.5 * totals["T"]) / played.where(played > 0)).round(3),
+        "Actual Wins": totals["Actual"].round(1),
+        "Expected Wins": totals["Expected"].round(2),
+        "Luck": (totals["Actual"] - totals["Expected"]).round(2),
+    })
+    return standings.sort_values("All-Play %", ascending=False, ignore_index=True)
+
+
+class AllPlayTracker:
+    """
+    Keeps compute_all_play results week by week and only recomputes the weeks
+    whose stats changed since the last update, so a live poll redoes one week
+    instead of the whole season.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._weeks = {}  # week -> (fingerprint, all-play rows)
+
+    @timed("allplay.update")
+    def update(self, scoreboards):
+        """Returns all-play rows for every week in `scoreboards` (same as compute_all_play)."""
+        columns = ["team_key"] + stat_categories
+        row_hashes = pd.util.hash_pandas_object(scoreboards[columns], index=False).to_numpy()
+        fingerprints = pd.Series(row_hashes).groupby(scoreboards["week"].to_numpy()).sum().to_dict()
+
+        with self._lock:
+            changed = [week for week, fingerprint in fingerprints.items()
+                       if self._weeks.get(week, (None,))[0] != fingerprint]
+            if changed:
+                # One broadcast over just the changed weeks
+                fresh = compute_all_play(scoreboards[scoreboards["week"].isin(changed)])
+                for week, rows in fresh.groupby("week", sort=False):
+                    self._weeks[week] = (fingerprints[week], rows)
+            for week in list(self._weeks):
+                if week not in fingerprints:
+                    del self._weeks[week]
+            frames = [self._weeks[week][1] for week in sorted(self._weeks)]
+
+        if not frames:
+            return compute_all_play(scoreboards)
+        return pd.concat(frames, ignore_index=True)
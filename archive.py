@@ -0,0 +1,371 @@
+"""
+Append-only, multi-season archive of team-weeks and player-games as Parquet.
+
+Two datasets under ARCHIVE_DIR, each partitioned by season
+(`team_weeks/season=2024-25/part-*.parquet`). Rows are only ever added: every
+append writes a new file, and `compact` merges a partition into one sorted
+file without changing its rows. Columns use compact types (dictionary-encoded
+names and keys, small ints for weeks and ranks, float32 stats), and files are
+memory-mapped on read. Queries read only the columns they ask for, and skip
+partitions and row groups their filters rule out, so memory use doesn't grow
+with the amount of history.
+
+    python archive.py sync                 # archive the stored game logs of the current season
+    python archive.py backfill 2022-23     # download a past season's game logs and archive them
+    python archive.py compact              # merge each partition's appended files
+"""
+# Standard library
+import os
+import sys
+import threading
+import time
+import uuid
+
+# Third-party libraries
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs
+import pyarrow.parquet as pq
+
+# Local modules
+from cache import get_shared_cache
+from gamelogs import SEASON, get_game_log_store, season_label
+from logic import get_week_store, rank_weekly_stats, stat_categories
+from metrics import timed
+from store import ARCHIVE_DIR, GAME_LOG_STATS, archived_seasons
+
+# Rows per Parquet row group: small enough that a filter on a sort key skips most of a file
+ROW_GROUP_SIZE = 16_384
+
+_names = pa.dictionary(pa.int32(), pa.string())
+
+TEAM_WEEK_SCHEMA = pa.schema(
+    [("league_key", _names), ("team_key", _names), ("name", _names), ("week", pa.int8()),
+     ("FGM", pa.int16()), ("FGA", pa.int16()), ("FTM", pa.int16()), ("FTA", pa.int16())]
+    + [(cat, pa.float32()) for cat in stat_categories]
+    # Category ranks are averaged on ties (4.5), which float16 holds exactly
+    + [(f"{cat}_Rank", pa.float16()) for cat in stat_categories]
+    + [("Aggregate Rank", pa.float32()), ("Adjusted_Rank", pa.int8()), ("completed_games", pa.int16())]
+)
+
+PLAYER_GAME_SCHEMA = pa.schema(
+    [("PLAYER_ID", pa.int32()), ("GAME_ID", _names), ("GAME_DATE", pa.date32()),
+     ("MATCHUP", _names), ("WL", _names)]
+    + [(col, pa.float32()) for col in GAME_LOG_STATS]
+)
+
+# Dataset name -> (schema, sort order inside a file)
+DATASETS = {
+    "team_weeks": (TEAM_WEEK_SCHEMA, [("league_key", "ascending"), ("week", "ascending"), ("team_key", "ascending")]),
+    "player_games": (PLAYER_GAME_SCHEMA, [("PLAYER_ID", "ascending"), ("GAME_DATE", "ascending")]),
+}
+
+_SEASON_PARTITIONING = ds.partitioning(pa.schema([("season", pa.string())]), flavor="hive")
+
+
+def _sorted(table, sort_keys):
+    # Arrow can't sort on dictionary columns directly, so sort on their decoded values
+    keys = pa.table({name: table[name].cast(pa.string()) if pa.types.is_dictionary(table[name].type) else table[name]
+                     for name, _ in sort_keys})
+    return table.take(pc.sort_indices(keys, sort_keys=sort_keys))
+
+
+def _to_pandas(table):
+    # float16 is a storage type only; pandas gets float32
+    columns = [column.cast(pa.float32()) if pa.types.is_float16(column.type) else column
+               for column in table.columns]
+    return pa.table(columns, names=table.column_names).to_pandas()
+
+
+class SeasonArchive:
+    """The archive under `root`; see the module docstring."""
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self._fs = pyarrow.fs.LocalFileSystem(use_mmap=True)
+        self._lock = threading.Lock()
+        self._archived_weeks = {}  # league key -> weeks already in team_weeks
+        # Bumped on every write, so summaries cached from the archive know to recompute
+        self.revision = 0
+
+    # --------------- Writing ---------------
+
+    def append(self, name, season, df):
+        """Writes `df` as a new file in one season's partition. Returns rows written."""
+        if df.empty:
+            return 0
+        schema, sort_keys = DATASETS[name]
+        table = _sorted(pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False), sort_keys)
+        with self._lock:
+            self._write(name, season, table, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+        return table.num_rows
+
+    def _write(self, name, season, table, filename):
+        directory = os.path.join(self.root, name, f"season={season}")
+        os.makedirs(directory, exist_ok=True)
+        # Dot-prefixed files are invisible to readers until the rename
+        tmp_path = os.path.join(directory, f".{filename}.tmp")
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, compression="zstd")
+        os.replace(tmp_path, os.path.join(directory, filename))
+        self.revision += 1
+
+    def compact(self, name, season):
+        """Merges one partition's files into a single sorted file (same rows)."""
+        self._rewrite(name, season, min_parts=2)
+
+    def replace(self, name, season, drop, df):
+        """
+        Rewrites one partition without the rows matching `drop` (a
+        pyarrow.compute expression) and with `df`'s rows added, e.g. to swap
+        in a corrected week. Returns rows written from `df`.
+        """
+        schema, sort_keys = DATASETS[name]
+        added = None
+        if not df.empty:
+            added = _sorted(pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False), sort_keys)
+        self._rewrite(name, season, drop=drop, added=added)
+        return added.num_rows if added is not None else 0
+
+    def _rewrite(self, name, season, drop=None, added=None, min_parts=0):
+        schema, sort_keys = DATASETS[name]
+        directory = os.path.join(self.root, name, f"season={season}")
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            parts = sorted(f for f in os.listdir(directory) if f.endswith(".parquet") and not f.startswith("."))
+            if len(parts) < min_parts:
+                return
+            table = ds.dataset([os.path.join(directory, part) for part in parts], schema=schema,
+                               format="parquet", filesystem=self._fs).to_table()
+            if drop is not None:
+                table = table.filter(~drop)
+            if added is not None:
+                table = pa.concat_tables([table, added])
+            # One dictionary per column for the whole file
+            table = _sorted(table.unify_dictionaries().combine_chunks(), sort_keys)
+            self._write(name, season, table, f"part-{time.time_ns()}-compacted.parquet")
+            for part in parts:
+                os.remove(os.path.join(directory, part))
+
+    # --------------- Reading ---------------
+
+    def seasons(self, name):
+        """Seasons with data in a dataset, newest first."""
+        return archived_seasons(name, self.root)
+
+    def scan(self, name, columns=None, filter=None):
+        """
+        Reads `columns` (default: all, plus "season") of the rows matching
+        `filter`, a pyarrow.compute expression, as an Arrow table.
+        """
+        schema, _ = DATASETS[name]
+        full_schema = schema.append(pa.field("season", pa.string()))
+        columns = columns or full_schema.names
+        directory = os.path.join(self.root, name)
+        if not self.seasons(name):
+            return full_schema.empty_table().select(columns)
+        dataset = ds.dataset(directory, schema=full_schema, format="parquet",
+                             partitioning=_SEASON_PARTITIONING, filesystem=self._fs)
+        return dataset.to_table(columns=columns, filter=filter)
+
+    @timed("archive.team_weeks")
+    def team_weeks(self, columns=None, league_key=None, season=None, team_name=None):
+        """Team-week rows, optionally for one league, season and/or team name."""
+        filters = [ds.field(col) == value for col, value in
+                   (("league_key", league_key), ("season", season), ("name", team_name)) if value is not None]
+        return _to_pandas(self.scan("team_weeks", columns, _all(filters)))
+
+    def team_history(self, team_name, columns=None):
+        """Every archived week of one team, across leagues and seasons, in order."""
+        columns = columns or ["season", "league_key", "week", "Adjusted_Rank"] + stat_categories
+        df = self.team_weeks(columns, team_name=team_name)
+        return df.sort_values(["season", "week"], ignore_index=True)
+
+    @timed("archive.season_summary")
+    def season_summary(self, league_key=None, team_names=None):
+        """
+        Season-over-season view: per season and team, weeks archived, the
+        average of each category and the average weekly Adjusted_Rank.
+        Optionally for one league key and/or some team names (a renewed
+        league gets a new key every season, but teams tend to keep names).
+        """
+        filters = []
+        if league_key is not None:
+            filters.append(ds.field("league_key") == league_key)
+        if team_names is not None:
+            filters.append(ds.field("name").isin(list(team_names)))
+        table = self.scan("team_weeks", ["season", "name", "Adjusted_Rank"] + stat_categories, _all(filters))
+        if table.num_rows == 0:
+            return pd.DataFrame(columns=["season", "Team", "Weeks", "Avg Rank"] + stat_categories)
+        table = table.set_column(table.schema.get_field_index("name"), "name", table["name"].cast(pa.string()))
+        summary = table.group_by(["season", "name"]).aggregate(
+            [("Adjusted_Rank", "count"), ("Adjusted_Rank", "mean")]
+            + [(cat, "mean") for cat in stat_categories])
+        df = _to_pandas(summary).rename(columns={"name": "Team", "Adjusted_Rank_count": "Weeks",
+                                                 "Adjusted_Rank_mean": "Avg Rank"})
+        df = df.rename(columns={f"{cat}_mean": cat for cat in stat_categories})
+        return df.sort_values(["season", "Avg Rank"], ascending=[False, True], ignore_index=True)
+
+    @timed("archive.player_games")
+    def player_games(self, season, player_ids=None, columns=None):
+        """
+        One season's games, in GameLogStore.load's layout (PLAYER_ID,
+        GAME_DATE as datetime, the GAME_LOG_STATS columns), sorted by player
+        and date, so compute_window_aggregates can run on it.
+        """
+        filter = ds.field("season") == season
+        if player_ids is not None:
+            filter &= ds.field("PLAYER_ID").isin([int(player_id) for player_id in player_ids])
+        df = _to_pandas(self.scan("player_games", columns or PLAYER_GAME_SCHEMA.names, filter))
+        if "GAME_DATE" in df:
+            df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])
+        return df.sort_values([c for c in ("PLAYER_ID", "GAME_DATE") if c in df], ignore_index=True)
+
+    @timed("archive.player_seasons")
+    def player_seasons(self, player_ids, columns=None):
+        """Season-over-season per-game averages (and games played) for `player_ids`."""
+        columns = columns or ["PTS", "REB", "AST", "STL", "BLK", "TOV", "FG3M", "FGM", "FGA", "FTM", "FTA"]
+        filter = ds.field("PLAYER_ID").isin([int(player_id) for player_id in player_ids])
+        table = self.scan("player_games", ["season", "PLAYER_ID"] + columns, filter)
+        summary = table.group_by(["PLAYER_ID", "season"]).aggregate(
+            [(columns[0], "count")] + [(col, "mean") for col in columns])
+        df = _to_pandas(summary).rename(columns={f"{columns[0]}_count": "GP"})
+        df = df.rename(columns={f"{col}_mean": col for col in columns})
+        return df.sort_values(["PLAYER_ID", "season"], ignore_index=True)
+
+    # --------------- Syncing from the local stores ---------------
+
+    def archived_weeks(self, league_key):
+        """Weeks of a league already in team_weeks (read once, then kept up to date in memory)."""
+        with self._lock:
+            weeks = self._archived_weeks.get(league_key)
+        if weeks is None:
+            table = self.scan("team_weeks", ["week"], ds.field("league_key") == league_key)
+            weeks = set(pc.unique(table["week"]).to_pylist())
+            with self._lock:
+                self._archived_weeks[league_key] = weeks
+        return weeks
+
+
+def _all(filters):
+    combined = None
+    for expression in filters:
+        combined = expression if combined is None else combined & expression
+    return combined
+
+
+def _split_made_attempted(values):
+    # "FGM/A" values look like "123/250"; "-/-" before any games
+    parts = values.astype("string").str.split("/", n=1, expand=True)
+    made = pd.to_numeric(parts[0], errors="coerce").fillna(0)
+    attempted = pd.to_numeric(parts[1], errors="coerce").fillna(0) if parts.shape[1] > 1 else made * 0
+    return made.astype(np.int16), attempted.astype(np.int16)
+
+
+@timed("archive.sync_league_weeks")
+def archive_league_weeks(lg, store=None, archive=None):
+    """
+    Appends the league's finalized weeks (from the WeekStore) that aren't
+    archived yet, ranked within their week. Returns rows added.
+    """
+    store = store or get_week_store()
+    archive = archive or get_archive()
+    weeks = [week for week in store.weeks(lg.league_id) if week not in archive.archived_weeks(lg.league_id)]
+    if not weeks:
+        return 0
+
+    season = season_label(int(lg.settings()["season"]))
+    added = archive.append("team_weeks", season, _team_week_rows(lg.league_id, weeks, store))
+    archive.archived_weeks(lg.league_id).update(weeks)
+    print(f"✅ Archived {added} team-weeks for {lg.league_id} ({season}, weeks {weeks})")
+    return added
+
+
+def rearchive_league_week(lg, week, store=None, archive=None):
+    """
+    Replaces one archived week of a league with the WeekStore's copy (e.g.
+    after logic.rebuild_week), or drops it if the week is no longer stored.
+    Returns rows written.
+    """
+    store = store or get_week_store()
+    archive = archive or get_archive()
+    season = season_label(int(lg.settings()["season"]))
+    drop = (ds.field("league_key") == lg.league_id) & (ds.field("week") == week)
+    if week in store.weeks(lg.league_id):
+        added = archive.replace("team_weeks", season, drop, _team_week_rows(lg.league_id, [week], store))
+        archive.archived_weeks(lg.league_id).add(week)
+    else:
+        added = archive.replace("team_weeks", season, drop, pd.DataFrame())
+        archive.archived_weeks(lg.league_id).discard(week)
+    print(f"✅ Re-archived week {week} for {lg.league_id} ({season}, {added} team-weeks)")
+    return added
+
+
+def _team_week_rows(league_key, weeks, store):
+    # Stored weeks, ranked within their week, in the team_weeks layout
+    df = rank_weekly_stats(pd.concat([store.load_week(league_key, week) for week in weeks], ignore_index=True))
+    df["league_key"] = league_key
+    df["FGM"], df["FGA"] = _split_made_attempted(df["FGM/A"])
+    df["FTM"], df["FTA"] = _split_made_attempted(df["FTM/A"])
+    df["completed_games"] = df["completed_games"].fillna(0)
+    return df
+
+
+@timed("archive.sync_game_logs")
+def archive_game_logs(season=SEASON, store=None, archive=None):
+    """Appends one season's stored game logs that aren't archived yet. Returns rows added."""
+    store = store or get_game_log_store()
+    archive = archive or get_archive()
+    games = store.load(season)
+    archived = archive.scan("player_games", ["PLAYER_ID", "GAME_ID"], ds.field("season") == season)
+    if archived.num_rows:
+        archived = _to_pandas(archived)
+        keys = pd.MultiIndex.from_arrays([archived["PLAYER_ID"], archived["GAME_ID"].astype(str)])
+        games = games[~pd.MultiIndex.from_arrays([games["PLAYER_ID"], games["GAME_ID"]]).isin(keys)]
+    added = archive.append("player_games", season, games)
+    print(f"✅ Archived {added} player-games for {season}")
+    return added
+
+
+def get_season_summary(team_names, archive=None):
+    """
+    season_summary for some teams, shared across sessions and only recomputed
+    after the archive is written to, so page reruns don't rescan Parquet.
+    """
+    archive = archive or get_archive()
+    team_names = tuple(sorted(team_names))
+    return get_shared_cache().get_versioned(
+        "season_summary", team_names, archive.revision, lambda: archive.season_summary(team_names=team_names))
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_archive():
+    """Returns the process-wide archive (created on first use)."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = SeasonArchive()
+        return _archive
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    archive = get_archive()
+    if command == "sync":
+        archive_game_logs(sys.argv[2] if len(sys.argv) > 2 else SEASON)
+    elif command == "backfill" and len(sys.argv) > 2:
+        from gamelogs import backfill
+        backfill(sys.argv[2])
+        archive_game_logs(sys.argv[2])
+        archive.compact("player_games", sys.argv[2])
+    elif command == "compact":
+        for name in DATASETS:
+            for season in archive.seasons(name):
+                archive.compact(name, season)
+        print("✅ Compacted the archive")
+    else:
+        sys.exit(__doc__)
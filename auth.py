@@ -0,0 +1,187 @@
+# Standard library
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Third-party libraries
+from yahoo_oauth import OAuth2
+import yahoo_fantasy_api as yfa
+
+# Local modules
+from fetch import raise_for_retryable_status
+from metrics import timed
+from transport import mount
+
+KEYPAIR_PATH = "/etc/secrets/keypair.json"
+
+# Yahoo access tokens last an hour; refresh this many seconds before that
+TOKEN_LIFETIME = 3600
+REFRESH_MARGIN = 300
+
+
+def write_keypair(path, keypair):
+    """Writes the keypair to a temp file next to `path`, then renames it over the original."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".keypair-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(keypair, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class TokenManager:
+    """
+    Holds the Yahoo OAuth credentials in memory for the life of the process and
+    refreshes the access token ahead of expiry, one refresh at a time. Every
+    league of the account is served from the same session, and each league's
+    yfa.League is created once, so the handshake is off the request path.
+    """
+
+    def __init__(self, path=KEYPAIR_PATH, refresh_margin=REFRESH_MARGIN):
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+        self._keypair = None
+        self._sc = None
+        self._game = None
+        self._league_ids = None
+        self._leagues = {}
+        self._timer = None
+
+    def league_ids(self):
+        """Returns the account's league keys for the current NBA season (fetched once per process)."""
+        with self._lock:
+            self._ensure_game()
+            if self._league_ids is None:
+                # Unfiltered, Yahoo returns every league the account was ever in, across sports and seasons
+                self._league_ids = self._game.league_ids(game_codes=["nba"], is_available=True)
+            league_ids = list(self._league_ids)
+        self.ensure_fresh()
+        return league_ids
+
+    def league(self, league_id=None):
+        """
+        Returns the shared league object for `league_id` (default: the account's
+        first league), logging in on the first call.
+        """
+        if league_id is None:
+            league_id = self.league_ids()[0]
+        with self._lock:
+            self._ensure_game()
+            if league_id not in self._leagues:
+                self._leagues[league_id] = self._game.to_league(league_id)
+            lg = self._leagues[league_id]
+        self.ensure_fresh()
+        return lg
+
+    def _ensure_game(self):
+        # Caller holds self._lock
+        if self._game is None:
+            self._connect()
+            self._game = yfa.Game(self._sc, 'nba')
+
+    def ensure_fresh(self):
+        """Refreshes the access token if it's within the margin of expiring."""
+        if self._expires_in() > self.refresh_margin:
+            return
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._expires_in() <= self.refresh_margin:
+                self._refresh()
+
+    def _expires_in(self):
+        return self._sc.token_time + TOKEN_LIFETIME - time.time()
+
+    @timed("oauth.connect")
+    def _connect(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Secret file {self.path} not found.")
+        with open(self.path, "r") as f:
+            self._keypair = json.load(f)
+
+        # Manually initialize OAuth2 with token_time & token_type to prevent verifier request
+        try:
+            self._sc = OAuth2(
+                self._keypair["consumer_key"],
+                self._keypair["consumer_secret"],
+                access_token=self._keypair["access_token"],
+                refresh_token=self._keypair["refresh_token"],
+                token_time=self._keypair["token_time"],
+                token_type=self._keypair["token_type"],
+                store_file=False
+            )
+            if self._sc.token_time != self._keypair["token_time"]:
+                # OAuth2 already refreshed an expired token while starting up
+                self._install_session()
+                self._persist()
+            elif self._expires_in() <= self.refresh_margin:
+                self._refresh()
+            else:
+                self._install_session()
+        except Exception as e:
+            raise RuntimeError(f"OAuth authentication failed: {str(e)}")
+
+    @timed("oauth.refresh")
+    def _refresh(self):
+        # Caller holds self._lock
+        print("🔄 Refreshing Yahoo token...")
+        self._sc.refresh_access_token()
+        self._install_session()
+        self._persist()
+
+    def _persist(self):
+        self._keypair.update({
+            "access_token": self._sc.access_token,
+            "refresh_token": self._sc.refresh_token,
+            "token_time": self._sc.token_time,
+            "token_type": self._sc.token_type,
+        })
+        try:
+            write_keypair(self.path, self._keypair)
+            print("✅ Token refreshed and saved!")
+        except OSError as e:
+            # The in-memory token is still good; it just won't survive a restart
+            print(f"⚠️ Token refreshed but not saved: {e}")
+
+    def _install_session(self):
+        # yfa reads sc.session on every request, so swapping it updates every holder of the league
+        session = self._sc.oauth.get_session(token=self._sc.access_token)
+        # Surface 429/5xx with their status code so the fetch executor can retry them
+        session.hooks["response"].append(raise_for_retryable_status)
+        # Pooled keep-alive connections and the conditional-request cache, shared across refreshes
+        self._sc.session = mount(session)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = max(0.0, self._expires_in() - self.refresh_margin)
+        self._timer = threading.Timer(delay, self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self):
+        try:
+            self.ensure_fresh()
+        except Exception as e:
+            # Not fatal: the next league() call (or yfa's own 401 handling) retries
+            print(f"⚠️ Background token refresh failed: {e}")
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+def get_token_manager(path=KEYPAIR_PATH):
+    """Returns the process-wide token manager for a keypair file."""
+    with _managers_lock:
+        if path not in _managers:
+            _managers[path] = TokenManager(path)
+        return _managers[path]
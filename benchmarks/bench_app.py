@@ -0,0 +1,243 @@
+"""
+End-to-end benchmark suite on the replay backend (benchmarks/replay.py): no
+Yahoo or NBA credentials needed.
+
+For every page of streamlit.py and every logic.py function it reports wall
+time, upstream calls (by endpoint) and peak traced memory, plus time to first
+content for pages that render progressively. Each measurement
+runs in a fresh interpreter, so caches and singletons start cold; memory is
+traced in a separate run so tracemalloc doesn't inflate the timings.
+
+    python benchmarks/bench_app.py
+    python benchmarks/bench_app.py --weeks 22 --teams 14 --players 500 --latency 0.05
+    python benchmarks/bench_app.py --fixtures fixtures/            # recorded responses (see replay.py)
+    python benchmarks/bench_app.py --save baseline.json
+    python benchmarks/bench_app.py --compare baseline.json --tolerance 0.25   # exit 1 on regressions
+"""
+# Standard library
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+PAGES = {
+    "home": "🏠 Home",
+    "comparison": "⛹🏽 Multi-player comparison",
+    "screener": "📈 Player screener",
+    "free_agency": "🗣️ Free Agency",
+}
+FUNCTIONS = ["parse_scoreboard", "rank_weekly_stats", "overall_weekly_matchup_stats",
+             "get_full_season_stats:cold", "get_full_season_stats:warm", "get_standings",
+             "get_matchups_df", "get_team_logos", "extract_stat_winners"]
+
+# Slack under which a slower wall time isn't a regression (timer noise on tiny functions)
+WALL_SLACK = 0.05
+
+
+# --------------- Child side: one measurement per interpreter ---------------
+
+def _setup_replay(args):
+    """Installs the replay upstreams; returns (league, nba, call log)."""
+    # The local stores read SNAPSHOT_DB at import, so point it at a scratch file first
+    os.environ["SNAPSHOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="bench-app-"), "league.sqlite")
+    from replay import CallLog, ReplayImages, ReplayLeague, ReplayNBA, install
+
+    calls = CallLog()
+    common = dict(fixtures=args.fixtures, latency=args.latency, jitter=args.jitter, calls=calls, seed=args.seed)
+    league = ReplayLeague(weeks=args.weeks, teams=args.teams, transactions=args.transactions, **common)
+    nba = ReplayNBA(players=args.players, games=args.games, **common)
+    install(league, nba, ReplayImages(**common))
+    return league, nba, calls
+
+
+def _page_target(name, league, nba):
+    """Returns the callable that renders one page (setup work done up front)."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(REPO_DIR, "streamlit.py"), default_timeout=600)
+    at.session_state["page"] = PAGES[name]
+
+    if name == "screener":
+        # Measure the screener itself, not the one-off league-wide backfill
+        from gamelogs import backfill
+        backfill()
+
+    def render():
+        at.run()
+        if name == "comparison":
+            # First render, then an actual comparison of two players
+            names = [p["full_name"] for p in nba.get_players()[:2]]
+            at.selectbox(key="player_0").set_value(names[0])
+            at.selectbox(key="player_1").set_value(names[1])
+            next(b for b in at.button if b.label == "Compare Players").click()
+            at.run()
+        if at.exception:
+            raise RuntimeError(f"{name} page raised: {[e.value for e in at.exception]}")
+    return render
+
+
+def _function_target(name, league):
+    """Returns the callable that runs one logic.py function on replay data."""
+    import pandas as pd
+    import logic
+    from store import WeekStore
+
+    week = league.current_week()
+    if name == "parse_scoreboard":
+        payloads = [league.matchups(week=i) for i in range(1, week + 1)]
+        return lambda: [logic.parse_scoreboard(p) for p in payloads]
+    if name == "rank_weekly_stats":
+        raw = pd.concat([logic.parse_scoreboard(league.matchups(week=i)) for i in range(1, week + 1)],
+                        ignore_index=True)
+        return lambda: logic.rank_weekly_stats(raw)
+    if name == "overall_weekly_matchup_stats":
+        return lambda: logic.overall_weekly_matchup_stats(league, week)
+    if name == "get_full_season_stats:cold":
+        return lambda: logic.get_full_season_stats(league, WeekStore(":memory:"))
+    if name == "get_full_season_stats:warm":
+        store = WeekStore(":memory:")
+        logic.get_full_season_stats(league, store)
+        return lambda: logic.get_full_season_stats(league, store)
+    if name == "get_standings":
+        return lambda: logic.get_standings(league)
+    if name == "get_matchups_df":
+        return lambda: logic.get_matchups_df(league)
+    if name == "get_team_logos":
+        return lambda: logic.get_team_logos(league)
+    if name == "extract_stat_winners":
+        scoreboard = league.matchups(week=week)["fantasy_content"]["league"][1]["scoreboard"]
+        return lambda: logic.extract_stat_winners(scoreboard)
+    raise ValueError(f"Unknown function {name}")
+
+
+def run_child(args):
+    league, nba, calls = _setup_replay(args)
+    kind, name = args.child.split(":", 1)
+    target = _page_target(name, league, nba) if kind == "page" else _function_target(name, league)
+
+    calls.reset()
+    if args.memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    target()
+    wall = time.perf_counter() - start
+    result = {"wall": wall, "calls": calls.snapshot()}
+    if kind == "page":
+        from metrics import get_metrics
+        first = [row["max_ms"] / 1000 for row in get_metrics().histograms()
+                 if row["metric"] == "time_to_first_content_seconds"]
+        if first:
+            result["first_content"] = first[0]
+    if args.memory:
+        result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    print(json.dumps(result))
+
+
+# --------------- Parent side ---------------
+
+def _knob_args(args):
+    knobs = ["--weeks", args.weeks, "--teams", args.teams, "--players", args.players, "--games", args.games,
+             "--transactions", args.transactions, "--latency", args.latency, "--jitter", args.jitter,
+             "--seed", args.seed]
+    if args.fixtures:
+        knobs += ["--fixtures", os.path.abspath(args.fixtures)]
+    return [str(knob) for knob in knobs]
+
+
+def measure(target, args, memory):
+    # Run outside the repo so the repo's streamlit.py doesn't shadow the streamlit package
+    command = [sys.executable, os.path.abspath(__file__), "--child", target] + _knob_args(args)
+    if memory:
+        command.append("--memory")
+    proc = subprocess.run(command, capture_output=True, text=True, cwd=tempfile.gettempdir())
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"{target} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Returns human-readable regressions against a saved run."""
+    regressions = []
+    for target, result in results.items():
+        base = baseline.get("results", {}).get(target)
+        if base is None:
+            continue
+        if result["wall"] > base["wall"] * (1 + tolerance) + WALL_SLACK:
+            regressions.append(f"{target}: wall {base['wall']:.3f}s -> {result['wall']:.3f}s")
+        if "first_content" in result and "first_content" in base \
+                and result["first_content"] > base["first_content"] * (1 + tolerance) + WALL_SLACK:
+            regressions.append(f"{target}: first content {base['first_content']:.3f}s -> {result['first_content']:.3f}s")
+        if sum(result["calls"].values()) > sum(base["calls"].values()):
+            regressions.append(f"{target}: upstream calls {base['calls']} -> {result['calls']}")
+        if "peak_mb" in result and "peak_mb" in base and result["peak_mb"] > base["peak_mb"] * (1 + tolerance):
+            regressions.append(f"{target}: peak {base['peak_mb']:.1f} MB -> {result['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=22, help="weeks played (the last one is in progress)")
+    parser.add_argument("--teams", type=int, default=10, help="teams in the league")
+    parser.add_argument("--players", type=int, default=300, help="active NBA players")
+    parser.add_argument("--games", type=int, default=60, help="games per player so far")
+    parser.add_argument("--transactions", type=int, default=1500, help="league transactions so far")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every upstream call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", help="replay recorded responses from this directory instead of synthetic data")
+    parser.add_argument("--only", nargs="*", help="targets to run, e.g. page:home function:get_standings")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced-memory runs")
+    parser.add_argument("--save", metavar="FILE", help="write results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="fail if slower / chattier / bigger than a saved run")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    targets = args.only or [f"page:{name}" for name in PAGES] + [f"function:{name}" for name in FUNCTIONS]
+    knobs = " ".join(_knob_args(args))
+    print(f"Replay: {knobs}\n")
+    print(f"{'target':<42}{'wall':>10}{'first':>10}{'peak MB':>10}  upstream calls")
+
+    results = {}
+    for target in targets:
+        result = measure(target, args, memory=False)
+        if not args.no_memory:
+            result["peak_mb"] = measure(target, args, memory=True)["peak_mb"]
+        results[target] = result
+        calls = ", ".join(f"{name} {count}" for name, count in sorted(result["calls"].items())) or "-"
+        first = f"{result['first_content'] * 1000:.0f}ms" if "first_content" in result else "-"
+        peak = f"{result['peak_mb']:.1f}" if "peak_mb" in result else "-"
+        print(f"{target:<42}{result['wall'] * 1000:>8.0f}ms{first:>10}{peak:>10}  {calls}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"knobs": knobs, "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("knobs") != knobs:
+            print(f"\n⚠️ Baseline was recorded with different knobs: {baseline.get('knobs')}")
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
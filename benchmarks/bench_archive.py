@@ -0,0 +1,121 @@
+"""
+Benchmark for the season archive (archive.py): builds archives of growing
+history from synthetic seasons, then runs the query API on each in a fresh
+interpreter and reports query time and memory. Memory should stay flat as
+the number of seasons grows, since queries only read the columns and row
+groups they need.
+
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --seasons 1 5 20 --players 500 --games 70
+"""
+# Standard library
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+FIRST_SEASON = 2000
+
+
+def _setup(root):
+    # The stores read SNAPSHOT_DB at import, so point it at the scratch directory first
+    os.environ["SNAPSHOT_DB"] = os.path.join(root, "league.sqlite")
+    sys.path.append(REPO_DIR)
+    sys.path.append(BENCH_DIR)
+
+
+def build(root, n_seasons, players, games, teams, weeks):
+    """Fills an archive under `root` with `n_seasons` synthetic seasons of both datasets."""
+    _setup(root)
+    import pandas as pd
+    import logic
+    from archive import SeasonArchive, archive_league_weeks
+    from gamelogs import season_label
+    from replay import ReplayLeague, ReplayNBA
+    from store import WeekStore
+
+    archive = SeasonArchive(os.path.join(root, "archive"))
+    for i in range(n_seasons):
+        season = season_label(FIRST_SEASON + i)
+        games_df = ReplayNBA(players=players, games=games, seed=i).league_log()
+        games_df["GAME_DATE"] = pd.to_datetime(games_df["GAME_DATE"]) - pd.DateOffset(years=n_seasons - i)
+        archive.append("player_games", season, games_df)
+        lg = ReplayLeague(weeks=weeks + 1, teams=teams, league_key=f"{400 + i}.l.1", season=FIRST_SEASON + i, seed=i)
+        week_store = WeekStore(":memory:")
+        logic.get_season_scoreboards(lg, week_store)
+        archive_league_weeks(lg, week_store, archive)
+
+
+def run_queries(root, player_id):
+    """Runs the query API once per call type; returns timings and memory."""
+    _setup(root)
+    import pyarrow as pa
+    from archive import SeasonArchive
+
+    archive = SeasonArchive(os.path.join(root, "archive"))
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    latest = archive.seasons("player_games")[0]
+    queries = {
+        "player_seasons": lambda: archive.player_seasons([player_id]),
+        "player_games(latest, 1 player)": lambda: archive.player_games(latest, [player_id]),
+        "season_summary": lambda: archive.season_summary(),
+        "team_history": lambda: archive.team_history("Team 3"),
+    }
+    result = {}
+    for name, query in queries.items():
+        start = time.perf_counter()
+        rows = len(query())
+        result[name] = {"ms": (time.perf_counter() - start) * 1000, "rows": rows}
+    result["arrow_peak_mb"] = pa.default_memory_pool().max_memory() / 2 ** 20
+    result["rss_growth_mb"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss) / 1024
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, nargs="*", default=[1, 5, 20])
+    parser.add_argument("--players", type=int, default=450, help="players per season")
+    parser.add_argument("--games", type=int, default=70, help="games per player per season")
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--weeks", type=int, default=20, help="finalized weeks per season")
+    parser.add_argument("--child", nargs=2, metavar=("ACTION", "ROOT"), help=argparse.SUPPRESS)
+    parser.add_argument("--n", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        action, root = args.child
+        if action == "build":
+            build(root, args.n, args.players, args.games, args.teams, args.weeks)
+        else:
+            print(json.dumps(run_queries(root, player_id=1000)))
+        return
+
+    knobs = ["--players", str(args.players), "--games", str(args.games), "--teams", str(args.teams),
+             "--weeks", str(args.weeks)]
+    print(f"{'seasons':>8}{'disk MB':>9}{'arrow peak MB':>15}{'RSS growth MB':>15}  query ms (rows)")
+    for n_seasons in args.seasons:
+        root = tempfile.mkdtemp(prefix="bench-archive-")
+        # Run outside the repo so the repo's streamlit.py doesn't shadow the streamlit package
+        for action in ("build", "query"):
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", action, root,
+                                   "--n", str(n_seasons)] + knobs,
+                                  capture_output=True, text=True, cwd=tempfile.gettempdir())
+            if proc.returncode != 0:
+                sys.exit(f"{action} failed:\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        disk = sum(os.path.getsize(os.path.join(path, f)) for path, _, files in os.walk(os.path.join(root, "archive"))
+                   for f in files) / 2 ** 20
+        timings = ", ".join(f"{name} {value['ms']:.0f} ({value['rows']})" for name, value in result.items()
+                            if isinstance(value, dict))
+        print(f"{n_seasons:>8}{disk:>9.1f}{result['arrow_peak_mb']:>15.1f}{result['rss_growth_mb']:>15.1f}  {timings}")
+
+
+if __name__ == "__main__":
+    main()
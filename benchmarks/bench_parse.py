@@ -0,0 +1,161 @@
+"""
+Microbenchmark: the columnar scoreboard parser + grouped ranking against the
+original per-team DataFrame builder, on recorded scoreboard payloads.
+
+    python benchmarks/bench_parse.py --record payloads/   # save lg.matchups(week) for every week
+    python benchmarks/bench_parse.py --payloads payloads/ # benchmark on those files
+    python benchmarks/bench_parse.py                      # no recordings: synthetic payloads
+"""
+# Standard library
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import timeit
+
+# Third-party libraries
+import pandas as pd
+
+# Appended, not prepended: the repo's streamlit.py would shadow the streamlit package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logic import parse_scoreboard, rank_weekly_stats, stat_labels  # noqa: E402
+
+
+def legacy_weekly_matchup_stats(matchups):
+    """The original overall_weekly_matchup_stats body (minus the fetch), kept for comparison."""
+    matchup_keys = list(matchups['fantasy_content']['league'][1]['scoreboard']['0']['matchups'].keys())
+    temp = []
+    for key in matchup_keys:
+        if key != 'count':
+            t1 = matchups['fantasy_content']['league'][1]['scoreboard']['0']['matchups'][str(key)]['matchup']['0']['teams']['1']['team']
+            t2 = matchups['fantasy_content']['league'][1]['scoreboard']['0']['matchups'][str(key)]['matchup']['0']['teams']['0']['team']
+            temp.append(t1)
+            temp.append(t2)
+
+    list_of_dfs = []
+    for data in temp:
+        output = {"week": None, "team_key": None, "team_id": None, "name": None,
+                  "remaining_games": None, "live_games": None, "completed_games": None}
+        team_stats_dict = {label: None for label in stat_labels.values()}
+        for item in data[0]:
+            if "team_key" in item:
+                output["team_key"] = item["team_key"]
+            if "team_id" in item:
+                output["team_id"] = item["team_id"]
+            if "name" in item:
+                output["name"] = item["name"]
+        for item in data:
+            if isinstance(item, dict):
+                if "team_stats" in item:
+                    output["week"] = item['team_stats']["week"]
+                    for stat in item["team_stats"]["stats"]:
+                        stat_id = stat["stat"]["stat_id"]
+                        if stat_id in stat_labels:
+                            team_stats_dict[stat_labels[stat_id]] = stat["stat"]["value"]
+                if "team_remaining_games" in item:
+                    output["remaining_games"] = item["team_remaining_games"]["total"]["remaining_games"]
+                    output["live_games"] = item["team_remaining_games"]["total"]["live_games"]
+                    output["completed_games"] = item["team_remaining_games"]["total"]["completed_games"]
+        output.update(team_stats_dict)
+        list_of_dfs.append(pd.DataFrame([output]))
+
+    result = pd.concat(list_of_dfs, ignore_index=True)
+    categories = ['week', 'team_id', 'remaining_games', 'live_games', 'completed_games',
+                  'FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
+    for col in categories:
+        result[col] = pd.to_numeric(result[col], errors='coerce')
+    stat_categories = ['FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
+    for category in stat_categories:
+        if category == 'TO':
+            result[category + '_Rank'] = result[category].rank(ascending=True)
+        else:
+            result[category + '_Rank'] = result[category].rank(ascending=False)
+    result['Aggregate Rank'] = result[[cat + '_Rank' for cat in stat_categories]].sum(axis=1)
+    result['Adjusted_Rank'] = result['Aggregate Rank'].rank(ascending=True, method='min')
+    result['Adjusted_Rank'] = result['Adjusted_Rank'].astype(int)
+    return result.sort_values(by='Adjusted_Rank')
+
+
+def synthetic_scoreboard(week, n_teams=10, league_key="454.l.1", seed=None):
+    """Builds a payload shaped like Yahoo's scoreboard response."""
+    rng = random.Random(seed)
+    matchups = {}
+    for m in range(n_teams // 2):
+        teams = {}
+        for side, team_id in (("0", 2 * m + 1), ("1", 2 * m + 2)):
+            fga, fta = rng.randint(500, 800), rng.randint(100, 200)
+            fgm, ftm = int(fga * rng.uniform(.42, .52)), int(fta * rng.uniform(.70, .85))
+            stats = [{"stat": {"stat_id": "9004003", "value": f"{fgm}/{fga}"}},
+                     {"stat": {"stat_id": "5", "value": f"{fgm / fga:.3f}"}},
+                     {"stat": {"stat_id": "9007006", "value": f"{ftm}/{fta}"}},
+                     {"stat": {"stat_id": "8", "value": f"{ftm / fta:.3f}"}}]
+            for stat_id, (low, high) in {"10": (60, 150), "12": (900, 1500), "15": (350, 600), "16": (200, 400),
+                                         "17": (40, 90), "18": (20, 70), "19": (80, 170)}.items():
+                stats.append({"stat": {"stat_id": stat_id, "value": str(rng.randint(low, high))}})
+            team_key = f"{league_key}.t.{team_id}"
+            teams[side] = {"team": [
+                [{"team_key": team_key}, {"team_id": str(team_id)}, {"name": f"Team {team_id}"}, [], {"url": ""}],
+                {"team_stats": {"coverage_type": "week", "week": str(week), "stats": stats}},
+                {"team_points": {"coverage_type": "week", "week": str(week), "total": str(rng.randint(0, 9))}},
+                {"team_remaining_games": {"coverage_type": "week", "week": week, "total": {
+                    "remaining_games": 0, "live_games": 0, "completed_games": rng.randint(28, 40)}}},
+            ]}
+        teams["count"] = 2
+        matchups[str(m)] = {"matchup": {"week": str(week), "status": "postevent", "0": {"teams": teams}}}
+    matchups["count"] = n_teams // 2
+    return {"fantasy_content": {"league": [{"league_key": league_key},
+                                           {"scoreboard": {"0": {"matchups": matchups}, "week": str(week)}}]}}
+
+
+def record_payloads(directory):
+    from logic import authenticate_yahoo_api
+    lg = authenticate_yahoo_api()
+    os.makedirs(directory, exist_ok=True)
+    for week in range(1, lg.current_week() + 1):
+        with open(os.path.join(directory, f"week_{week:02d}.json"), "w") as f:
+            json.dump(lg.matchups(week=week), f)
+    print(f"Recorded {lg.current_week()} weeks to {directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", help="directory of recorded lg.matchups(week) JSON files")
+    parser.add_argument("--record", metavar="DIR", help="record payloads from the live league into DIR and exit")
+    parser.add_argument("--weeks", type=int, default=22, help="synthetic weeks when no payloads are given")
+    parser.add_argument("--teams", type=int, default=10, help="synthetic teams per week")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record:
+        record_payloads(args.record)
+        return
+
+    if args.payloads:
+        payloads = []
+        for path in sorted(glob.glob(os.path.join(args.payloads, "*.json"))):
+            with open(path) as f:
+                payloads.append(json.load(f))
+    else:
+        payloads = [synthetic_scoreboard(week, args.teams, seed=week) for week in range(1, args.weeks + 1)]
+
+    def legacy():
+        return pd.concat([legacy_weekly_matchup_stats(p) for p in payloads], ignore_index=True)
+
+    def columnar():
+        return rank_weekly_stats(pd.concat([parse_scoreboard(p) for p in payloads], ignore_index=True))
+
+    # Same rows and values, modulo row order within tied Adjusted_Rank
+    order = ["week", "Adjusted_Rank", "team_key"]
+    pd.testing.assert_frame_equal(legacy().sort_values(order, ignore_index=True),
+                                  columnar().sort_values(order, ignore_index=True), check_dtype=False)
+
+    print(f"{len(payloads)} weeks x {len(parse_scoreboard(payloads[0]))} teams")
+    for name, fn in (("legacy", legacy), ("columnar", columnar)):
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"{name:>10}: {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
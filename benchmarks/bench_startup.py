@@ -0,0 +1,113 @@
+"""
+Cold-start benchmark for the dashboard.
+
+Runs each measurement in a fresh interpreter, the way a cold Render instance
+starts, and fails (exit code 1) if startup goes over budget:
+
+- import time of the modules `streamlit.py` loads before any page runs,
+  recorded with `python -X importtime` (the raw log is saved with --output)
+- time to first render of the multi-player comparison page via AppTest
+  (it needs no Yahoo credentials, so it can run anywhere)
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --import-budget 1.5 --render-budget 6 --output importtime.log
+"""
+# Standard library
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def startup_imports():
+    """
+    The modules streamlit.py imports at module level, before it looks at the
+    selected page, read from its source so the list can't drift from the app.
+    """
+    with open(os.path.join(REPO_DIR, "streamlit.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+FIRST_RENDER = f"""
+import sys
+sys.path.append({REPO_DIR!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({os.path.join(REPO_DIR, "streamlit.py")!r}, default_timeout=120)
+at.session_state["page"] = "⛹🏽 Multi-player comparison"
+at.run()
+assert not at.exception, [e.value for e in at.exception]
+"""
+
+
+def run_python(code, *flags):
+    # Run outside the repo so the repo's streamlit.py doesn't shadow the streamlit package
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *flags, "-c", code], cwd=tempfile.gettempdir(),
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"Benchmark subprocess failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def parse_importtime(log, modules):
+    """
+    Returns [(cumulative seconds, module)] for the top-level imports of
+    `modules` in an -X importtime log, leaving out interpreter startup
+    (site, encodings, ...) and the harness's own imports.
+    """
+    rows = []
+    for line in log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  ") and name.strip() in modules:  # nested imports are indented further
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-budget", type=float, default=2.0, help="seconds allowed for startup imports")
+    parser.add_argument("--render-budget", type=float, default=8.0, help="seconds allowed for the first render")
+    parser.add_argument("--output", help="write the raw -X importtime log here")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    modules = startup_imports()
+    _, log = run_python(f"import sys; sys.path.append({REPO_DIR!r}); import {', '.join(modules)}", "-X", "importtime")
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(log)
+    imports = parse_importtime(log, modules)
+    import_seconds = sum(seconds for seconds, _ in imports)
+
+    render_seconds, _ = run_python(FIRST_RENDER)
+
+    print(f"Startup imports: {import_seconds:6.2f} s (budget {args.import_budget:.2f} s)")
+    for seconds, name in sorted(imports, reverse=True)[:args.top]:
+        print(f"    {seconds:6.3f} s  {name}")
+    print(f"First render:    {render_seconds:6.2f} s (budget {args.render_budget:.2f} s)")
+
+    over = []
+    if import_seconds > args.import_budget:
+        over.append("imports")
+    if render_seconds > args.render_budget:
+        over.append("first render")
+    if over:
+        sys.exit(f"Startup over budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,476 @@
+"""
+Record/replay stand-ins for the two upstreams, so the app can be run and
+measured without Yahoo or NBA credentials.
+
+- ReplayLeague answers like a yfa.League (current_week, matchups, standings,
+  settings, teams, to_team().details, transactions) from recorded JSON fixtures, or from
+  synthetic data sized by the weeks/teams knobs.
+- ReplayNBA stands in for nba_api's static player list, playergamelog and
+  leaguegamelog, from fixtures or for a synthetic pool of players.
+- ReplayImages answers logo and headshot downloads with generated PNGs.
+
+All of them count every upstream call in a shared CallLog and can sleep a synthetic
+latency per call. `install()` wires them into the app in-process.
+
+    python benchmarks/replay.py record fixtures/   # save the live league + NBA responses (needs credentials)
+"""
+# Standard library
+import argparse
+import datetime
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+# Third-party libraries
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+# Appended, not prepended: the repo's streamlit.py would shadow the streamlit package
+if REPO_DIR not in sys.path:
+    sys.path.append(REPO_DIR)
+if BENCH_DIR not in sys.path:
+    sys.path.append(BENCH_DIR)
+
+from bench_parse import synthetic_scoreboard  # noqa: E402
+from store import GAME_LOG_STATS  # noqa: E402
+
+DEFAULT_LEAGUE_KEY = "454.l.74601"
+
+# Yahoo stat ids compared for stat_winners (TO is lower-is-better)
+WINNER_STATS = {"5": "FG%", "8": "FT%", "10": "3PTM", "12": "PTS", "15": "REB",
+                "16": "AST", "17": "STL", "18": "BLK", "19": "TO"}
+
+
+class CallLog:
+    """Thread-safe count of upstream calls, by "<upstream>.<method>"."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def record(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+
+class _Upstream:
+    """Shared plumbing: call counting, synthetic latency and fixture files."""
+
+    prefix = ""
+
+    def __init__(self, fixtures=None, latency=0.0, jitter=0.0, calls=None, seed=0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = calls or CallLog()
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _upstream(self, method):
+        self.calls.record(f"{self.prefix}.{method}")
+        if self.latency or self.jitter:
+            with self._rng_lock:
+                delay = self.latency + self._rng.uniform(0, self.jitter)
+            time.sleep(delay)
+
+    def _fixture(self, name):
+        """Loads fixtures/<name>.json, or None when replaying synthetic data."""
+        if self.fixtures is None:
+            return None
+        path = os.path.join(self.fixtures, f"{name}.json")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No recorded fixture {path}")
+        with open(path) as f:
+            return json.load(f)
+
+
+# --------------- Yahoo ---------------
+
+def _stat_values(team):
+    values = {}
+    for item in team[1]["team_stats"]["stats"]:
+        if item["stat"]["stat_id"] in WINNER_STATS:
+            values[item["stat"]["stat_id"]] = float(item["stat"]["value"])
+    return values
+
+
+def _with_live_fields(payload, week, current_week, rng):
+    """Adds stat_winners, and games left for the current week, to a synthetic scoreboard."""
+    matchups = payload["fantasy_content"]["league"][1]["scoreboard"]["0"]["matchups"]
+    for key, matchup in matchups.items():
+        if key == "count":
+            continue
+        teams = matchup["matchup"]["0"]["teams"]
+        first, second = teams["0"]["team"], teams["1"]["team"]
+        a, b = _stat_values(first), _stat_values(second)
+        winners = []
+        for stat_id in WINNER_STATS:
+            if a[stat_id] == b[stat_id]:
+                winners.append({"stat_winner": {"stat_id": stat_id, "is_tied": 1}})
+                continue
+            first_wins = (a[stat_id] < b[stat_id]) if stat_id == "19" else (a[stat_id] > b[stat_id])
+            winner = first if first_wins else second
+            winners.append({"stat_winner": {"stat_id": stat_id, "winner_team_key": winner[0][0]["team_key"]}})
+        matchup["matchup"]["stat_winners"] = winners
+        if week == current_week:
+            matchup["matchup"]["status"] = "midevent"
+            for side in ("0", "1"):
+                games = teams[side]["team"][3]["team_remaining_games"]["total"]
+                games["remaining_games"] = rng.randint(5, 15)
+                games["completed_games"] = rng.randint(10, 25)
+    return payload
+
+
+class _ReplayTeam:
+    def __init__(self, league, team_key):
+        self.league = league
+        self.team_key = team_key
+
+    def details(self):
+        self.league._upstream("team.details")
+        recorded = self.league._fixture(f"team_details-{self.team_key}")
+        if recorded is not None:
+            return recorded
+        return self.league._team(self.team_key)
+
+
+class ReplayLeague(_Upstream):
+    """
+    Stands in for yfa.League. With `fixtures`, every response comes from files
+    written by RecordingLeague; otherwise a season of `weeks` weeks for `teams`
+    teams is synthesized (deterministic for a given seed).
+    """
+
+    prefix = "yahoo"
+
+    def __init__(self, fixtures=None, weeks=22, teams=10, league_key=DEFAULT_LEAGUE_KEY,
+                 transactions=1500, season=2024, **kwargs):
+        super().__init__(fixtures=fixtures, **kwargs)
+        self.season = season
+        self.weeks = weeks
+        self.n_teams = teams
+        self.n_transactions = transactions
+        self.league_id = league_key
+        self.current_week_cache = None
+        self.team_names = {f"{self.league_id}.t.{i}": f"Team {i}" for i in range(1, teams + 1)}
+        if fixtures is not None:
+            self.league_id = self._fixture("league")["league_key"]
+            self.team_names = {key: team["name"] for key, team in self._fixture("teams").items()}
+            self.weeks = self._fixture("current_week")
+        self.team_keys = list(self.team_names)
+        self._transactions = None
+
+    def current_week(self):
+        # yfa memoizes this on the league object too
+        if self.current_week_cache is None:
+            self._upstream("current_week")
+            recorded = self._fixture("current_week")
+            self.current_week_cache = recorded if recorded is not None else self.weeks
+        return self.current_week_cache
+
+    def matchups(self, week=None):
+        week = week or self.current_week()
+        self._upstream("matchups")
+        recorded = self._fixture(f"matchups-{week:02d}")
+        if recorded is not None:
+            return recorded
+        rng = random.Random(self.seed * 1000 + week)
+        payload = synthetic_scoreboard(week, self.n_teams, self.league_id, seed=self.seed * 1000 + week)
+        return _with_live_fields(payload, week, self.weeks, rng)
+
+    def standings(self):
+        self._upstream("standings")
+        recorded = self._fixture("standings")
+        if recorded is not None:
+            return recorded
+        rng = random.Random(self.seed)
+        played = self.weeks - 1
+        rows = []
+        for rank, team_key in enumerate(self.team_keys, start=1):
+            wins = rng.randint(0, played)
+            ties = rng.randint(0, played - wins)
+            rows.append({"team_key": team_key, "name": self.team_names[team_key], "rank": rank, "playoff_seed": rank,
+                         "outcome_totals": {"wins": wins, "losses": played - wins - ties, "ties": ties,
+                                            "percentage": f"{(wins + ties / 2) / max(played, 1):.3f}"},
+                         "games_back": "-"})
+        return rows
+
+    def teams(self):
+        self._upstream("teams")
+        recorded = self._fixture("teams")
+        if recorded is not None:
+            return recorded
+        return {team_key: self._team(team_key) for team_key in self.team_keys}
+
+    def to_team(self, team_key):
+        return _ReplayTeam(self, team_key)
+
+    def settings(self):
+        self._upstream("settings")
+        recorded = self._fixture("settings")
+        if recorded is not None:
+            return recorded
+        return {"league_key": self.league_id, "name": f"Replay League {self.league_id}", "num_teams": self.n_teams,
+                "season": str(self.season)}
+
+    def transactions(self, tran_types, count):
+        self._upstream("transactions")
+        recorded = self._fixture("transactions")
+        if recorded is None:
+            if self._transactions is None:
+                self._transactions = self._synthetic_transactions()
+            recorded = self._transactions
+        # Newest first, like Yahoo
+        return recorded if count in ("", None) else recorded[:int(count)]
+
+    def _team(self, team_key):
+        team_id = team_key.rsplit(".", 1)[1]
+        return {"team_key": team_key, "team_id": team_id, "name": self.team_names[team_key],
+                "team_logos": [{"team_logo": {"size": "large", "url": f"https://replay.invalid/logos/{team_id}.png"}}]}
+
+    def _synthetic_transactions(self):
+        rng = random.Random(self.seed)
+        timestamp = 1729555200  # season tip-off
+        transactions = []
+        for transaction_id in range(1, self.n_transactions + 1):
+            timestamp += rng.randint(600, 4 * 3600)
+            team_key = rng.choice(self.team_keys)
+            players = {}
+
+            def move(player_id, data):
+                players[str(len(players))] = {"player": [
+                    [{"player_key": f"454.p.{player_id}"}, {"player_id": str(player_id)},
+                     {"name": {"full": f"Player {player_id}"}}, []],
+                    {"transaction_data": data}]}
+
+            kind = rng.choice(["add/drop", "add/drop", "add", "drop"])
+            if kind in ("add", "add/drop"):
+                move(rng.randint(1, 150), [{"type": "add", "source_type": rng.choice(["freeagents", "waivers"]),
+                                            "destination_type": "team", "destination_team_key": team_key,
+                                            "destination_team_name": self.team_names[team_key]}])
+            if kind in ("drop", "add/drop"):
+                move(rng.randint(1, 150), {"type": "drop", "source_type": "team", "source_team_key": team_key,
+                                           "source_team_name": self.team_names[team_key], "destination_type": "waivers"})
+            players["count"] = len(players)
+            transactions.append({"players": players, "status": "successful", "timestamp": str(timestamp),
+                                 "transaction_id": str(transaction_id), "type": kind,
+                                 "transaction_key": f"{self.league_id}.tr.{transaction_id}"})
+        return transactions[::-1]
+
+
+class RecordingLeague:
+    """Wraps a live yfa.League and saves every response as a ReplayLeague fixture."""
+
+    def __init__(self, lg, directory):
+        self.lg = lg
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._save("league", {"league_key": lg.league_id})
+
+    def _save(self, name, value):
+        with open(os.path.join(self.directory, f"{name}.json"), "w") as f:
+            json.dump(value, f)
+        return value
+
+    def record_all(self):
+        week = self._save("current_week", self.lg.current_week())
+        for i in range(1, week + 1):
+            self._save(f"matchups-{i:02d}", self.lg.matchups(week=i))
+        self._save("standings", self.lg.standings())
+        self._save("settings", self.lg.settings())
+        teams = self._save("teams", self.lg.teams())
+        for team_key in teams:
+            self._save(f"team_details-{team_key}", self.lg.to_team(team_key).details())
+        self._save("transactions", self.lg.transactions("add,drop,trade", ""))
+
+
+# --------------- NBA ---------------
+
+class _Frames:
+    # What nba_api endpoints return: an object with get_data_frames()
+    def __init__(self, df):
+        self._df = df
+
+    def get_data_frames(self):
+        return [self._df]
+
+
+class ReplayNBA(_Upstream):
+    """
+    Stands in for nba_api: the static player list, PlayerGameLog and
+    LeagueGameLog. Synthetic mode makes `players` active players with `games`
+    games each, the last one today (so every rolling window has data).
+    """
+
+    prefix = "nba"
+
+    def __init__(self, fixtures=None, players=300, games=60, **kwargs):
+        super().__init__(fixtures=fixtures, **kwargs)
+        self.n_players = players
+        self.n_games = games
+        self._log = None
+        self._log_lock = threading.Lock()
+
+    def get_players(self):
+        # Static data bundled with nba_api: no network, so not counted as an upstream call
+        recorded = self._fixture("players")
+        if recorded is not None:
+            return recorded
+        return [{"id": 1000 + i, "full_name": f"Player {i}", "first_name": "Player", "last_name": str(i),
+                 "is_active": True} for i in range(self.n_players)]
+
+    def league_log(self):
+        """Every stored game, leaguegamelog-style (PLAYER_ID, GAME_DATE as YYYY-MM-DD)."""
+        with self._log_lock:
+            if self._log is None:
+                recorded = self._fixture("leaguegamelog")
+                if recorded is not None:
+                    self._log = pd.read_json(io.StringIO(recorded), orient="split", dtype=False, convert_dates=False)
+                else:
+                    self._log = self._synthetic_log()
+            return self._log
+
+    def _synthetic_log(self):
+        rng = np.random.default_rng(self.seed)
+        ids = np.repeat([p["id"] for p in self.get_players()], self.n_games)
+        n_rows = len(ids)
+        today = pd.Timestamp.today().normalize()
+        # Every other day, newest game today
+        offsets = np.tile(np.arange(self.n_games)[::-1] * 2, self.n_players)
+        df = pd.DataFrame({
+            "PLAYER_ID": ids,
+            "GAME_ID": [f"002{i:07d}" for i in range(n_rows)],
+            "GAME_DATE": (today - pd.to_timedelta(offsets, unit="D")).strftime("%Y-%m-%d"),
+            "MATCHUP": "AAA vs. BBB",
+            "WL": rng.choice(["W", "L"], n_rows),
+        })
+        for made, attempted, low, high in (("FGM", "FGA", 3, 22), ("FG3M", "FG3A", 0, 10), ("FTM", "FTA", 0, 10)):
+            df[attempted] = rng.integers(low, high, n_rows).astype(float)
+            df[made] = np.floor(df[attempted] * rng.uniform(0.3, 0.9, n_rows))
+            df[made.replace("M", "_PCT")] = np.where(df[attempted] > 0, df[made] / df[attempted].where(df[attempted] > 0), 0.0)
+        df["MIN"] = rng.integers(10, 40, n_rows).astype(float)
+        df["OREB"], df["DREB"] = rng.integers(0, 4, n_rows).astype(float), rng.integers(1, 10, n_rows).astype(float)
+        df["REB"] = df["OREB"] + df["DREB"]
+        for col, high in (("AST", 12), ("STL", 4), ("BLK", 4), ("TOV", 6), ("PF", 6)):
+            df[col] = rng.integers(0, high, n_rows).astype(float)
+        df["PTS"] = 2 * (df["FGM"] - df["FG3M"]) + 3 * df["FG3M"] + df["FTM"]
+        df["PLUS_MINUS"] = rng.integers(-20, 20, n_rows).astype(float)
+        return df[["PLAYER_ID", "GAME_ID", "GAME_DATE", "MATCHUP", "WL"] + GAME_LOG_STATS]
+
+    def player_game_log(self, player_id, season=None, season_type_all_star=None, date_from_nullable="", **kwargs):
+        self._upstream("playergamelog")
+        log = self.league_log()
+        rows = log[log["PLAYER_ID"] == int(player_id)]
+        if date_from_nullable:
+            start = datetime.datetime.strptime(date_from_nullable, "%m/%d/%Y").strftime("%Y-%m-%d")
+            rows = rows[rows["GAME_DATE"] >= start]
+        # playergamelog's own spelling: Player_ID/Game_ID and "APR 13, 2025" dates, newest first
+        rows = rows.rename(columns={"PLAYER_ID": "Player_ID", "GAME_ID": "Game_ID"}).iloc[::-1].copy()
+        rows["GAME_DATE"] = pd.to_datetime(rows["GAME_DATE"]).dt.strftime("%b %d, %Y").str.upper()
+        return _Frames(rows.reset_index(drop=True))
+
+    def league_game_log(self, **kwargs):
+        self._upstream("leaguegamelog")
+        return _Frames(self.league_log().copy())
+
+
+# --------------- Image CDNs ---------------
+
+class ReplayImages(_Upstream):
+    """
+    Stands in for Yahoo's logo CDN and the NBA's headshot CDN: every download
+    is a generated PNG at the size the real CDN serves (1040x760 headshots).
+    """
+
+    prefix = "cdn"
+
+    def fetch(self, url):
+        from PIL import Image
+
+        self._upstream("image")
+        size = (1040, 760) if "/headshots/" in url else (200, 200)
+        rng = random.Random(f"{self.seed}:{url}")
+        image = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+        out = io.BytesIO()
+        image.save(out, format="PNG")
+        return out.getvalue()
+
+
+# --------------- Wiring ---------------
+
+class _ReplayTokenManager:
+    def __init__(self, leagues):
+        self.leagues = {lg.league_id: lg for lg in leagues}
+
+    def league_ids(self):
+        return list(self.leagues)
+
+    def league(self, league_id=None):
+        return self.leagues[league_id or next(iter(self.leagues))]
+
+    def ensure_fresh(self):
+        pass
+
+
+def install(league=None, nba=None, images=None):
+    """
+    Points the app at the replay upstreams in this process: the token manager
+    hands out `league` (one ReplayLeague, or a list of them for a multi-league
+    account), nba_api's player list and game log endpoints are replaced by
+    `nba`, and logo/headshot downloads go to `images`.
+    """
+    if league is not None:
+        import auth
+        leagues = league if isinstance(league, (list, tuple)) else [league]
+        with auth._managers_lock:
+            auth._managers[auth.KEYPAIR_PATH] = _ReplayTokenManager(leagues)
+    if nba is not None:
+        from nba_api.stats.endpoints import leaguegamelog, playergamelog
+        from nba_api.stats.static import players
+        players.get_players = nba.get_players
+        playergamelog.PlayerGameLog = nba.player_game_log
+        leaguegamelog.LeagueGameLog = nba.league_game_log
+    if images is not None:
+        import thumbnails
+        thumbnails.fetch_image = images.fetch
+
+
+def record(directory, players=None):
+    """Records the live league (and a league-wide NBA game log) as fixtures in `directory`."""
+    from logic import authenticate_yahoo_api
+    from nba_api.stats.endpoints import leaguegamelog
+    from nba_api.stats.static import players as static_players
+    from gamelogs import SEASON, SEASON_TYPE
+
+    RecordingLeague(authenticate_yahoo_api(), directory).record_all()
+    log = leaguegamelog.LeagueGameLog(season=SEASON, season_type_all_star=SEASON_TYPE,
+                                      player_or_team_abbreviation="P", timeout=120).get_data_frames()[0]
+    with open(os.path.join(directory, "leaguegamelog.json"), "w") as f:
+        json.dump(log.to_json(orient="split"), f)
+    with open(os.path.join(directory, "players.json"), "w") as f:
+        json.dump(static_players.get_players(), f)
+    print(f"✅ Recorded fixtures to {directory}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["record"])
+    parser.add_argument("directory")
+    args = parser.parse_args()
+    record(args.directory)
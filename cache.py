@@ -0,0 +1,114 @@
+# Standard library
+import threading
+import time
+from concurrent.futures import Future
+
+# Local modules
+from metrics import get_metrics
+
+# How long each dataset stays fresh, in seconds. Volatile ones get dropped by
+# the "🔄 Update Stats" button; the rest only expire on their TTL.
+DATASET_TTLS = {
+    "season": 300,
+    "standings": 300,
+    "matchups": 60,
+    "logos": 24 * 3600,
+    "leagues": 24 * 3600,
+    "player_windows": 24 * 3600,
+    "season_summary": 24 * 3600,
+}
+VOLATILE_DATASETS = {"season", "standings", "matchups"}
+
+
+class SharedCache:
+    """
+    Process-wide cache shared by every Streamlit session. Entries are keyed by
+    (dataset, key) and expire after that dataset's TTL; league datasets use the
+    league key, so every league has its own namespace. Concurrent misses on the
+    same entry collapse into one loader call; the other callers wait for it.
+    """
+
+    def __init__(self, ttls=None, volatile=None):
+        self.ttls = dict(DATASET_TTLS if ttls is None else ttls)
+        self.volatile = set(VOLATILE_DATASETS if volatile is None else volatile)
+        self._entries = {}      # (dataset, key) -> (expires_at, value, loaded_at)
+        self._in_flight = {}    # (dataset, key) -> Future
+        self._lock = threading.Lock()
+
+    def get(self, dataset, loader, key=None):
+        """Returns the cached value, or calls `loader()` once to fill it."""
+        entry_key = (dataset, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] > time.monotonic():
+                get_metrics().count("cache_requests_total", dataset=dataset, result="hit")
+                return entry[1]
+            future = self._in_flight.get(entry_key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[entry_key] = Future()
+
+        get_metrics().count("cache_requests_total", dataset=dataset, result="miss" if owner else "wait")
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(entry_key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            # Don't resurrect an entry that was invalidated while we were loading
+            if self._in_flight.pop(entry_key, None) is future:
+                self._entries[entry_key] = (time.monotonic() + self.ttls.get(dataset, 0), value, time.time())
+        future.set_result(value)
+        return value
+
+    def loaded_at(self, dataset, key=None):
+        """Returns when the cached value was loaded (epoch seconds), or None if there isn't one."""
+        with self._lock:
+            entry = self._entries.get((dataset, key))
+        return entry[2] if entry is not None else None
+
+    def get_versioned(self, dataset, key, version, loader):
+        """
+        Like `get`, for values derived from a source that changes: the entry
+        is tagged with `version` (e.g. the source's revision) and replaced,
+        rather than kept alongside, once a caller asks for a different one.
+        """
+        load = lambda: (version, loader())
+        computed_from, value = self.get(dataset, load, key=key)
+        if computed_from != version:
+            self.invalidate(dataset, key)
+            computed_from, value = self.get(dataset, load, key=key)
+        return value
+
+    def invalidate(self, dataset=None, key=None):
+        """Drops one entry, one whole dataset, or (with no arguments) everything."""
+        with self._lock:
+            for entry_key in list(self._entries) + list(self._in_flight):
+                if dataset is not None and entry_key[0] != dataset:
+                    continue
+                if key is not None and entry_key[1] != key:
+                    continue
+                self._entries.pop(entry_key, None)
+                self._in_flight.pop(entry_key, None)
+
+    def invalidate_volatile(self, key=None):
+        """Drops the datasets that change during a week, for one league key or all of them."""
+        for dataset in self.volatile:
+            self.invalidate(dataset, key)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_shared_cache():
+    """Returns the process-wide cache (created on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SharedCache()
+        return _cache
@@ -0,0 +1,176 @@
+# Standard library
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party libraries
+import requests
+
+# Local modules
+from metrics import get_metrics
+
+# Status codes worth retrying (rate limited or the upstream is having a bad moment)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Requests per second (and burst size) allowed per upstream host
+DEFAULT_RATE_LIMITS = {
+    "yahoo": (10.0, 20),
+    "nba": (2.0, 2),
+}
+
+
+class RetryableHTTPError(requests.HTTPError):
+    """Raised for responses that should be retried after a backoff."""
+
+
+def raise_for_retryable_status(response, *args, **kwargs):
+    """
+    `requests` response hook. Yahoo's client turns every non-200 into a bare
+    RuntimeError, so we raise first for throttling/5xx to keep the status code.
+    """
+    if response.status_code in RETRY_STATUSES:
+        raise RetryableHTTPError(f"{response.status_code} from {response.url}", response=response)
+    return response
+
+
+def is_retryable(exc):
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in RETRY_STATUSES
+
+
+class RateLimiter:
+    """Token bucket: `rate` calls per second with bursts of up to `burst` calls."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise TimeoutError("Rate limit wait would pass the batch deadline")
+            time.sleep(wait)
+
+
+class FetchExecutor:
+    """
+    Runs independent upstream calls on a shared thread pool.
+
+    - `run`/`map`/`call` are for leaf calls that hit an API: capped at `max_workers` at a time,
+      rate limited per host, retried with jittered backoff on 429/5xx.
+    - `gather` is for fanning out whole loaders (which may `run` their own calls)
+      on a separate pool so nested batches can't starve each other.
+
+    Both take a deadline for the whole batch and return results in call order.
+    """
+
+    def __init__(self, max_workers=8, rate_limits=None, max_retries=3,
+                 base_delay=0.5, max_delay=8.0, batch_timeout=60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batch_timeout = batch_timeout
+        self._limiters = {host: RateLimiter(rate, burst)
+                          for host, (rate, burst) in (rate_limits or DEFAULT_RATE_LIMITS).items()}
+        self._fetch_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._task_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="loader")
+
+    def run(self, calls, host="yahoo", timeout=None, endpoint="call"):
+        deadline = time.monotonic() + (timeout or self.batch_timeout)
+        futures = [self._fetch_pool.submit(self._call_with_retry, call, host, deadline, endpoint) for call in calls]
+        return self._collect(futures, deadline)
+
+    def call(self, fn, *args, host="yahoo", timeout=None, endpoint=None, **kwargs):
+        """Runs a single upstream call on the calling thread, with rate limiting and retries."""
+        deadline = time.monotonic() + (timeout or self.batch_timeout)
+        return self._call_with_retry(lambda: fn(*args, **kwargs), host, deadline, endpoint or _endpoint_name(fn))
+
+    def map(self, fn, items, host="yahoo", timeout=None, endpoint=None):
+        return self.run([lambda item=item: fn(item) for item in items], host=host, timeout=timeout,
+                        endpoint=endpoint or _endpoint_name(fn))
+
+    def gather(self, calls, timeout=None):
+        deadline = time.monotonic() + (timeout or self.batch_timeout)
+        futures = [self._task_pool.submit(call) for call in calls]
+        return self._collect(futures, deadline)
+
+    def shutdown(self):
+        self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+        self._task_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _collect(self, futures, deadline):
+        try:
+            return [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def _call_with_retry(self, call, host, deadline, endpoint="call"):
+        metrics = get_metrics()
+        limiter = self._limiters.get(host)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                waited = time.perf_counter()
+                limiter.acquire(deadline)
+                metrics.observe("rate_limit_wait_seconds", time.perf_counter() - waited, host=host)
+            started = time.perf_counter()
+            try:
+                result = call()
+            except Exception as e:
+                metrics.observe("upstream_seconds", time.perf_counter() - started, host=host, endpoint=endpoint)
+                if attempt >= self.max_retries or not is_retryable(e):
+                    metrics.count("upstream_calls_total", host=host, endpoint=endpoint, outcome="error")
+                    raise
+                delay = self._backoff(attempt, e)
+                if time.monotonic() + delay > deadline:
+                    metrics.count("upstream_calls_total", host=host, endpoint=endpoint, outcome="error")
+                    raise
+                metrics.count("upstream_calls_total", host=host, endpoint=endpoint, outcome="retry")
+                time.sleep(delay)
+                attempt += 1
+            else:
+                metrics.observe("upstream_seconds", time.perf_counter() - started, host=host, endpoint=endpoint)
+                metrics.count("upstream_calls_total", host=host, endpoint=endpoint, outcome="ok")
+                return result
+
+    def _backoff(self, attempt, exc):
+        # Honor Retry-After when the server sends one, otherwise exponential with jitter
+        response = getattr(exc, "response", None)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.max_delay, float(retry_after))
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def _endpoint_name(fn):
+    # lg.matchups -> "matchups", playergamelog.PlayerGameLog -> "PlayerGameLog"; lambdas need endpoint=
+    name = getattr(fn, "__name__", "call")
+    return "call" if name == "<lambda>" else name
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_fetch_executor():
+    """Returns the process-wide executor (created on first use)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = FetchExecutor()
+        return _executor
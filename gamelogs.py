@@ -0,0 +1,136 @@
+"""
+Incremental local warehouse of NBA player game logs.
+
+Each player is fetched from `playergamelog` once; after that only games newer
+than the last stored GAME_DATE are requested, and not more often than every
+SYNC_INTERVAL seconds. Comparisons read straight from the local store.
+
+    python gamelogs.py backfill            # preload every active player's season
+    python gamelogs.py backfill 2023-24
+"""
+# Standard library
+import datetime
+import os
+import sys
+import threading
+import time
+
+# Third-party libraries
+import pandas as pd
+
+# Local modules
+from fetch import get_fetch_executor
+from metrics import timed
+from store import GAME_LOG_STATS, GameLogStore
+from transport import install_nba_session
+
+# NBA seasons start in October and are named after both years, e.g. "2024-25"
+SEASON_START_MONTH = 10
+
+
+def season_label(start_year):
+    """Returns the name of the season starting in `start_year` (2024 -> "2024-25")."""
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
+
+def current_season(today=None):
+    """Returns the season in progress on `today` (the one that just ended, in the summer)."""
+    today = today or datetime.date.today()
+    return season_label(today.year if today.month >= SEASON_START_MONTH else today.year - 1)
+
+
+# Decided at startup (override with NBA_SEASON)
+SEASON = os.getenv("NBA_SEASON") or current_season()
+SEASON_TYPE = "Regular Season"
+
+# Games happen at most once a day, so there's no point asking more often than this
+SYNC_INTERVAL = 3 * 3600
+
+
+_game_log_store = None
+_game_log_store_lock = threading.Lock()
+
+def get_game_log_store():
+    """Returns the process-wide game log store (created on first use)."""
+    global _game_log_store
+    with _game_log_store_lock:
+        if _game_log_store is None:
+            _game_log_store = GameLogStore()
+        return _game_log_store
+
+
+def _normalize(df, player_id=None):
+    """Puts a playergamelog/leaguegamelog frame into the store's column layout."""
+    df = df.rename(columns={"Player_ID": "PLAYER_ID", "Game_ID": "GAME_ID"})
+    if player_id is not None:
+        df["PLAYER_ID"] = player_id
+    # playergamelog uses "APR 13, 2025", leaguegamelog uses "2025-04-13"
+    df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"], format="mixed", errors="coerce")
+    return df[["PLAYER_ID", "GAME_ID", "GAME_DATE", "MATCHUP", "WL"] + GAME_LOG_STATS]
+
+
+def sync_player(player_id, season=SEASON, store=None, force=False):
+    """
+    Appends any games the store doesn't have yet for one player. Skips the API
+    call entirely if the player was synced within SYNC_INTERVAL.
+    """
+    from nba_api.stats.endpoints import playergamelog
+
+    install_nba_session()
+    store = store or get_game_log_store()
+    last_synced = store.last_synced(player_id, season)
+    if not force and last_synced is not None and time.time() - last_synced < SYNC_INTERVAL:
+        return 0
+
+    # Resume from the last stored game day (re-fetching it is harmless; duplicates are skipped)
+    last_date = store.last_game_date(player_id, season)
+    date_from = datetime.date.fromisoformat(last_date).strftime("%m/%d/%Y") if last_date else ""
+
+    gamelog = get_fetch_executor().call(
+        playergamelog.PlayerGameLog, host="nba", player_id=player_id, season=season,
+        season_type_all_star=SEASON_TYPE, date_from_nullable=date_from)
+    added = store.append(season, _normalize(gamelog.get_data_frames()[0], player_id))
+    store.mark_synced([player_id], season)
+    return added
+
+
+@timed("gamelogs.sync_players")
+def sync_players(player_ids, season=SEASON, store=None):
+    """Syncs the players that are due, side by side. Returns the number of games added."""
+    store = store or get_game_log_store()
+    return sum(get_fetch_executor().gather([lambda player_id=player_id: sync_player(player_id, season, store)
+                                            for player_id in player_ids]))
+
+
+@timed("gamelogs.backfill")
+def backfill(season=SEASON, store=None):
+    """
+    Preloads every player's games for a season with one `leaguegamelog` call,
+    then marks all active players as synced.
+    """
+    from nba_api.stats.endpoints import leaguegamelog
+    from nba_api.stats.static import players
+
+    install_nba_session()
+    store = store or get_game_log_store()
+    # One big response for the whole league, so give it longer than the usual 30s
+    league_log = get_fetch_executor().call(
+        lambda: leaguegamelog.LeagueGameLog(season=season, season_type_all_star=SEASON_TYPE,
+                                            player_or_team_abbreviation="P", timeout=120),
+        host="nba", timeout=600, endpoint="LeagueGameLog")
+    df = _normalize(league_log.get_data_frames()[0])
+    added = store.append(season, df)
+
+    active_ids = {p["id"] for p in players.get_players() if p["is_active"]}
+    store.mark_synced(active_ids | set(df["PLAYER_ID"].astype(int)), season)
+    store.mark_backfilled(season)
+    return added
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "backfill":
+        sys.exit(__doc__)
+    season = sys.argv[2] if len(sys.argv) > 2 else SEASON
+    start = time.perf_counter()
+    added = backfill(season)
+    print(f"✅ Added {added} games for {season} in {time.perf_counter() - start:.1f}s")
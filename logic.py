@@ -1,31 +1,16 @@
 # Standard library
-import datetime
-import json
-import os
-import random
-import subprocess
+import threading
 from collections import Counter
 
 # Third-party libraries
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import seaborn as sns
-from yahoo_oauth import OAuth2
-import yahoo_fantasy_api as yfa
-
-team_ids = {'454.l.74601.t.1': "Sam's Swag Team",
-            '454.l.74601.t.2': "Doomenshmirtz Evil Inc.",
-            '454.l.74601.t.3': "Chunch's Challengers",
-            '454.l.74601.t.4': "Han Da Dons",
-            '454.l.74601.t.5': "Tyshiii",
-            '454.l.74601.t.6': "Neal's Fascinating Team",
-            '454.l.74601.t.7': "Driton's Dazzling Team",
-            '454.l.74601.t.8': "ariel's Wonderful Team",
-            '454.l.74601.t.9': "THE REAL MIAMI HEAT",
-            '454.l.74601.t.10': "darius"}
+
+# Local modules
+from auth import KEYPAIR_PATH, get_token_manager
+from fetch import get_fetch_executor
+from metrics import timed
+from store import WeekStore, is_week_final
 
 # Define stat labels
 stat_labels = {
@@ -42,158 +27,194 @@ stat_labels = {
     '19': 'TO'
 }
 
-def authenticate_yahoo_api(path = "/etc/secrets/keypair.json"):
-    # Load keypair.json
-    keypair_file_path = path
-    
-    if os.path.exists(keypair_file_path):
-        with open(keypair_file_path, "r") as f:
-            keypair = json.load(f)
-    else:
-        raise FileNotFoundError(f"Secret file {keypair_file_path} not found.")
-    
-    # Manually initialize OAuth2 with token_time & token_type to prevent verifier request
+@timed("logic.authenticate")
+def authenticate_yahoo_api(path = KEYPAIR_PATH, league_id = None):
+    """
+    Returns the league object for `league_id` (default: the account's first
+    league), shared by the whole process. The first call logs in; after that
+    the token manager keeps the token fresh in the background.
+    """
+    return get_token_manager(path).league(league_id)
+
+def get_league_names(path = KEYPAIR_PATH):
+    """Returns {league key: league name} for every league on the account."""
+    manager = get_token_manager(path)
+    league_ids = manager.league_ids()
+    settings = get_fetch_executor().map(lambda league_id: manager.league(league_id).settings(), league_ids,
+                                        endpoint="settings")
+    return {league_id: league_settings.get("name", league_id) for league_id, league_settings in zip(league_ids, settings)}
+
+# Columns produced by parse_scoreboard, in display order
+info_columns = ["week", "team_key", "team_id", "name", "remaining_games", "live_games", "completed_games"]
+stat_categories = ['FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
+
+# Columns that are strings in the payload (the rest are parsed as numbers)
+text_columns = {"team_key", "name", "FGM/A", "FTM/A"}
+
+def _to_number(value):
     try:
-        sc = OAuth2(
-            keypair["consumer_key"], 
-            keypair["consumer_secret"], 
-            access_token=keypair["access_token"], 
-            refresh_token=keypair["refresh_token"],
-            token_time=keypair["token_time"],
-            token_type=keypair["token_type"]
-        )
-    
-        # Refresh token if expired
-        if not sc.token_is_valid():
-            print("🔄 Refreshing expired token...")
-            sc.refresh_access_token()
-    
-            # Save the updated token
-            with open(keypair_file_path, "w") as f:
-                json.dump(sc.credentials, f)
-            print("✅ Token refreshed and saved!")
-    except Exception as e:
-        raise RuntimeError(f"OAuth authentication failed: {str(e)}")
-
-     # get game object
-    gm = yfa.Game(sc, 'nba')
-    
-    # get league ids (could be multiple if you're in more than 1)
-    leagues = gm.league_ids()
-    
-    # get the league object
-    lg = gm.to_league(leagues[0])
-
-    return lg
-    
-# grabs everyone's stats and data regarding week n using the matchups function
-def overall_weekly_matchup_stats(lg, week_num):
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+@timed("logic.parse_scoreboard")
+def parse_scoreboard(matchups):
     """
-    Fetches and processes weekly matchup stats from Yahoo Fantasy API.
-    Returns a DataFrame with structured data for all teams in that week.
+    Walks a scoreboard payload (lg.matchups) once and fills preallocated column
+    arrays, one row per team. Rows come in matchup order, two per matchup, so
+    rows 2k and 2k+1 played each other. Returns an unranked DataFrame; see
+    rank_weekly_stats.
     """
-    
-    matchups = lg.matchups(week=week_num)
-    matchup_keys = list(matchups['fantasy_content']['league'][1]['scoreboard']['0']['matchups'].keys())
+    matchup_data = matchups['fantasy_content']['league'][1]['scoreboard']['0']['matchups']
+    matchup_keys = [key for key in matchup_data if key != 'count']
 
-    temp = []
+    columns = info_columns + list(stat_labels.values())
+    n_rows = 2 * len(matchup_keys)
+    arrays = {col: np.empty(n_rows, dtype=object) if col in text_columns else np.full(n_rows, np.nan)
+              for col in columns}
 
+    row = 0
     for key in matchup_keys:
-        if key != 'count':
-            t1 = matchups['fantasy_content']['league'][1]['scoreboard']['0']['matchups'][str(key)]['matchup']['0']['teams']['1']['team']
-            t2 = matchups['fantasy_content']['league'][1]['scoreboard']['0']['matchups'][str(key)]['matchup']['0']['teams']['0']['team']
-            temp.append(t1)
-            temp.append(t2)
-
-    list_of_dfs = []
-
-    for i in range(len(temp)):
-        data = temp[i]
-        # Initialize the output dictionary with relevant columns
-        output = {
-            "week": None,
-            "team_key": None,
-            "team_id": None,
-            "name": None,
-            "remaining_games": None,
-            "live_games": None,
-            "completed_games": None
-        }
-
-        # Populate the dictionary
-        team_stats_dict = {label: None for label in stat_labels.values()}
-
-        for item in data[0]:
-            # Extract flat fields
-            if "team_key" in item:
-                output["team_key"] = item["team_key"]
-            if "team_id" in item:
-                output["team_id"] = item["team_id"]
-            if "name" in item:
-                output["name"] = item["name"]
-
-        for item in data:
-            if isinstance(item, dict):
-                # Extract nested fields
+        teams = matchup_data[key]['matchup']['0']['teams']
+        for side in ('1', '0'):
+            data = teams[side]['team']
+
+            for item in data[0]:
+                if "team_key" in item:
+                    arrays["team_key"][row] = item["team_key"]
+                if "team_id" in item:
+                    arrays["team_id"][row] = _to_number(item["team_id"])
+                if "name" in item:
+                    arrays["name"][row] = item["name"]
+
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
                 if "team_stats" in item:
-                    output["week"] = item['team_stats']["week"]
+                    arrays["week"][row] = _to_number(item['team_stats']["week"])
                     for stat in item["team_stats"]["stats"]:
-                        stat_id = stat["stat"]["stat_id"]
-                        if stat_id in stat_labels:
-                            team_stats_dict[stat_labels[stat_id]] = stat["stat"]["value"]
+                        label = stat_labels.get(stat["stat"]["stat_id"])
+                        if label in text_columns:
+                            arrays[label][row] = stat["stat"]["value"]
+                        elif label is not None:
+                            arrays[label][row] = _to_number(stat["stat"]["value"])
                 if "team_remaining_games" in item:
-                    output["remaining_games"] = item["team_remaining_games"]["total"]["remaining_games"]
-                    output["live_games"] = item["team_remaining_games"]["total"]["live_games"]
-                    output["completed_games"] = item["team_remaining_games"]["total"]["completed_games"]
-
-        # Merge team stats into output dictionary
-        output.update(team_stats_dict)
-
-        # Convert to a single-row DataFrame
-        df = pd.DataFrame([output])
-        list_of_dfs.append(df)
+                    totals = item["team_remaining_games"]["total"]
+                    arrays["remaining_games"][row] = _to_number(totals["remaining_games"])
+                    arrays["live_games"][row] = _to_number(totals["live_games"])
+                    arrays["completed_games"][row] = _to_number(totals["completed_games"])
+            row += 1
+
+    # Whole-number columns become ints (like pd.to_numeric would), unless something is missing
+    for col, values in arrays.items():
+        if col not in text_columns and col not in ('FG%', 'FT%') and n_rows:
+            if not np.isnan(values).any() and (values == np.round(values)).all():
+                arrays[col] = values.astype(np.int64)
+
+    return pd.DataFrame(arrays, columns=columns)
+
+@timed("logic.rank_weekly_stats")
+def rank_weekly_stats(df):
+    """
+    Adds the per-category `_Rank` columns, `Aggregate Rank` and `Adjusted_Rank`
+    for every week in one grouped pass (lower is better for TO, higher for the
+    rest). Rows come back sorted by week, then Adjusted_Rank.
+    """
+    by_week = df.groupby('week', sort=False, dropna=False)
+    higher_is_better = [cat for cat in stat_categories if cat != 'TO']
 
-    # Concatenate them vertically
-    result = pd.concat(list_of_dfs, ignore_index=True)
+    ranks = by_week[higher_is_better].rank(ascending=False)
+    ranks['TO'] = by_week['TO'].rank(ascending=True)
+    ranks = ranks[stat_categories]
+    ranks.columns = [cat + '_Rank' for cat in stat_categories]
 
-    # Convert relevant columns to numeric types
-    categories = ['week', 'team_id', 'remaining_games', 'live_games', 'completed_games',
-                  'FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
+    result = df.copy()
+    result[list(ranks.columns)] = ranks
 
-    for col in categories:
-        result[col] = pd.to_numeric(result[col], errors='coerce')
+    # Sum the ranks to get a total score (lower total rank is better), then rank that within the week
+    result['Aggregate Rank'] = ranks.sum(axis=1)
+    result['Adjusted_Rank'] = result.groupby('week', sort=False, dropna=False)['Aggregate Rank'].rank(
+        ascending=True, method='min').astype(int)
 
-    stat_categories = ['FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
+    return result.sort_values(by=['week', 'Adjusted_Rank'], kind='stable', ignore_index=True)
 
-    # Rank each team within each category (lower is better for TO, higher is better for others)
-    for category in stat_categories:
-        if category == 'TO':  # Reverse ranking for TO since lower is better
-            result[category + '_Rank'] = result[category].rank(ascending=True)
-        else:
-            result[category + '_Rank'] = result[category].rank(ascending=False)
+# grabs everyone's stats and data regarding week n using the matchups function
+def overall_weekly_matchup_stats(lg, week_num):
+    """
+    Fetches and processes weekly matchup stats from Yahoo Fantasy API.
+    Returns a DataFrame with structured data for all teams in that week.
+    """
+    return rank_weekly_stats(parse_scoreboard(lg.matchups(week=week_num)))
 
-    # Sum the ranks to get a total score (lower total rank is better)
-    result['Aggregate Rank'] = result[[cat + '_Rank' for cat in stat_categories]].sum(axis=1)
+_week_store = None
+_week_store_lock = threading.Lock()
 
-    # Create a new column 'Adjusted_Rank' by ranking the 'Aggregate Rank' column
-    result['Adjusted_Rank'] = result['Aggregate Rank'].rank(ascending=True, method='min')
+def get_week_store():
+    """Returns the process-wide store of finalized weeks (created on first use)."""
+    global _week_store
+    with _week_store_lock:
+        if _week_store is None:
+            _week_store = WeekStore()
+        return _week_store
 
-    # Convert the ranks to integers
-    result['Adjusted_Rank'] = result['Adjusted_Rank'].astype(int)
+@timed("logic.get_season_scoreboards")
+def get_season_scoreboards(lg, store=None):
+    """
+    Returns the unranked parse_scoreboard rows for every week of the season so
+    far, week by week in matchup order. Finalized weeks are read from the local
+    store; the weeks that can still change are fetched from the Yahoo API in
+    parallel.
+    """
+    store = store or get_week_store()
+    curr_week_num = lg.current_week()
+    stored_weeks = set(store.weeks(lg.league_id))
 
-    # Sort teams by their total rank
-    result = result.sort_values(by='Adjusted_Rank')
-    
-    return result
+    missing_weeks = [i for i in range(1, curr_week_num + 1) if i not in stored_weeks]
+    payloads = get_fetch_executor().map(lambda i: lg.matchups(week=i), missing_weeks, endpoint="matchups")
+    fetched = {i: parse_scoreboard(payload) for i, payload in zip(missing_weeks, payloads)}
 
-def get_full_season_stats(lg):
-    curr_week_num = lg.current_week()
-    weekly_stats = [overall_weekly_matchup_stats(lg, i) for i in range(1, curr_week_num + 1)]
-    final = pd.concat(weekly_stats, ignore_index=True)
-    return final
+    weekly_stats = []
+    for i in range(1, curr_week_num + 1):
+        if i in stored_weeks:
+            weekly_stats.append(store.load_week(lg.league_id, i))
+            continue
+        week_df = fetched[i]
+        if is_week_final(week_df, curr_week_num):
+            store.save_week(lg.league_id, i, week_df)
+        weekly_stats.append(week_df)
+
+    return pd.concat(weekly_stats, ignore_index=True)
+
+def get_stored_scoreboards(league_key, store=None):
+    """Returns the unranked rows of the finalized weeks in the local store, or None if there are none."""
+    store = store or get_week_store()
+    weeks = store.weeks(league_key)
+    if not weeks:
+        return None
+    return pd.concat([store.load_week(league_key, week) for week in weeks], ignore_index=True)
+
+def get_full_season_stats(lg, store=None):
+    """Returns every week of the season so far, ranked (see rank_weekly_stats)."""
+    # Rank every week at once instead of week by week
+    return rank_weekly_stats(get_season_scoreboards(lg, store))
+
+def rebuild_week(lg, week_num, store=None):
+    """
+    Re-fetches one week from Yahoo and overwrites the stored copy (e.g. after a
+    stat correction). Returns the fresh DataFrame.
+    """
+    store = store or get_week_store()
+    # Fetch before touching the store, so a failed call keeps the stored copy
+    week_df = parse_scoreboard(lg.matchups(week=week_num))
+    if is_week_final(week_df, lg.current_week()):
+        store.save_week(lg.league_id, week_num, week_df)  # replaces the old copy in one statement
+    else:
+        store.delete_week(lg.league_id, week_num)
+    return rank_weekly_stats(week_df)
 
+@timed("logic.get_standings")
 def get_standings(lg):
-    df = pd.DataFrame(lg.standings())
+    df = pd.DataFrame(get_fetch_executor().call(lg.standings))
     outcome_df = pd.json_normalize(df['outcome_totals'])
     standings = pd.concat([df.drop(columns=['outcome_totals', 'team_key']), outcome_df], axis=1)
     return standings
@@ -221,39 +242,63 @@ def extract_stat_winners(data):
 
     return results
 
+def _scoreboard_team_names(scoreboard):
+    """{team_key: name} for every team on a scoreboard, in matchup order."""
+    names = {}
+    for key, matchup in scoreboard.get("0", {}).get("matchups", {}).items():
+        if key == "count":
+            continue
+        teams = matchup["matchup"]["0"]["teams"]
+        for side in ("0", "1"):
+            info = {k: v for item in teams[side]["team"][0] if isinstance(item, dict) for k, v in item.items()}
+            names[info["team_key"]] = info["name"]
+    return names
+
+@timed("logic.get_matchups_df")
 def get_matchups_df(lg):
     curr_week_num = lg.current_week()
-    matchups = lg.matchups(week=curr_week_num)
+    matchups = get_fetch_executor().call(lg.matchups, week=curr_week_num)
     test1 = matchups['fantasy_content']['league'][1]['scoreboard']
     matchup_winners = extract_stat_winners(test1)  # Example usage
-    
+    # Team names come with the scoreboard, so they're right for whichever league this is
+    team_names = _scoreboard_team_names(test1)
+    team_keys = list(team_names)
+
     # Flatten matchup_winners into a list of dictionaries
     flat_matchup_winners = []
-    for matchup_id, winners in matchup_winners.items():
-        teams = list(winners.keys())
-        scores = list(winners.values())
-    
+    for i, (matchup_id, winners) in enumerate(matchup_winners.items()):
+        # Both teams, even one that hasn't won a category yet
+        teams = team_keys[2 * i:2 * i + 2]
+        scores = [winners.get(team, 0) for team in teams]
+
         if scores[0] >= scores[1]:
             team_a, team_b = teams[0], teams[1]
             score_a, score_b = scores[0], scores[1]
         else:
             team_a, team_b = teams[1], teams[0]
             score_a, score_b = scores[1], scores[0]
-    
+
         winner = team_a if score_a > score_b else "Tie"
-    
+
         flat_matchup_winners.append({
-            "Matchup": f"{team_ids[team_a]} vs. {team_ids[team_b]}",
+            "Matchup": f"{team_names[team_a]} vs. {team_names[team_b]}",
             "Score": f"{score_a} - {score_b}",
-            "Lead": team_ids[winner] if winner != "Tie" else "Tie"
+            "Lead": team_names[winner] if winner != "Tie" else "Tie"
         })
-    
+
     df_matchups = pd.DataFrame(flat_matchup_winners)
     return df_matchups
 
 
-def get_team_logos(lg, team_ids):
-    logos = {team_name: lg.to_team(key).details()["team_logos"][0]["team_logo"]["url"]
-        for key, team_name in team_ids.items()}
+@timed("logic.get_teams")
+def get_teams(lg):
+    """Returns lg.teams(): {team_key: team details}, logos included, in one call."""
+    return get_fetch_executor().call(lg.teams)
+
+@timed("logic.get_team_logos")
+def get_team_logos(lg):
+    # lg.teams() carries every team's logo, so one call covers the whole league
+    teams = get_teams(lg)
+    logos = {team["name"]: team["team_logos"][0]["team_logo"]["url"] for team in teams.values()}
     team_logos = pd.DataFrame(logos.items(), columns=["Team", "Logo URL"])
     return team_logos
@@ -0,0 +1,220 @@
+# Standard library
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prometheus HELP text for the metric families the app records
+DESCRIPTIONS = {
+    "span_seconds": "Time spent in an instrumented phase.",
+    "upstream_seconds": "Latency of one upstream API attempt.",
+    "upstream_calls_total": "Upstream API attempts by outcome (ok, retry, error).",
+    "rate_limit_wait_seconds": "Time spent waiting on the per-host rate limiter.",
+    "cache_requests_total": "Shared cache lookups by result (hit, miss, wait).",
+    "http_cache_requests_total": "Cacheable upstream GETs by result (hit = 304 served from disk, miss).",
+    "http_bytes_received_total": "Upstream response bytes on the wire.",
+    "http_bytes_saved_total": "Upstream response bytes not transferred, by reason (not_modified, compression).",
+    "thumbnail_requests_total": "Thumbnail lookups by where they were served from (memory, disk, fetched, failed).",
+    "section_seconds": "Time to load one progressively rendered page section, by outcome (ok, timeout, error).",
+    "time_to_first_content_seconds": "Time from the start of a page render until its first section is on screen.",
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram: a count per bucket plus sum, count and max."""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "max", "_lock")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolated within its bucket."""
+        with self._lock:
+            counts, total, maximum = list(self.counts), self.count, self.max
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                low = self.buckets[index - 1] if index > 0 else 0.0
+                high = self.buckets[index] if index < len(self.buckets) else maximum
+                return min(low + (high - low) * (rank - seen) / bucket_count, maximum)
+            seen += bucket_count
+        return maximum
+
+
+class _Span:
+    # Context manager that records its own duration; __slots__ keeps it cheap to create
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end()
+        return False
+
+    def end(self):
+        """Stops the span (for phases that can't be wrapped in a `with`)."""
+        if self.start is not None:
+            self.metrics._histogram(self.key).observe(time.perf_counter() - self.start)
+            self.start = None
+
+
+class Metrics:
+    """
+    In-process counters and histograms, cheap enough to leave on: recording is
+    a dict lookup, a bisect and one uncontended lock. Metric families are keyed
+    by name plus a sorted tuple of label pairs.
+    """
+
+    def __init__(self, prefix="dashboard", buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.started_at = time.time()
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}    # (name, labels) -> float
+        self._lock = threading.Lock()
+
+    def _histogram(self, key):
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, name, value, **labels):
+        self._histogram((name, tuple(sorted(labels.items())))).observe(value)
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def span(self, name, **labels):
+        """Times a phase into span_seconds{span=name, ...}: `with metrics.span("logic.parse"):`"""
+        return _Span(self, ("span_seconds", tuple(sorted({"span": name, **labels}.items()))))
+
+    def start_span(self, name, **labels):
+        """Starts a span now; call `.end()` on it when the phase is over."""
+        return self.span(name, **labels).__enter__()
+
+    def counter_series(self, name):
+        """Returns [(labels dict, value)] for every series of one counter."""
+        with self._lock:
+            return [(dict(labels), value) for (series, labels), value in self._counters.items() if series == name]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    def histograms(self):
+        """Rows for display: one per histogram series, with count, mean and quantiles in seconds."""
+        with self._lock:
+            items = sorted(self._histograms.items())
+        rows = []
+        for (name, labels), histogram in items:
+            rows.append({
+                "metric": name,
+                "labels": ", ".join(f"{key}={value}" for key, value in labels),
+                "count": histogram.count,
+                "total_s": histogram.sum,
+                "mean_ms": 1000 * histogram.sum / histogram.count if histogram.count else 0.0,
+                "p50_ms": 1000 * histogram.quantile(0.5),
+                "p95_ms": 1000 * histogram.quantile(0.95),
+                "max_ms": 1000 * histogram.max,
+            })
+        return rows
+
+    def counters(self):
+        """Rows for display: one per counter series."""
+        with self._lock:
+            items = sorted(self._counters.items())
+        return [{"metric": name, "labels": ", ".join(f"{key}={value}" for key, value in labels), "value": value}
+                for (name, labels), value in items]
+
+    def to_prometheus(self):
+        """All series in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        def family(name, kind):
+            full = f"{self.prefix}_{name}"
+            if name in DESCRIPTIONS:
+                lines.append(f"# HELP {full} {DESCRIPTIONS[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        current = None
+        for (name, labels), histogram in histograms:
+            if name != current:
+                full, current = family(name, "histogram"), name
+            with histogram._lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip(list(histogram.buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f"{full}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{full}_sum{_labels(labels)} {total}")
+            lines.append(f"{full}_count{_labels(labels)} {count}")
+
+        current = None
+        for (name, labels), value in counters:
+            if name != current:
+                full, current = family(name, "counter"), name
+            lines.append(f"{full}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+_metrics = Metrics()
+
+def get_metrics():
+    """Returns the process-wide metrics registry."""
+    return _metrics
+
+
+def timed(name):
+    """Decorator that records every call of the function as a span."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _metrics.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,181 @@
+# Standard library
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Third-party libraries
+import numpy as np
+import pandas as pd
+
+# Local modules
+from logic import stat_categories
+from metrics import timed
+
+# Stats simulated per remaining game (FGM/FTM are drawn from the simulated attempts)
+COUNT_STATS = ["FGA", "FTA", "3PTM", "PTS", "REB", "AST", "STL", "BLK", "TO"]
+
+# Season-to-date rates count as this many games of evidence, so the first days of a week aren't noise
+PRIOR_GAMES = 10
+
+# Simulations are drawn in chunks of this size to keep memory flat; past PARALLEL_THRESHOLD
+# the chunks are spread over worker processes
+CHUNK_SIZE = 25_000
+PARALLEL_THRESHOLD = 200_000
+
+
+def _split_made_attempted(values):
+    made_attempted = values.astype(str).str.split("/", expand=True)
+    made = pd.to_numeric(made_attempted[0], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    attempted = pd.to_numeric(made_attempted[1], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+    return made, attempted
+
+
+def _team_totals(df):
+    """Returns {stat: array per row} of the raw totals needed for simulation."""
+    totals = {}
+    totals["FGM"], totals["FGA"] = _split_made_attempted(df["FGM/A"])
+    totals["FTM"], totals["FTA"] = _split_made_attempted(df["FTM/A"])
+    for stat in ["3PTM", "PTS", "REB", "AST", "STL", "BLK", "TO"]:
+        totals[stat] = df[stat].fillna(0).to_numpy(dtype=np.float64)
+    return totals
+
+
+def build_projection_inputs(week_df, season_df=None):
+    """
+    Per-team inputs for the simulation from an unranked parse_scoreboard frame
+    (rows in matchup order, two per matchup). Rates blend this week's per-game
+    numbers with season-to-date ones from `season_df` when it's given.
+    """
+    current = _team_totals(week_df)
+    completed = week_df["completed_games"].fillna(0).to_numpy(dtype=np.float64)
+    remaining = week_df["remaining_games"].fillna(0).to_numpy(dtype=np.float64)
+
+    prior_totals, prior_games = None, np.zeros(len(week_df))
+    if season_df is not None:
+        week = week_df["week"].iloc[0]
+        past = season_df[season_df["week"] < week]
+        if not past.empty:
+            past_totals = _team_totals(past)
+            keys = past["team_key"].to_numpy()
+            by_team = {stat: pd.Series(values).groupby(keys).sum() for stat, values in past_totals.items()}
+            games = pd.Series(past["completed_games"].fillna(0).to_numpy()).groupby(keys).sum()
+            team_keys = week_df["team_key"]
+            prior_games = team_keys.map(games).fillna(0).to_numpy(dtype=np.float64)
+            prior_totals = {stat: team_keys.map(series).fillna(0).to_numpy(dtype=np.float64)
+                            for stat, series in by_team.items()}
+
+    weight = np.where(prior_games > 0, PRIOR_GAMES, 0.0)
+    rates = {}
+    for stat in COUNT_STATS:
+        prior_rate = prior_totals[stat] / np.maximum(prior_games, 1) if prior_totals else 0.0
+        rates[stat] = (current[stat] + weight * prior_rate) / np.maximum(completed + weight, 1)
+
+    def blended_pct(made, attempted):
+        # Season-to-date shooting counts as PRIOR_GAMES games' worth of attempts
+        made_total, attempted_total = current[made].copy(), current[attempted].copy()
+        if prior_totals:
+            prior_attempts = weight * prior_totals[attempted] / np.maximum(prior_games, 1)
+            made_total += prior_attempts * prior_totals[made] / np.maximum(prior_totals[attempted], 1)
+            attempted_total += prior_attempts
+        league_pct = made_total.sum() / attempted_total.sum() if attempted_total.sum() else 0.0
+        return np.where(attempted_total > 0, made_total / np.maximum(attempted_total, 1e-9), league_pct)
+
+    return {
+        "names": week_df["name"].to_numpy(),
+        "current": current,
+        "remaining": remaining,
+        "rates": rates,
+        "fg_pct": blended_pct("FGM", "FGA"),
+        "ft_pct": blended_pct("FTM", "FTA"),
+    }
+
+
+def _draw_counts(rng, mean, variance, shape):
+    # Gaussian with the count's mean and variance, rounded and floored at 0. Team-week totals
+    # are sums of many player games, so this matches Poisson/binomial draws at a fraction of the cost
+    noise = rng.standard_normal(shape, dtype=np.float32)
+    return np.maximum(np.rint(mean + np.sqrt(variance).astype(np.float32) * noise), 0)
+
+
+def _simulate_chunk(inputs, n_sims, seed):
+    """
+    Simulates the rest of the week `n_sims` times for every team at once and
+    returns win counts: (matchups,) for each side and ties, plus (matchups,
+    categories) category wins for the first team and for the second.
+    """
+    rng = np.random.default_rng(seed)
+    remaining = inputs["remaining"]
+    current = inputs["current"]
+
+    # sims x teams arrays of final week totals
+    shape = (n_sims, len(remaining))
+    final = {}
+    added = {}
+    for stat in COUNT_STATS:
+        expected = (inputs["rates"][stat] * remaining).astype(np.float32)
+        added[stat] = _draw_counts(rng, expected, expected, shape)
+        final[stat] = current[stat].astype(np.float32) + added[stat]
+    for pct, made, attempted in (("FG%", "FGM", "FGA"), ("FT%", "FTM", "FTA")):
+        p = inputs["fg_pct" if pct == "FG%" else "ft_pct"].astype(np.float32)
+        new_made = np.minimum(_draw_counts(rng, added[attempted] * p, added[attempted] * p * (1 - p), shape),
+                              added[attempted])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            final[pct] = np.where(final[attempted] > 0, (current[made] + new_made) / final[attempted], 0.0)
+
+    # sims x matchups x categories: +1 first team wins the category, -1 second team, 0 tie
+    outcome = np.stack([np.sign(final[cat][:, 0::2] - final[cat][:, 1::2]) for cat in stat_categories],
+                       axis=-1).astype(np.int8)
+    outcome[..., stat_categories.index("TO")] *= -1
+
+    first_cats = (outcome > 0).sum(axis=-1)
+    second_cats = (outcome < 0).sum(axis=-1)
+    return {
+        "first_wins": (first_cats > second_cats).sum(axis=0),
+        "second_wins": (second_cats > first_cats).sum(axis=0),
+        "ties": (first_cats == second_cats).sum(axis=0),
+        "first_cat_wins": (outcome > 0).sum(axis=0),
+        "second_cat_wins": (outcome < 0).sum(axis=0),
+        "first_cats": first_cats.sum(axis=0),
+        "second_cats": second_cats.sum(axis=0),
+    }
+
+
+def simulate_matchups(inputs, n_sims=100_000, seed=None, workers=None):
+    """
+    Runs `n_sims` simulations of the rest of the week in chunks; large runs are
+    spread over processes. Returns the summed counts from _simulate_chunk.
+    """
+    chunks = [CHUNK_SIZE] * (n_sims // CHUNK_SIZE) + ([n_sims % CHUNK_SIZE] if n_sims % CHUNK_SIZE else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    if n_sims >= PARALLEL_THRESHOLD and len(chunks) > 1:
+        workers = workers or min(len(chunks), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, [inputs] * len(chunks), chunks, seeds))
+    else:
+        results = [_simulate_chunk(inputs, size, chunk_seed) for size, chunk_seed in zip(chunks, seeds)]
+
+    return {key: sum(result[key] for result in results) for key in results[0]}
+
+
+@timed("projection.project_matchups")
+def project_matchups(week_df, season_df=None, n_sims=100_000, seed=None):
+    """
+    Monte Carlo projection of the in-progress week. Returns two DataFrames:
+    win/tie probabilities and expected category score per matchup, and each
+    category's win probability per matchup.
+    """
+    inputs = build_projection_inputs(week_df, season_df)
+    counts = simulate_matchups(inputs, n_sims=n_sims, seed=seed)
+    first, second = inputs["names"][0::2], inputs["names"][1::2]
+
+    matchups = pd.DataFrame({
+        "Matchup": [f"{a} vs. {b}" for a, b in zip(first, second)],
+        "Projected Score": [f"{a:.1f} - {b:.1f}" for a, b in
+                            zip(counts["first_cats"] / n_sims, counts["second_cats"] / n_sims)],
+        "Win %": (100 * counts["first_wins"] / n_sims).round(1),
+        "Tie %": (100 * counts["ties"] / n_sims).round(1),
+        "Loss %": (100 * counts["second_wins"] / n_sims).round(1),
+    })
+    categories = pd.DataFrame(100 * counts["first_cat_wins"] / n_sims, columns=stat_categories).round(1)
+    categories.insert(0, "Matchup", matchups["Matchup"])
+    return matchups, categories
@@ -0,0 +1,113 @@
+# Standard library
+import threading
+
+# Registered datasets: name -> (loader, names of the datasets it depends on, process-wide?)
+_providers = {}
+
+# Values of process-wide datasets, shared by every session
+_process_values = {}
+_process_lock = threading.RLock()
+
+
+def provider(name, requires=(), process_wide=False):
+    """
+    Registers a dataset loader. The loader gets its dependencies as keyword
+    arguments. Process-wide datasets are computed once per server process;
+    the rest once per page render.
+    """
+    def register(loader):
+        _providers[name] = (loader, tuple(requires), process_wide)
+        return loader
+    return register
+
+
+class PageData:
+    """
+    The datasets one page declared it needs. Nothing is loaded up front: each
+    dataset (and whatever it depends on) is computed on first access, then
+    memoized for the rest of the render. Keyword arguments are per-request
+    inputs (e.g. the league asked for) that providers can depend on by name.
+    """
+
+    def __init__(self, needs, **context):
+        self.needs = set(needs)
+        self._values = dict(context)
+
+    def __getitem__(self, name):
+        if name not in self.needs:
+            raise KeyError(f"Page didn't declare dataset '{name}' (declared: {sorted(self.needs)})")
+        return self._resolve(name)
+
+    def loaded(self):
+        """Names of the datasets this render actually computed."""
+        return set(self._values)
+
+    def _resolve(self, name):
+        if name in self._values:
+            return self._values[name]
+        loader, requires, process_wide = _providers[name]
+        if process_wide:
+            with _process_lock:
+                if name not in _process_values:
+                    _process_values[name] = loader(**{dep: self._resolve(dep) for dep in requires})
+                value = _process_values[name]
+        else:
+            value = loader(**{dep: self._resolve(dep) for dep in requires})
+        self._values[name] = value
+        return value
+
+
+# --------------- Datasets ---------------
+
+@provider("leagues")
+def _leagues():
+    # {league key: name} for every league on the account, shared by all sessions
+    from cache import get_shared_cache
+    from logic import get_league_names
+    return get_shared_cache().get("leagues", get_league_names)
+
+
+@provider("league_id", requires=["leagues", "requested_league"])
+def _league_id(leagues, requested_league):
+    # The league this request asked for, if it's one of ours; otherwise the first
+    return requested_league if requested_league in leagues else next(iter(leagues))
+
+
+@provider("scheduler", requires=["league_id"])
+def _scheduler(league_id):
+    from refresh import get_refresh_scheduler
+    return get_refresh_scheduler(league_id)
+
+
+@provider("snapshot", requires=["scheduler"])
+def _snapshot(scheduler):
+    # None before the first snapshot is published; the home page then loads its sections itself
+    return scheduler.latest()
+
+
+@provider("active_players", process_wide=True)
+def _active_players():
+    from nba_api.stats.static import players
+    return {p["full_name"]: p["id"] for p in players.get_players() if p["is_active"]}
+
+
+@provider("player_windows")
+def _player_windows():
+    from aggregates import get_window_aggregates
+    return get_window_aggregates()
+
+
+@provider("transactions", requires=["league_id"])
+def _transactions(league_id):
+    # Brings the local transaction table up to date (a no-op if synced recently);
+    # the page then queries the store. Returns why the sync failed, or None: a
+    # failed sync still leaves every transaction stored so far to render from
+    from logic import authenticate_yahoo_api
+    from transactions import sync_transactions
+
+    try:
+        sync_transactions(authenticate_yahoo_api(league_id=league_id))
+    except Exception as e:
+        print(f"⚠️ Couldn't sync transactions for {league_id}: {e}")
+        return str(e) or type(e).__name__
+    return None
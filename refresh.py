@@ -0,0 +1,256 @@
+# Standard library
+import threading
+import time
+from dataclasses import dataclass
+
+# Third-party libraries
+import pandas as pd
+
+# Local modules
+from allplay import AllPlayTracker
+from archive import archive_league_weeks, rearchive_league_week
+from cache import get_shared_cache
+from fetch import get_fetch_executor
+from logic import (
+    authenticate_yahoo_api,
+    get_season_scoreboards,
+    get_standings,
+    get_matchups_df,
+    get_team_logos,
+    rank_weekly_stats,
+    rebuild_week
+)
+from metrics import timed
+from projection import project_matchups
+from thumbnails import LOGO_SIZE, get_thumbnail_cache
+
+# Seconds between polls, picked from the state of the current week
+POLL_INTERVALS = {
+    "live": 60,            # games in progress
+    "pending": 15 * 60,    # games left this week, none on right now (e.g. overnight)
+    "final": 60 * 60,      # week is over: only check whether a new week has started
+    "error": 60,           # last refresh failed, try again soon
+}
+
+# A league nobody has looked at for this long stops polling until the next page view
+IDLE_TIMEOUT = 30 * 60
+
+# Monte Carlo runs behind each snapshot's matchup projections
+PROJECTION_SIMS = 100_000
+
+
+@dataclass(frozen=True)
+class LeagueSnapshot:
+    """
+    One complete, versioned copy of everything the home page shows. Published
+    snapshots are never modified; callers should copy a frame before editing it.
+    """
+    version: int
+    created_at: float
+    week: int
+    season: pd.DataFrame
+    standings: pd.DataFrame
+    matchups: pd.DataFrame
+    logos: pd.DataFrame
+    projections: pd.DataFrame = None
+    category_odds: pd.DataFrame = None
+    all_play: pd.DataFrame = None
+
+    def week_status(self):
+        """'live' while games are on, 'pending' while some are left, 'final' once the week is done."""
+        current = self.season[self.season["week"] == self.week]
+        if current["live_games"].fillna(0).sum() > 0:
+            return "live"
+        if current["remaining_games"].fillna(0).sum() > 0:
+            return "pending"
+        return "final"
+
+
+class RefreshScheduler:
+    """
+    Background thread that polls one league on its own schedule and publishes a
+    new LeagueSnapshot after each successful refresh. Page renders only ever
+    read `latest()`, so they never wait on Yahoo once the first snapshot exists.
+
+    Polling is fast while games are live, slow when none are on, and stops once
+    the week is final (it then only checks, hourly, for the next week to start).
+    A league nobody is viewing stops polling after IDLE_TIMEOUT; the next view
+    serves the last snapshot and wakes it up.
+    """
+
+    def __init__(self, league_id=None, cache=None, intervals=None, idle_timeout=IDLE_TIMEOUT):
+        self.league_id = league_id
+        self.cache = cache or get_shared_cache()
+        self.intervals = dict(POLL_INTERVALS if intervals is None else intervals)
+        self.idle_timeout = idle_timeout
+        self.all_play = AllPlayTracker()
+        self._snapshot = None
+        self._projection = (None, None, None)  # (fingerprint of the week's rows, projections, category odds)
+        self._last_access = time.monotonic()
+        self._idle = False
+        self._condition = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._condition:
+            if self._thread is None:
+                name = f"league-refresh-{self.league_id}" if self.league_id else "league-refresh"
+                self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def latest(self):
+        """Returns the newest published snapshot (None until the first refresh finishes)."""
+        self._touch()
+        return self._snapshot
+
+    def wait_for_snapshot(self, newer_than=0, timeout=None):
+        """Blocks until a snapshot with version > `newer_than` is published (or the timeout hits)."""
+        self._touch()
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._snapshot is not None and self._snapshot.version > newer_than, timeout)
+            return self._snapshot
+
+    def refresh_now(self, wait=True, timeout=None):
+        """Skips the rest of the current wait and refreshes immediately."""
+        current = self._snapshot.version if self._snapshot is not None else 0
+        self._wake.set()
+        return self.wait_for_snapshot(newer_than=current, timeout=timeout) if wait else None
+
+    def rebuild_week(self, week, timeout=60):
+        """
+        Re-fetches one week from Yahoo (e.g. after a stat correction), rewrites
+        its stored and archived copies, drops the cached season and waits for a
+        snapshot built from the corrected data. Returns the rebuilt week, ranked.
+        """
+        lg = self._league()
+        week_df = rebuild_week(lg, week)
+        rearchive_league_week(lg, week)
+        self.cache.invalidate("season", lg.league_id)
+        self.refresh_now(timeout=timeout)
+        return week_df
+
+    def _touch(self):
+        # A page view: resume polling if the league had gone idle
+        self._last_access = time.monotonic()
+        if self._idle:
+            self._wake.set()
+
+    def _run(self):
+        forced = True
+        while not self._stop.is_set():
+            if not forced and time.monotonic() - self._last_access > self.idle_timeout:
+                self._idle = True
+                self._wake.wait()
+                self._wake.clear()
+                self._idle = False
+                forced = True
+            try:
+                if not forced and self._week_is_over():
+                    status = "final"
+                else:
+                    status = self._publish(self._build_snapshot()).week_status()
+            except Exception as e:
+                print(f"⚠️ League refresh failed: {e}")
+                status = "error"
+            forced = self._wake.wait(self.intervals[status])
+            self._wake.clear()
+
+    def _week_is_over(self):
+        # Final and still the league's current week: nothing new to fetch
+        snapshot = self._snapshot
+        return snapshot is not None and snapshot.week_status() == "final" \
+            and self._current_week() == snapshot.week
+
+    def _league(self):
+        return authenticate_yahoo_api(league_id=self.league_id)
+
+    def _current_week(self):
+        lg = self._league()
+        lg.current_week_cache = None  # yfa caches this on the League object
+        return lg.current_week()
+
+    @timed("refresh.build_snapshot")
+    def _build_snapshot(self):
+        lg = self._league()
+        week = self._current_week()
+
+        # Each poll wants fresh live data for this league; logos keep their own (long) TTL.
+        # The first build has nothing stale to drop, and may share loads a page already started
+        if self._snapshot is not None:
+            self.cache.invalidate_volatile(lg.league_id)
+        loaders = self.section_loaders(lg)
+        scoreboards, standings, matchups, logos = get_fetch_executor().gather(
+            [loaders[name] for name in ("season", "standings", "matchups", "logos")])
+        # Weeks that just became final also go to the long-term archive (a no-op on most polls)
+        try:
+            archive_league_weeks(lg)
+        except Exception as e:
+            print(f"⚠️ Couldn't archive finalized weeks for {lg.league_id}: {e}")
+
+        # The unranked rows are in matchup order, which is how projections and all-play pair teams
+        season = rank_weekly_stats(scoreboards)
+        week_df = scoreboards[scoreboards["week"] == week].reset_index(drop=True)
+        projections, category_odds = self._project(week_df, scoreboards)
+        all_play = self.all_play.update(scoreboards)
+
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        return LeagueSnapshot(version, time.time(), week, season, standings, matchups, logos,
+                              projections, category_odds, all_play)
+
+    def section_loaders(self, lg=None):
+        """
+        Returns {name: loader} for the standings, matchups, season (unranked
+        weekly rows) and logos. They go through the shared cache under the same
+        keys as a refresh, so a page loading sections itself joins any upstream
+        call a refresh already has in flight, and the other way round.
+        """
+        lg = lg or self._league()
+        self._touch()
+        return {
+            "standings": lambda: self.cache.get("standings", lambda: get_standings(lg), key=lg.league_id),
+            "matchups": lambda: self.cache.get("matchups", lambda: get_matchups_df(lg), key=lg.league_id),
+            "season": lambda: self.cache.get("season", lambda: get_season_scoreboards(lg), key=lg.league_id),
+            "logos": lambda: self.cache.get("logos", lambda: self._logos(lg), key=lg.league_id),
+        }
+
+    def _logos(self, lg):
+        # Thumbnailed here, off the request path, so pages embed them without touching Yahoo's CDN
+        logos = get_team_logos(lg)
+        uris = get_thumbnail_cache().data_uris(logos["Logo URL"], LOGO_SIZE)
+        logos["Logo"] = logos["Logo URL"].map(uris)
+        return logos
+
+    def _project(self, week_df, scoreboards):
+        # Re-simulate only when the week's numbers moved since the last poll
+        fingerprint = int(pd.util.hash_pandas_object(week_df, index=False).sum())
+        if self._projection[0] != fingerprint:
+            self._projection = (fingerprint, *project_matchups(week_df, scoreboards, n_sims=PROJECTION_SIMS))
+        return self._projection[1], self._projection[2]
+
+    def _publish(self, snapshot):
+        with self._condition:
+            self._snapshot = snapshot
+            self._condition.notify_all()
+        return snapshot
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+def get_refresh_scheduler(league_id=None):
+    """
+    Returns the scheduler for one league (None: the account's first league),
+    starting it on first use. All of them share the cache, session and fetch pool.
+    """
+    with _schedulers_lock:
+        if league_id not in _schedulers:
+            _schedulers[league_id] = RefreshScheduler(league_id).start()
+        return _schedulers[league_id]
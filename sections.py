@@ -0,0 +1,114 @@
+"""
+Asyncio data layer for pages that render section by section.
+
+Each section has a blocking loader (run on a worker thread), a timeout and
+a fallback. `render_progressively` starts every loader at once and hands
+each section to the page's render callback as soon as it's done, so the
+page fills its placeholders in the order the data arrives instead of
+waiting for the slowest one. A section that times out or fails is rendered
+from its fallback, else from the last good value this process loaded. Its
+loader keeps running in the background, so the shared cache is warm for the
+next render.
+"""
+# Standard library
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+# Local modules
+from metrics import get_metrics
+
+
+@dataclass(frozen=True)
+class Section:
+    name: str
+    loader: Callable[[], Any]
+    timeout: float
+    fallback: Optional[Callable[[], Any]] = None
+
+
+@dataclass(frozen=True)
+class SectionResult:
+    name: str
+    value: Any        # None if neither the loader nor any fallback had data
+    stale: bool       # True when the value is last good data, not a fresh load
+    error: str = None
+    seconds: float = 0.0
+
+
+# Last value each section loaded successfully, by (scope, section name)
+_last_good = {}
+_last_good_lock = threading.Lock()
+
+# Loaders get their own pool, not the event loop's default executor: asyncio.run
+# waits for that one on exit, which would hold the page up on a timed-out loader
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="section")
+        return _pool
+
+
+def last_good(scope, name):
+    """Returns the last value section `name` loaded for `scope`, or None."""
+    with _last_good_lock:
+        return _last_good.get((scope, name))
+
+
+def _fall_back(section, scope):
+    value = section.fallback() if section.fallback is not None else None
+    return value if value is not None else last_good(scope, section.name)
+
+
+async def _load(section, scope, page):
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    try:
+        value = await asyncio.wait_for(loop.run_in_executor(_get_pool(), section.loader), section.timeout)
+    except Exception as e:
+        outcome = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+        error = f"timed out after {section.timeout:.0f}s" if outcome == "timeout" else str(e)
+        print(f"⚠️ Section {section.name} {error}; using last good data")
+        result = SectionResult(section.name, _fall_back(section, scope), True, error, time.perf_counter() - started)
+    else:
+        outcome = "ok"
+        with _last_good_lock:
+            _last_good[(scope, section.name)] = value
+        result = SectionResult(section.name, value, False, None, time.perf_counter() - started)
+    get_metrics().observe("section_seconds", result.seconds, page=page, section=section.name, outcome=outcome)
+    return result
+
+
+async def stream_sections(sections, scope=None, page="page"):
+    """Yields a SectionResult per section, in the order they finish."""
+    tasks = [asyncio.ensure_future(_load(section, scope, page)) for section in sections]
+    for next_done in asyncio.as_completed(tasks):
+        yield await next_done
+
+
+def render_progressively(sections, render, scope=None, page="page", started=None):
+    """
+    Loads `sections` concurrently and calls `render(result)` on this thread as
+    each one finishes. Records time to first content from `started` (a
+    time.perf_counter() value, default now) and returns it in seconds.
+    """
+    started = time.perf_counter() if started is None else started
+    first_content = None
+
+    async def run():
+        nonlocal first_content
+        async for result in stream_sections(sections, scope, page):
+            render(result)
+            if first_content is None:
+                first_content = time.perf_counter() - started
+                get_metrics().observe("time_to_first_content_seconds", first_content, page=page)
+
+    asyncio.run(run())
+    return first_content
@@ -0,0 +1,490 @@
+# Standard library
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Third-party libraries
+import pandas as pd
+
+# Local database for finalized weeks, NBA game logs and transactions (override with SNAPSHOT_DB)
+DEFAULT_DB_PATH = os.getenv("SNAPSHOT_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "league.sqlite"))
+
+# Raw HTTP responses get their own file next to it, capped in size
+HTTP_CACHE_PATH = os.path.join(os.path.dirname(DEFAULT_DB_PATH), "http_cache.sqlite")
+HTTP_CACHE_MAX_BYTES = 256 * 2 ** 20
+
+# Multi-season Parquet archive (see archive.py)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.dirname(DEFAULT_DB_PATH), "archive"))
+
+
+def archived_seasons(dataset, root=ARCHIVE_DIR):
+    """Seasons with data in one archive dataset, newest first (from directory names; no data read)."""
+    directory = os.path.join(root, dataset)
+    if not os.path.isdir(directory):
+        return []
+    return sorted((d.split("=", 1)[1] for d in os.listdir(directory) if d.startswith("season=")), reverse=True)
+
+
+class SQLiteStore:
+    """Shared connection handling for the local stores (one lock per store)."""
+
+    schema = ""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(self.schema)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WeekStore(SQLiteStore):
+    """
+    On-disk store of finalized weekly matchup stats, keyed by league key and week.
+    A week only gets saved once it can't change anymore, so page loads can read it
+    locally instead of asking Yahoo again. Use `delete_week` (or `logic.rebuild_week`)
+    when Yahoo applies a stat correction.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS weekly_stats (
+            league_key TEXT NOT NULL,
+            week INTEGER NOT NULL,
+            saved_at REAL NOT NULL,
+            records TEXT NOT NULL,
+            PRIMARY KEY (league_key, week)
+        );
+    """
+
+    def weeks(self, league_key):
+        """Returns the sorted list of weeks already saved for a league."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT week FROM weekly_stats WHERE league_key = ? ORDER BY week",
+                (league_key,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def load_week(self, league_key, week):
+        """Returns the saved DataFrame for a week, or None if it isn't stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT records FROM weekly_stats WHERE league_key = ? AND week = ?",
+                (league_key, week)
+            ).fetchone()
+        if row is None:
+            return None
+        return pd.DataFrame(json.loads(row[0]))
+
+    def save_week(self, league_key, week, df):
+        """Saves (or replaces) the stats for one week."""
+        records = df.to_json(orient="records")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO weekly_stats (league_key, week, saved_at, records) VALUES (?, ?, ?, ?)",
+                (league_key, week, time.time(), records)
+            )
+            self._conn.commit()
+
+    def delete_week(self, league_key, week):
+        """Drops a stored week so the next load fetches it from Yahoo again."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM weekly_stats WHERE league_key = ? AND week = ?",
+                (league_key, week)
+            )
+            self._conn.commit()
+
+
+# Box score columns kept for each game, as named by nba_api
+GAME_LOG_STATS = ["MIN", "FGM", "FGA", "FG_PCT", "FG3M",
+                  "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT",
+                  "OREB", "DREB", "REB", "AST", "STL",
+                  "BLK", "TOV", "PF", "PTS", "PLUS_MINUS"]
+
+
+class GameLogStore(SQLiteStore):
+    """
+    Local copy of NBA player game logs, one row per player per game. Rows are
+    only ever appended; `last_game_date` tells the syncer where to resume.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS game_logs (
+            player_id INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            game_id TEXT NOT NULL,
+            game_date TEXT NOT NULL,
+            matchup TEXT,
+            wl TEXT,
+            """ + ",\n            ".join(f"{col} REAL" for col in GAME_LOG_STATS) + """,
+            PRIMARY KEY (player_id, game_id)
+        );
+        CREATE INDEX IF NOT EXISTS game_logs_by_season ON game_logs (season, player_id, game_date);
+        CREATE TABLE IF NOT EXISTS game_log_syncs (
+            player_id INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            synced_at REAL NOT NULL,
+            PRIMARY KEY (player_id, season)
+        );
+        CREATE TABLE IF NOT EXISTS game_log_backfills (
+            season TEXT PRIMARY KEY,
+            backfilled_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        super().__init__(path)
+        # Bumped whenever new games land, so derived tables know to recompute
+        self.revision = 0
+
+    def last_game_date(self, player_id, season):
+        """Returns the latest stored game date (YYYY-MM-DD) for a player, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(game_date) FROM game_logs WHERE season = ? AND player_id = ?",
+                (season, player_id)
+            ).fetchone()
+        return row[0]
+
+    def last_synced(self, player_id, season):
+        """Returns when the player was last synced (epoch seconds), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM game_log_syncs WHERE season = ? AND player_id = ?",
+                (season, player_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def append(self, season, df):
+        """
+        Adds games from a DataFrame with PLAYER_ID, GAME_ID, GAME_DATE (datetime),
+        MATCHUP, WL and the GAME_LOG_STATS columns. Games already stored are skipped.
+        """
+        if df.empty:
+            return 0
+        rows = zip(df["PLAYER_ID"].astype(int), [season] * len(df), df["GAME_ID"].astype(str),
+                   df["GAME_DATE"].dt.strftime("%Y-%m-%d"), df["MATCHUP"], df["WL"],
+                   *(df[col].astype(float) for col in GAME_LOG_STATS))
+        placeholders = ", ".join("?" * (6 + len(GAME_LOG_STATS)))
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(f"INSERT OR IGNORE INTO game_logs VALUES ({placeholders})", rows)
+            self._conn.commit()
+            added = self._conn.total_changes - before
+            if added:
+                self.revision += 1
+            return added
+
+    def mark_synced(self, player_ids, season, synced_at=None):
+        synced_at = time.time() if synced_at is None else synced_at
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO game_log_syncs (player_id, season, synced_at) VALUES (?, ?, ?)",
+                [(int(player_id), season, synced_at) for player_id in player_ids]
+            )
+            self._conn.commit()
+
+    def mark_backfilled(self, season, backfilled_at=None):
+        """Records that the whole league's games for a season were loaded."""
+        backfilled_at = time.time() if backfilled_at is None else backfilled_at
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO game_log_backfills (season, backfilled_at) VALUES (?, ?)",
+                (season, backfilled_at)
+            )
+            self._conn.commit()
+
+    def backfilled_at(self, season):
+        """Returns when the season was last backfilled league-wide (epoch seconds), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT backfilled_at FROM game_log_backfills WHERE season = ?", (season,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load(self, season, player_ids=None):
+        """Returns stored games (all players, or just `player_ids`) sorted by player and date."""
+        query = "SELECT * FROM game_logs WHERE season = ?"
+        params = [season]
+        if player_ids is not None:
+            player_ids = [int(player_id) for player_id in player_ids]
+            query += f" AND player_id IN ({', '.join('?' * len(player_ids))})"
+            params += player_ids
+        query += " ORDER BY player_id, game_date"
+        with self._lock:
+            df = pd.read_sql_query(query, self._conn, params=params)
+        df = df.rename(columns={"player_id": "PLAYER_ID", "season": "SEASON", "game_id": "GAME_ID",
+                                "game_date": "GAME_DATE", "matchup": "MATCHUP", "wl": "WL"})
+        df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"], format="%Y-%m-%d")
+        return df
+
+
+TRANSACTION_COLUMNS = ["league_key", "transaction_key", "transaction_id", "transaction_type", "timestamp",
+                       "weekday", "hour", "player_id", "player_name", "move", "source_type",
+                       "team_key", "team_name", "other_team_key"]
+
+
+class TransactionStore(SQLiteStore):
+    """
+    Local copy of a league's transactions, one row per player moved (an add/drop
+    is two rows). Rows are only appended: `cursor` is the newest transaction id
+    already stored, so syncs only ask Yahoo for what came after it. The
+    analytics below are plain SQL over the indexed table.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            league_key TEXT NOT NULL,
+            transaction_key TEXT NOT NULL,
+            transaction_id INTEGER NOT NULL,
+            transaction_type TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            weekday INTEGER NOT NULL,
+            hour INTEGER NOT NULL,
+            player_id INTEGER NOT NULL,
+            player_name TEXT,
+            move TEXT NOT NULL,
+            source_type TEXT,
+            team_key TEXT,
+            team_name TEXT,
+            other_team_key TEXT,
+            PRIMARY KEY (transaction_key, player_id, move)
+        );
+        CREATE INDEX IF NOT EXISTS transactions_by_player ON transactions (league_key, player_id, timestamp);
+        CREATE INDEX IF NOT EXISTS transactions_by_team ON transactions (league_key, team_key, move);
+        CREATE INDEX IF NOT EXISTS transactions_by_move ON transactions (league_key, move, weekday);
+        CREATE INDEX IF NOT EXISTS transactions_by_time ON transactions (league_key, timestamp);
+        CREATE TABLE IF NOT EXISTS transaction_syncs (
+            league_key TEXT PRIMARY KEY,
+            last_transaction_id INTEGER NOT NULL,
+            synced_at REAL NOT NULL
+        );
+    """
+
+    def cursor(self, league_key):
+        """Returns (newest stored transaction id, when it was synced), or (None, None)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_transaction_id, synced_at FROM transaction_syncs WHERE league_key = ?",
+                (league_key,)
+            ).fetchone()
+        return tuple(row) if row else (None, None)
+
+    def append(self, league_key, rows, last_transaction_id):
+        """
+        Adds transaction rows (dicts with the TRANSACTION_COLUMNS keys) and moves
+        the cursor to `last_transaction_id`, in one commit. Returns rows added.
+        """
+        placeholders = ", ".join("?" * len(TRANSACTION_COLUMNS))
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO transactions ({', '.join(TRANSACTION_COLUMNS)}) VALUES ({placeholders})",
+                [tuple(row[col] for col in TRANSACTION_COLUMNS) for row in rows]
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transaction_syncs (league_key, last_transaction_id, synced_at) VALUES (?, ?, ?)",
+                (league_key, last_transaction_id, time.time())
+            )
+            self._conn.commit()
+            return added
+
+    def _query(self, sql, params):
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def count(self, league_key):
+        """Number of transactions stored for a league."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(DISTINCT transaction_key) FROM transactions WHERE league_key = ?",
+                (league_key,)
+            ).fetchone()
+        return row[0]
+
+    def moves_by_weekday(self, league_key):
+        """Adds and drops per day of the week (0 = Monday, league time)."""
+        return self._query("""
+            SELECT weekday, SUM(move = 'add') AS adds, SUM(move = 'drop') AS drops
+            FROM transactions WHERE league_key = ? AND move IN ('add', 'drop')
+            GROUP BY weekday ORDER BY weekday
+        """, (league_key,))
+
+    def most_added_by_weekday(self, league_key, limit=5):
+        """The `limit` most-added players for each day of the week."""
+        return self._query("""
+            SELECT weekday, player_id, player_name, adds FROM (
+                SELECT weekday, player_id, MAX(player_name) AS player_name, COUNT(*) AS adds,
+                       ROW_NUMBER() OVER (PARTITION BY weekday ORDER BY COUNT(*) DESC, MAX(timestamp) DESC) AS place
+                FROM transactions WHERE league_key = ? AND move = 'add'
+                GROUP BY weekday, player_id
+            ) WHERE place <= ? ORDER BY weekday, place
+        """, (league_key, limit))
+
+    def churn(self, league_key, limit=20):
+        """
+        Players who were dropped and then picked up again: how often, how often
+        by the team that dropped them, and how long they sat unowned on average.
+        """
+        return self._query("""
+            WITH moves AS (
+                SELECT player_id, player_name, move, timestamp, team_key,
+                       LAG(move) OVER by_player AS prev_move,
+                       LAG(timestamp) OVER by_player AS prev_timestamp,
+                       LAG(team_key) OVER by_player AS prev_team_key
+                FROM transactions WHERE league_key = ? AND move IN ('add', 'drop')
+                WINDOW by_player AS (PARTITION BY player_id ORDER BY timestamp, transaction_id)
+            )
+            SELECT player_id, MAX(player_name) AS player_name, COUNT(*) AS readds,
+                   SUM(team_key = prev_team_key) AS same_team_readds,
+                   ROUND(AVG(timestamp - prev_timestamp) / 3600.0, 1) AS avg_hours_unowned
+            FROM moves WHERE move = 'add' AND prev_move = 'drop'
+            GROUP BY player_id ORDER BY readds DESC, avg_hours_unowned LIMIT ?
+        """, (league_key, limit))
+
+    def team_activity(self, league_key):
+        """Per-team adds, drops, players received in trades, and most recent move."""
+        return self._query("""
+            SELECT team_key, MAX(team_name) AS team_name,
+                   COUNT(DISTINCT transaction_key) AS transactions,
+                   SUM(move = 'add') AS adds, SUM(move = 'drop') AS drops,
+                   SUM(move = 'trade') AS traded_for,
+                   SUM(move = 'add' AND source_type = 'waivers') AS waiver_claims,
+                   MAX(timestamp) AS last_move
+            FROM transactions WHERE league_key = ? AND team_key IS NOT NULL
+            GROUP BY team_key ORDER BY transactions DESC
+        """, (league_key,))
+
+
+class HTTPCacheStore(SQLiteStore):
+    """
+    On-disk HTTP cache for the shared transport: the last response body for
+    each URL, with the ETag/Last-Modified needed to revalidate it. Bodies are
+    stored decoded. Once the stored bodies pass `max_bytes`, the least
+    recently used ones are evicted.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            headers TEXT NOT NULL,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            stored_at REAL NOT NULL,
+            used_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS http_cache_by_use ON http_cache (used_at);
+    """
+
+    def __init__(self, path=HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        super().__init__(path)
+
+    def get(self, url):
+        """Returns the stored entry for `url` as a dict, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, headers, body FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "headers": json.loads(row[2]), "body": row[3]}
+
+    def put(self, url, etag, last_modified, headers, body):
+        """Stores (or replaces) the response for `url`, then evicts down to max_bytes."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, headers, body, size, stored_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(headers), body, len(body), now, now)
+            )
+            self._conn.execute("""
+                DELETE FROM http_cache WHERE url IN (
+                    SELECT url FROM (SELECT url, SUM(size) OVER (ORDER BY used_at DESC, url) AS running FROM http_cache)
+                    WHERE running > ?
+                )
+            """, (self.max_bytes,))
+            self._conn.commit()
+
+    def touch(self, url):
+        """Marks an entry as just used (after a 304 revalidated it)."""
+        with self._lock:
+            self._conn.execute("UPDATE http_cache SET used_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def stats(self):
+        """Returns (entries, total body bytes)."""
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache").fetchone()
+        return tuple(row)
+
+
+class ThumbnailStore(SQLiteStore):
+    """
+    Resized images, content-addressed: `thumbnails` holds each encoded
+    thumbnail once under the SHA-256 of its bytes, and `thumbnail_sources`
+    maps (source URL, display size) to that digest. Images that come out
+    identical (a default logo, the NBA's silhouette headshot) share one row.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS thumbnails (
+            digest TEXT PRIMARY KEY,
+            mime TEXT NOT NULL,
+            data BLOB NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS thumbnail_sources (
+            url TEXT NOT NULL,
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (url, width, height)
+        );
+    """
+
+    def load(self, url, size):
+        """Returns (mime, data) for the thumbnail of `url` at `size`, or None."""
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT t.mime, t.data FROM thumbnail_sources s JOIN thumbnails t ON t.digest = s.digest
+                WHERE s.url = ? AND s.width = ? AND s.height = ?
+            """, (url, *size)).fetchone()
+        return tuple(row) if row else None
+
+    def save(self, url, size, mime, data):
+        """Stores a thumbnail (once per distinct content) and points `url` at it. Returns the digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO thumbnails (digest, mime, data) VALUES (?, ?, ?)",
+                               (digest, mime, data))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thumbnail_sources (url, width, height, digest, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, *size, digest, time.time())
+            )
+            self._conn.commit()
+        return digest
+
+
+def is_week_final(df, curr_week_num):
+    """
+    A week is final once it's behind the league's current week and no team
+    has games left to play or still in progress.
+    """
+    if df.empty or int(df["week"].iloc[0]) >= curr_week_num:
+        return False
+    return bool((df["remaining_games"].fillna(0) == 0).all() and (df["live_games"].fillna(0) == 0).all())
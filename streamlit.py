@@ -1,21 +1,13 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import os
-import plotly.express as px
+import time
 from datetime import datetime
 import pytz
-from nba_api.stats.endpoints import playergamelog
-from nba_api.stats.static import players
-
-from logic import (
-    authenticate_yahoo_api,
-    get_full_season_stats,
-    get_standings,
-    get_matchups_df,
-    get_team_logos,
-    team_ids  # if you need the mapping
-)
+
+# Page data (and the heavy imports behind it) is only loaded by the page that uses it
+from providers import PageData
+from metrics import get_metrics
 
 # Page Configuration
 st.set_page_config(
@@ -34,190 +26,314 @@ st.logo(
     size="large"
 )
 st.sidebar.title("🌐 Navigation")
-pages = ["🏠 Home", "⛹🏽 Multi-player comparison", "🗣️ Free Agency"]
-selection = st.sidebar.radio("Go to", pages)
-
-# Get Current EST Time
-est = pytz.timezone('US/Eastern')
-current_time = datetime.now(est).strftime("%B %d, %Y - %I:%M %p")
+pages = ["🏠 Home", "⛹🏽 Multi-player comparison", "📈 Player screener", "🗣️ Free Agency"]
+selection = st.sidebar.radio("Go to", pages, key="page")
+
+# Hidden diagnostics page: open the app with ?diagnostics=1
+diagnostics = st.query_params.get("diagnostics") == "1"
+if diagnostics:
+    selection = "🩺 Diagnostics"
+
+# Whole-render timing; pages that st.stop() early aren't recorded
+page_started = time.perf_counter()
+render_span = get_metrics().start_span("page.render", page=selection)
+
+# Each page lists the datasets it renders; they're only loaded when first used
+PAGE_DATASETS = {
+    "🏠 Home": ["leagues", "league_id", "scheduler", "snapshot"],
+    "⛹🏽 Multi-player comparison": ["active_players"],
+    "📈 Player screener": ["active_players", "player_windows"],
+    "🗣️ Free Agency": ["leagues", "league_id", "transactions"],
+    "🩺 Diagnostics": [],
+}
+
+# League for this request: the sidebar pick, else ?league=<league key>, else the account's first league
+requested_league = st.session_state.get("league") or st.query_params.get("league")
+data = PageData(PAGE_DATASETS[selection], requested_league=requested_league)
 
 # Streamlit App
-st.title("Season 2 of Love Island (NBA)")
-
-# Authenticate and get league object
-lg = authenticate_yahoo_api()
-curr_week = lg.current_week()
-
-# Load data / Fetch dataframes
-final_df = get_full_season_stats(lg)
-standings = get_standings(lg)
-df_matchups = get_matchups_df(lg)
-team_logos = get_team_logos(lg, team_ids)
-
-# Format column names for standings and matchups
-standings.columns = standings.columns.str.replace("_", " ").str.title()
-standings["Record"] = standings["Wins"].astype(str) + "-" + standings["Losses"].astype(str) + "-" + standings["Ties"].astype(str)
-standings = standings.drop(columns=["Playoff Seed", "Games Back", "Wins", "Losses", "Ties", "Percentage"])
-df_matchups.columns = df_matchups.columns.str.replace("_", " ").str.title()
-
-# Define columns to exclude from formatting
-exclude_columns = ["FG%", "FT%", "3PTM", "PTS", "REB", "AST", "STL", "BLK", "TO"]
-
-# Custom formatting for final_df columns: do not change rank columns.
-def format_col(col):
-    if col.endswith("_Rank"):
-        return col
-    elif col in exclude_columns:
-        return col
-    else:
-        return col.replace("_", " ").title()
-
-final_df.columns = [format_col(col) for col in final_df.columns]
+if "league_id" in data.needs:
+    # League pages get a league picker; the pick stays in the URL so links point at the same league
+    leagues = data["leagues"]
+    league_id = data["league_id"]
+    league_keys = list(leagues)
+    st.sidebar.selectbox("League", league_keys, index=league_keys.index(league_id), format_func=leagues.get, key="league")
+    st.query_params["league"] = league_id
+    st.title(leagues[league_id])
+else:
+    st.title("Season 2 of Love Island (NBA)")
 
 
 # --------------- 🏠 HOME PAGE ---------------
 if selection == "🏠 Home":
-    # Update Stats Button - Reloads Streamlit Script
-    if st.button("🔄 Update Stats"):
-        st.rerun()  # Reloads the script to refresh data
-    # Convert logos into a list (for grid placement)
-    logo_urls = team_logos["Logo URL"].tolist()
-    
-    # Create a row of images using markdown (CSS for tight spacing)
-    logo_html = "<div style='display: flex; justify-content: flex-start; gap: 10px;'>"
-    for url in logo_urls:
-        logo_html += f"<img src='{url}' width='30' style='border-radius: 10px;'>"
-    logo_html += "</div>"
-
-    # Render the HTML in Streamlit
-    st.markdown(logo_html, unsafe_allow_html=True)
-
-    st.markdown(f"### Week 22 🏀")
-    st.markdown(f"""
-        <p style="font-size: 14px; font-style: italic; color: white; opacity: 0.7; margin-top: -10px;">
-            Score snapshot as of {current_time} EST
-        </p>
-    """, unsafe_allow_html=True)
+    # League data comes from the latest snapshot published by the background
+    # refresher. Before the first one exists (a cold start) the page loads its
+    # sections itself and fills each one in as soon as its data arrives
+    scheduler = data["scheduler"]
+    snapshot = data["snapshot"]
 
-    # Layout: Two equal columns for Leaderboard and Matchups
-    col1, col2 = st.columns(2)
+    # Update Stats Button - Asks the refresher for a new snapshot, then reloads
+    if st.button("🔄 Update Stats"):
+        with st.spinner("Refreshing..."):
+            scheduler.refresh_now(timeout=60)
+        st.rerun()  # Reloads the script to show the new snapshot
+
+    # Placeholders in page order; each is filled whenever its section is ready
+    logos_slot = st.empty()
+    header_slot = st.empty()
+    col1, col2 = st.columns(2)  # Two equal columns for Leaderboard and Matchups
     with col1:
         st.subheader("Leaderboard")
-        st.dataframe(standings, use_container_width=True, hide_index=True)
+        standings_slot = st.empty()
     with col2:
         st.subheader("Current Matchups")
+        matchups_slot = st.empty()
+    season_slot = st.empty()
+
+    # Snapshot time in EST
+    est = pytz.timezone('US/Eastern')
+
+    def show_logos(team_logos):
+        # Inline thumbnails, so the browser fetches nothing; a row of images using markdown (CSS for tight spacing)
+        logo_html = "<div style='display: flex; justify-content: flex-start; gap: 10px;'>"
+        for url in team_logos["Logo"].tolist():
+            logo_html += f"<img src='{url}' width='30' style='border-radius: 10px;'>"
+        logo_html += "</div>"
+        logos_slot.markdown(logo_html, unsafe_allow_html=True)
+
+    def show_standings(standings):
+        # Copy, since the formatting below edits the frame in place
+        standings = standings.copy()
+        standings.columns = standings.columns.str.replace("_", " ").str.title()
+        standings["Record"] = standings["Wins"].astype(str) + "-" + standings["Losses"].astype(str) + "-" + standings["Ties"].astype(str)
+        standings = standings.drop(columns=["Playoff Seed", "Games Back", "Wins", "Losses", "Ties", "Percentage"])
+        st.dataframe(standings, use_container_width=True, hide_index=True)
+
+    def show_matchups(df_matchups):
+        df_matchups = df_matchups.copy()
+        df_matchups.columns = df_matchups.columns.str.replace("_", " ").str.title()
         st.dataframe(df_matchups, use_container_width=True, hide_index=True)
 
-     # Place the week filter on the main page (above the statistics table)
-    week_options = sorted(final_df['Week'].unique())
-    selected_week = st.selectbox("Choose Week Number to filter table below:", week_options, index=len(week_options)-1)
-
-    # Filter the data for the selected week and sort by Adjusted_Rank
-    week_data = final_df[final_df['Week'] == selected_week].sort_values(by=['Adjusted_Rank'], ascending=True)
-
-    # List of stat categories to format
-    stat_categories = ['FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
-
-    # Combine raw values and their rank for each stat category
-    for category in stat_categories:
-        week_data[category] = (
-            week_data[category].round(3).astype(str) +
-            " (" +
-            week_data[category + "_Rank"].astype(str) +
-            ")"
-        )
-
-    # Combine remaining/live/completed columns
-    week_data["Rem/Live/Comp"] = week_data["Remaining Games"].astype(str) + "/" + week_data["Live Games"].astype(str) + "/" + week_data["Completed Games"].astype(str)
-    
-    # Combine Aggregate Rank and Adjusted Rank into a single column
-    week_data['Adjusted Rank'] = week_data['Adjusted_Rank'].astype(str) + " (" + week_data['Aggregate Rank'].astype(str) + ")"
-
-   
-    # Remove unwanted columns
-    columns_to_remove = ["Team Key", "Team Id", "Fgm/A", "Ftm/A", "Remaining Games", "Live Games", "Completed Games", "Aggregate Rank"]
-    
-    # Also remove any column whose name contains "_Rank" except "Adjusted_Rank"
-    rank_columns = [col for col in week_data.columns if "_Rank" in col]
-    columns_to_remove.extend(rank_columns)
-
-    
-    week_data = week_data.drop(columns=columns_to_remove)
-    
-    # Assuming week_data is your DataFrame
-    desired_order = ['Week', 'Name', 'Rem/Live/Comp', 'Adjusted Rank', 'FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
-    week_data = week_data[desired_order]
-
-    # Full-Width Traditional Statistics Table
-    st.subheader("Traditional Statistics")
-    st.markdown(f"""
-        <p style="font-size: 14px; color: white; opacity: 0.7; margin-top: -10px;">
-            <b>Adjusted Rank</b> – Summarizes all individual rankings into one total score. The lower the number, the better.
-        </p>
-    """, unsafe_allow_html=True)
-    st.dataframe(week_data, use_container_width=True, hide_index=True)
+    def show_header(week, as_of):
+        with header_slot.container():
+            st.markdown(f"### Week {week} 🏀")
+            st.markdown(f"""
+                <p style="font-size: 14px; font-style: italic; color: white; opacity: 0.7; margin-top: -10px;">
+                    {as_of}
+                </p>
+            """, unsafe_allow_html=True)
+
+    def show_season(final_df, snapshot=None):
+        final_df = final_df.copy()
+
+        # Define columns to exclude from formatting
+        exclude_columns = ["FG%", "FT%", "3PTM", "PTS", "REB", "AST", "STL", "BLK", "TO"]
+
+        # Custom formatting for final_df columns: do not change rank columns.
+        def format_col(col):
+            if col.endswith("_Rank"):
+                return col
+            elif col in exclude_columns:
+                return col
+            else:
+                return col.replace("_", " ").title()
+
+        final_df.columns = [format_col(col) for col in final_df.columns]
+
+        # Monte Carlo projection of the rest of the week (computed with the snapshot)
+        if snapshot is not None and snapshot.projections is not None:
+            with st.expander("🔮 Projected results"):
+                st.markdown(f"""
+                    <p style="font-size: 14px; color: white; opacity: 0.7;">
+                        Chance the first team wins each matchup, from simulating every team's remaining games.
+                    </p>
+                """, unsafe_allow_html=True)
+                st.dataframe(snapshot.projections, use_container_width=True, hide_index=True)
+                st.markdown("**Category win % (first team)**")
+                st.dataframe(snapshot.category_odds, use_container_width=True, hide_index=True)
+
+        # All-play: every week, each team against all the others (the current week only once it's over)
+        if snapshot is not None and snapshot.all_play is not None:
+            from allplay import all_play_standings
+
+            through_week = snapshot.week if snapshot.week_status() == "final" else snapshot.week - 1
+            with st.expander("🎲 All-play standings"):
+                st.markdown(f"""
+                    <p style="font-size: 14px; color: white; opacity: 0.7;">
+                        <b>All-Play</b> – Each week's 9-cat result against every other team, through week {through_week}.
+                        <b>Luck</b> – Actual wins minus the wins expected from the all-play win %.
+                    </p>
+                """, unsafe_allow_html=True)
+                st.dataframe(all_play_standings(snapshot.all_play, through_week), use_container_width=True, hide_index=True)
+
+        # Archived seasons (see archive.py), matched by team name since a renewed league gets a new key each season
+        from archive import get_season_summary
+        history = get_season_summary(final_df["Name"].unique())
+        if history["season"].nunique() > 1:
+            with st.expander("📜 Season over season"):
+                st.markdown("""
+                    <p style="font-size: 14px; color: white; opacity: 0.7;">
+                        Each team's weekly averages by season, over the finalized weeks in the archive.
+                    </p>
+                """, unsafe_allow_html=True)
+                st.dataframe(history.round(3), use_container_width=True, hide_index=True)
+
+        # Place the week filter on the main page (above the statistics table)
+        week_options = sorted(final_df['Week'].unique())
+        selected_week = st.selectbox("Choose Week Number to filter table below:", week_options, index=len(week_options)-1)
+
+        # Filter the data for the selected week and sort by Adjusted_Rank
+        week_data = final_df[final_df['Week'] == selected_week].sort_values(by=['Adjusted_Rank'], ascending=True)
+
+        # List of stat categories to format
+        stat_categories = ['FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
+
+        # Combine raw values and their rank for each stat category
+        for category in stat_categories:
+            week_data[category] = (
+                week_data[category].round(3).astype(str) +
+                " (" +
+                week_data[category + "_Rank"].astype(str) +
+                ")"
+            )
+
+        # Combine remaining/live/completed columns
+        week_data["Rem/Live/Comp"] = week_data["Remaining Games"].astype(str) + "/" + week_data["Live Games"].astype(str) + "/" + week_data["Completed Games"].astype(str)
+
+        # Combine Aggregate Rank and Adjusted Rank into a single column
+        week_data['Adjusted Rank'] = week_data['Adjusted_Rank'].astype(str) + " (" + week_data['Aggregate Rank'].astype(str) + ")"
+
+        # Remove unwanted columns
+        columns_to_remove = ["Team Key", "Team Id", "Fgm/A", "Ftm/A", "Remaining Games", "Live Games", "Completed Games", "Aggregate Rank"]
+
+        # Also remove any column whose name contains "_Rank" except "Adjusted_Rank"
+        rank_columns = [col for col in week_data.columns if "_Rank" in col]
+        columns_to_remove.extend(rank_columns)
+
+        week_data = week_data.drop(columns=columns_to_remove)
+
+        desired_order = ['Week', 'Name', 'Rem/Live/Comp', 'Adjusted Rank', 'FG%', 'FT%', '3PTM', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO']
+        week_data = week_data[desired_order]
+
+        # Full-Width Traditional Statistics Table
+        st.subheader("Traditional Statistics")
+        st.markdown(f"""
+            <p style="font-size: 14px; color: white; opacity: 0.7; margin-top: -10px;">
+                <b>Adjusted Rank</b> – Summarizes all individual rankings into one total score. The lower the number, the better.
+            </p>
+        """, unsafe_allow_html=True)
+        st.dataframe(week_data, use_container_width=True, hide_index=True)
+
+    def as_of(loaded_at):
+        loaded_time = datetime.fromtimestamp(loaded_at, est).strftime("%B %d, %Y - %I:%M %p")
+        return f"Score snapshot as of {loaded_time} EST ({int((time.time() - loaded_at) // 60)} min ago)"
+
+    if snapshot is not None:
+        # Everything is already in memory: render it all at once
+        show_logos(snapshot.logos)
+        show_header(snapshot.week, as_of(snapshot.created_at))
+        with standings_slot.container():
+            show_standings(snapshot.standings)
+        with matchups_slot.container():
+            show_matchups(snapshot.matchups)
+        get_metrics().observe("time_to_first_content_seconds", time.perf_counter() - page_started, page=selection)
+        with season_slot.container():
+            show_season(snapshot.season, snapshot)
+    else:
+        from logic import get_stored_scoreboards, rank_weekly_stats
+        from sections import Section, render_progressively
+
+        # Seconds each section may take before the page shows its last good data instead
+        SECTION_TIMEOUTS = {"standings": 15, "matchups": 15, "season": 45, "logos": 20}
+
+        for slot in (standings_slot, matchups_slot, season_slot):
+            slot.caption("⏳ Loading...")
+
+        def from_snapshot(name):
+            # A snapshot the refresher published while this page was loading beats older data
+            latest = scheduler.latest()
+            return getattr(latest, name) if latest is not None else None
+
+        # The season section is (when its scores were loaded, ranked weeks): the shared
+        # cache may hand back scores loaded minutes ago, so the page can't just say "now"
+        def load_season():
+            scoreboards = loaders["season"]()
+            return scheduler.cache.loaded_at("season", league_id), rank_weekly_stats(scoreboards)
+
+        def stored_season():
+            latest = scheduler.latest()
+            if latest is not None:
+                return latest.created_at, latest.season
+            stored = get_stored_scoreboards(league_id)
+            return (None, rank_weekly_stats(stored)) if stored is not None else None
+
+        # Started in priority order; they share in-flight calls with the refresher's first build
+        loaders = scheduler.section_loaders()
+        sections = [
+            Section("standings", loaders["standings"], SECTION_TIMEOUTS["standings"], lambda: from_snapshot("standings")),
+            Section("matchups", loaders["matchups"], SECTION_TIMEOUTS["matchups"], lambda: from_snapshot("matchups")),
+            Section("season", load_season, SECTION_TIMEOUTS["season"], stored_season),
+            Section("logos", loaders["logos"], SECTION_TIMEOUTS["logos"], lambda: from_snapshot("logos")),
+        ]
+        titles = {"standings": "The leaderboard", "matchups": "This week's matchups",
+                  "season": "The weekly stats", "logos": "Team logos"}
+        slots = {"standings": standings_slot, "matchups": matchups_slot, "season": season_slot}
+
+        def show_section(result):
+            if result.value is None:
+                if result.name in slots:
+                    slots[result.name].warning(f"{titles[result.name]} isn't available right now ({result.error}). Please refresh the page in a minute.")
+                return
+            if result.name == "logos":
+                show_logos(result.value)
+                return
+            value = result.value
+            if result.name == "season":
+                loaded_at, value = value
+                show_header(int(value["week"].max()),
+                            as_of(loaded_at) if loaded_at is not None else "Finalized weeks only (live scores unavailable)")
+            with slots[result.name].container():
+                if result.stale:
+                    st.caption(f"⚠️ Showing the last available data: the update {result.error}.")
+                if result.name == "standings":
+                    show_standings(value)
+                elif result.name == "matchups":
+                    show_matchups(value)
+                else:
+                    show_season(value)
+
+        render_progressively(sections, show_section, scope=league_id, page=selection, started=page_started)
 
 
 # --------------- ⛹🏽 MULTI-PLAYER COMPARISON ---------------
 elif selection == "⛹🏽 Multi-player comparison":
     st.title("⛹🏽 Multi-player comparison")
 
-    def get_active_players():
-        all_players = players.get_players()
-        active_players = {p["full_name"]: p["id"] for p in all_players if p["is_active"]}
-        return active_players
-
-    active_players = get_active_players()
+    active_players = data["active_players"]
 
     def get_player_headshot(player_id):
         return f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id}.png"
 
-    def get_player_stats(player_id, player_name, period, mode):
-        from nba_api.stats.endpoints import playergamelog
-        gamelog = playergamelog.PlayerGameLog(player_id=player_id, season="2024-25", season_type_all_star="Regular Season")
-        df = gamelog.get_data_frames()[0]
-
-        if df.empty:
-            return None
-
-        df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"], format="%b %d, %Y", errors='coerce')
-
-        if period != "season":
-            time_cutoff = pd.Timestamp.today() - pd.Timedelta(days=period)
-            df = df[df["GAME_DATE"] >= time_cutoff]
-
-        relevant_stats = ["MIN", "FGM", "FGA", "FG_PCT", "FG3M",
-                          "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT",
-                          "OREB", "DREB", "REB", "AST", "STL",
-                          "BLK", "TOV", "PF", "PTS", "PLUS_MINUS"]
-
-        df = df[relevant_stats]
+    def compare_players(player_list, period, mode, season):
+        from aggregates import get_archived_window_aggregates, get_window_aggregates, lookup_player_stats
+        from gamelogs import SEASON, sync_players
 
-        if mode == "Average":
-            stats = df.mean()
-            stats["FG_PCT"] = round(df.loc[df["FGA"] > 0, "FG_PCT"].mean(), 3) if (df["FGA"] > 0).any() else 0
-            stats["FG3_PCT"] = round(df.loc[df["FG3A"] > 0, "FG3_PCT"].mean(), 3) if (df["FG3A"] > 0).any() else 0
-            stats["FT_PCT"] = round(df.loc[df["FTA"] > 0, "FT_PCT"].mean(), 3) if (df["FTA"] > 0).any() else 0
-            for col in stats.index:
-                if col not in ["FG_PCT", "FG3_PCT", "FT_PCT"]:
-                    stats[col] = round(stats[col], 1)
+        player_ids = {player: active_players.get(player) for player in player_list if active_players.get(player)}
+        if season in (None, SEASON):
+            # Only players not synced recently hit nba_api; everything else is a lookup
+            sync_players(set(player_ids.values()))
+            aggregates = get_window_aggregates()
         else:
-            stats = df.sum()
-            stats = stats.drop(["FG_PCT", "FG3_PCT", "FT_PCT"])
-            stats = stats.round(1)
+            # Past seasons come from the archive (see archive.py); windows end at that season's last game
+            aggregates = get_archived_window_aggregates(season, player_ids.values())
 
-        stats["Player"] = player_name
-        stats["Headshot"] = get_player_headshot(player_id)
-        return stats
-
-    def compare_players(player_list, period, mode):
         all_stats = []
-        for player in player_list:
-            player_id = active_players.get(player)
-            if player_id:
-                stats = get_player_stats(player_id, player, period, mode)
-                if stats is not None:
-                    all_stats.append(stats)
+        for player, player_id in player_ids.items():
+            stats = lookup_player_stats(aggregates, player_id, period, mode)
+            if stats is not None:
+                stats["Player"] = player
+                stats["Headshot"] = get_player_headshot(player_id)
+                all_stats.append(stats)
         return pd.DataFrame(all_stats) if all_stats else None
 
     num_players = st.selectbox("Select Number of Players to Compare", options=[2, 3, 4, 5], index=0)
@@ -240,16 +356,29 @@ elif selection == "⛹🏽 Multi-player comparison":
     selected_period_label = st.selectbox("Select Time Period", list(period_options.keys()), index=0)
     period_value, mode = period_options[selected_period_label]
 
+    # Earlier seasons are offered once they've been archived (see archive.py)
+    from store import archived_seasons
+    selected_season = None
+    past_seasons = archived_seasons("player_games")
+    if past_seasons:
+        from gamelogs import SEASON
+        seasons = [SEASON] + [season for season in past_seasons if season != SEASON]
+        selected_season = st.selectbox("Select Season", seasons, index=0)
+
     if st.button("Compare Players"):
-        with st.spinner("Fetching player stats..."):
-            combined_df = compare_players(selected_players, period_value, mode)
+        with st.spinner("Fetching player stats..."), get_metrics().span("comparison.compare_players"):
+            combined_df = compare_players(selected_players, period_value, mode, selected_season)
             if combined_df is not None:
                 st.success("Comparison Generated!")
                 ordered_columns = ["Headshot", "Player"] + [col for col in combined_df.columns if col not in ["Headshot", "Player"]]
                 combined_df = combined_df[ordered_columns]
 
+                # Small inline thumbnails instead of the full-size CDN headshots
+                from thumbnails import HEADSHOT_SIZE, get_thumbnail_cache
+                headshots = get_thumbnail_cache().data_uris(combined_df["Headshot"], HEADSHOT_SIZE)
+
                 def image_formatter(url):
-                    return f'<img src="{url}" width="75">'
+                    return f'<img src="{headshots[url]}" width="75">'
 
                 pct_columns = {"FG_PCT": "FG%", "FG3_PCT": "3PT FG%", "FT_PCT": "FT%"}
                 combined_df.rename(columns=pct_columns, inplace=True)
@@ -266,6 +395,171 @@ elif selection == "⛹🏽 Multi-player comparison":
                 st.error("No game data available for the selected players and period.")
 
 
+# --------------- 📈 PLAYER SCREENER ---------------
+elif selection == "📈 Player screener":
+    st.title("📈 Player screener")
+    st.markdown("""
+        <p style="font-size: 14px; color: white; opacity: 0.7; margin-top: -10px;">
+            <b>Value</b> – Sum of 9-cat z-scores against every player with enough games in the window. FG% and FT% are weighted by attempts.
+        </p>
+    """, unsafe_allow_html=True)
+
+    from valuation import CATEGORIES, nine_cat_values, screen_players
+
+    # Z-scores are against the whole league, so the screener needs every player's games,
+    # not just the few the comparison page synced
+    from gamelogs import SEASON, get_game_log_store
+    if get_game_log_store().backfilled_at(SEASON) is None:
+        st.info("The league-wide game log hasn't been loaded yet, so player values would only compare the "
+                "players synced so far. Loading it takes one request.")
+        if st.button("Load game logs"):
+            from gamelogs import backfill
+            with st.spinner("Loading league game logs..."):
+                backfill()
+            st.rerun()
+        st.stop()
+    aggregates = data["player_windows"]
+
+    window_options = {"Last 7 Days": 7, "Last 14 Days": 14, "Last 30 Days": 30, "Full Season": "season"}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        window = window_options[st.selectbox("Time Period", list(window_options.keys()), index=3)]
+    with col2:
+        min_games = st.number_input("Minimum games played", min_value=1, value=3 if window != "season" else 10)
+    with col3:
+        name_filter = st.text_input("Search player")
+
+    col4, col5 = st.columns(2)
+    with col4:
+        punt = st.multiselect("Punt categories", CATEGORIES)
+    with col5:
+        sort_by = st.selectbox("Sort by", ["Value"] + CATEGORIES + ["GP"])
+
+    # One batched scoring pass over every player; filters and sorting only slice the result
+    names = {player_id: name for name, player_id in data["active_players"].items()}
+    values = nine_cat_values(aggregates, window, min_games=min_games)
+    values = values[values.index.isin(names)]
+    ascending = sort_by == "TO"
+    screened = screen_players(values, names, name_contains=name_filter, punt=punt, sort_by=sort_by, ascending=ascending)
+
+    show_z = st.checkbox("Show z-scores")
+    columns = ["Player", "Rank", "Value", "GP"] + CATEGORIES
+    if show_z:
+        columns += ["z_" + cat for cat in CATEGORIES]
+    st.dataframe(screened[columns].round(3), use_container_width=True, hide_index=True)
+
+
+# --------------- 🗣️ FREE AGENCY ---------------
+elif selection == "🗣️ Free Agency":
+    st.title("🗣️ Free Agency")
+
+    from transactions import get_transaction_store
+
+    # Only transactions newer than the last sync are fetched; everything below reads the local table
+    with st.spinner("Syncing transactions..."), get_metrics().span("free_agency.sync"):
+        sync_error = data["transactions"]
+    if sync_error:
+        st.warning(f"Couldn't fetch new transactions from Yahoo ({sync_error}). Showing the stored ones, which may be out of date.")
+    league_key = league_id
+    store = get_transaction_store()
+
+    if store.count(league_key) == 0:
+        st.info("No transactions yet this season.")
+        st.stop()
+
+    weekdays = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    est = pytz.timezone('US/Eastern')
+    _, synced_at = store.cursor(league_key)
+    st.markdown(f"""
+        <p style="font-size: 14px; font-style: italic; color: white; opacity: 0.7; margin-top: -10px;">
+            {store.count(league_key)} transactions, synced {datetime.fromtimestamp(synced_at, est).strftime("%B %d, %Y - %I:%M %p")} EST
+        </p>
+    """, unsafe_allow_html=True)
+
+    # Adds/drops by day of the week
+    st.subheader("When do managers make moves?")
+    by_weekday = store.moves_by_weekday(league_key)
+    by_weekday["Day"] = pd.Categorical(by_weekday["weekday"].map(dict(enumerate(weekdays))), categories=weekdays, ordered=True)
+    st.bar_chart(by_weekday.set_index("Day")[["adds", "drops"]].rename(columns=str.title))
+
+    day = st.selectbox("Most added players on", weekdays)
+    most_added = store.most_added_by_weekday(league_key, limit=10)
+    most_added = most_added[most_added["weekday"] == weekdays.index(day)]
+    st.dataframe(most_added[["player_name", "adds"]].rename(columns={"player_name": "Player", "adds": "Adds"}),
+                 use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Drop → re-add churn")
+        churn = store.churn(league_key)
+        churn = churn.drop(columns=["player_id"]).rename(columns={
+            "player_name": "Player", "readds": "Re-adds", "same_team_readds": "By Same Team",
+            "avg_hours_unowned": "Avg Hours Unowned"})
+        st.dataframe(churn, use_container_width=True, hide_index=True)
+    with col2:
+        st.subheader("Team activity")
+        activity = store.team_activity(league_key)
+        activity["last_move"] = activity["last_move"].map(
+            lambda ts: datetime.fromtimestamp(ts, est).strftime("%b %d, %I:%M %p"))
+        activity = activity.drop(columns=["team_key"])
+        activity.columns = activity.columns.str.replace("_", " ").str.title()
+        st.dataframe(activity, use_container_width=True, hide_index=True)
+
+
+# --------------- 🩺 DIAGNOSTICS (hidden) ---------------
+elif selection == "🩺 Diagnostics":
+    st.title("🩺 Diagnostics")
+    metrics = get_metrics()
+    est = pytz.timezone('US/Eastern')
+    st.markdown(f"""
+        <p style="font-size: 14px; font-style: italic; color: white; opacity: 0.7; margin-top: -10px;">
+            Collected in this server process since {datetime.fromtimestamp(metrics.started_at, est).strftime("%B %d, %Y - %I:%M %p")} EST
+        </p>
+    """, unsafe_allow_html=True)
+
+    # Upstream calls first, then the app's own phases
+    histograms = pd.DataFrame(metrics.histograms())
+    if not histograms.empty:
+        for name, title in (("upstream_seconds", "Upstream calls"), ("rate_limit_wait_seconds", "Rate limiter waits"),
+                            ("span_seconds", "Phases")):
+            rows = histograms[histograms["metric"] == name].drop(columns=["metric"])
+            if not rows.empty:
+                st.subheader(title)
+                st.dataframe(rows.sort_values("total_s", ascending=False).round(3), use_container_width=True, hide_index=True)
+
+    from transport import cache_report, get_http_adapter
+    http_cache = pd.DataFrame(cache_report())
+    if not http_cache.empty:
+        entries, stored_bytes = get_http_adapter().cache.stats()
+        st.subheader("HTTP cache")
+        st.caption(f"{entries} responses on disk ({stored_bytes / 2 ** 20:.1f} MB)")
+        st.dataframe(http_cache.round(3), use_container_width=True, hide_index=True)
+
+    counters = pd.DataFrame(metrics.counters())
+    if not counters.empty:
+        st.subheader("Counters")
+        st.dataframe(counters, use_container_width=True, hide_index=True)
+
+    # Stat corrections: re-fetch one finalized week, then republish everything derived from it
+    st.subheader("Rebuild a week")
+    with st.form("rebuild_week"):
+        rebuild_league = st.text_input("League key (blank: the account's first league)", value=requested_league or "")
+        rebuild_week_number = st.number_input("Week", min_value=1, step=1)
+        if st.form_submit_button("Rebuild"):
+            from refresh import get_refresh_scheduler
+            with st.spinner("Rebuilding..."):
+                rebuilt = get_refresh_scheduler(rebuild_league or None).rebuild_week(int(rebuild_week_number))
+            st.success(f"Week {int(rebuild_week_number)} rebuilt ({len(rebuilt)} teams); the home page now shows the corrected stats.")
+
+    prometheus_text = metrics.to_prometheus()
+    st.download_button("Download Prometheus metrics", prometheus_text, file_name="metrics.prom", mime="text/plain")
+    with st.expander("Prometheus text"):
+        st.code(prometheus_text, language="text")
+    if st.button("Reset metrics"):
+        metrics.reset()
+        st.rerun()
+
+
 # Footer
 st.markdown("""
     <style>
@@ -273,3 +567,5 @@ st.markdown("""
     </style>
     <div class='footer'>© 2025 Ryan Sandan</div>
 """, unsafe_allow_html=True)
+
+render_span.end()
@@ -0,0 +1,17 @@
+"""
+Shared setup: tests import the app's modules (and the replay backend in
+benchmarks/) directly, with the local SQLite stores in a scratch directory.
+"""
+# Standard library
+import os
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The stores read SNAPSHOT_DB at import, so point it away from the repo's data/ first
+os.environ["SNAPSHOT_DB"] = os.path.join(tempfile.mkdtemp(prefix="tests-"), "league.sqlite")
+# Appended, not prepended: the repo's streamlit.py must not shadow the streamlit package
+for path in (REPO_DIR, os.path.join(REPO_DIR, "benchmarks")):
+    if path not in sys.path:
+        sys.path.append(path)
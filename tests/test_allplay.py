@@ -0,0 +1,72 @@
+"""All-play results from the broadcast engine match a brute-force loop over every pair of teams."""
+# Third-party libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local modules
+from allplay import AllPlayTracker, compute_all_play
+from logic import get_season_scoreboards, stat_categories
+from replay import ReplayLeague
+from store import WeekStore
+
+
+@pytest.fixture(scope="module")
+def scoreboards():
+    return get_season_scoreboards(ReplayLeague(weeks=6, teams=8, seed=11), WeekStore(":memory:"))
+
+
+def compare(a, b):
+    """+1 if row a wins more categories than row b, -1 if fewer, 0 if tied."""
+    won = lost = 0
+    for category in stat_categories:
+        x, y = a[category], b[category]
+        if category == "TO":
+            x, y = y, x
+        won += x > y
+        lost += x < y
+    return int(won > lost) - int(won < lost)
+
+
+def brute_force(scoreboards):
+    rows = []
+    for week, week_rows in scoreboards.groupby("week", sort=True):
+        week_rows = week_rows.reset_index(drop=True)
+        for i, team in week_rows.iterrows():
+            results = [compare(team, other) for j, other in week_rows.iterrows() if j != i]
+            opponent = i + 1 if i % 2 == 0 else i - 1
+            actual = (compare(team, week_rows.loc[opponent]) + 1) / 2 if opponent < len(week_rows) else np.nan
+            wins, losses, ties = results.count(1), results.count(-1), results.count(0)
+            rows.append({"week": week, "team_key": team["team_key"], "AP_W": wins, "AP_L": losses, "AP_T": ties,
+                         "Expected": (wins + 0.5 * ties) / len(results), "Actual": actual})
+    return pd.DataFrame(rows).sort_values(["week", "team_key"], ignore_index=True)
+
+
+def assert_matches_brute_force(scoreboards, result):
+    expected = brute_force(scoreboards)
+    result = result.sort_values(["week", "team_key"], ignore_index=True)
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+    np.testing.assert_allclose(result["Luck"], result["Actual"] - result["Expected"])
+
+
+def test_all_play_matches_brute_force(scoreboards):
+    assert_matches_brute_force(scoreboards, compute_all_play(scoreboards))
+
+
+def test_team_missing_a_week_is_left_out_of_it(scoreboards):
+    # Drop one matchup from week 3: those two teams have no all-play row that week
+    week3 = scoreboards.index[scoreboards["week"] == 3]
+    partial = scoreboards.drop(week3[:2]).reset_index(drop=True)
+    result = compute_all_play(partial)
+    assert len(result[result["week"] == 3]) == len(week3) - 2
+    assert_matches_brute_force(partial, result)
+
+
+def test_tracker_recomputes_changed_weeks(scoreboards):
+    tracker = AllPlayTracker()
+    assert_matches_brute_force(scoreboards, tracker.update(scoreboards))
+
+    # A stat correction in one week flows through; the other weeks come from the tracker's memory
+    corrected = scoreboards.copy()
+    corrected.loc[corrected["week"] == 2, "PTS"] = corrected.loc[corrected["week"] == 2, "PTS"][::-1].to_numpy()
+    assert_matches_brute_force(corrected, tracker.update(corrected))
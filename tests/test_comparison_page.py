@@ -0,0 +1,29 @@
+"""
+The comparison page only needs NBA data: rendering it and comparing two
+players must not call Yahoo at all.
+"""
+# Standard library
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_APP = os.path.join(REPO_DIR, "benchmarks", "bench_app.py")
+
+
+def render_calls(page):
+    """Renders one page on the replay backend in a fresh interpreter; returns its upstream calls by endpoint."""
+    # Run outside the repo so the repo's streamlit.py doesn't shadow the streamlit package
+    proc = subprocess.run([sys.executable, BENCH_APP, "--child", f"page:{page}",
+                           "--players", "50", "--games", "10", "--latency", "0"],
+                          capture_output=True, text=True, cwd=tempfile.gettempdir())
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])["calls"]
+
+
+def test_comparison_page_makes_no_yahoo_calls():
+    calls = render_calls("comparison")
+    assert calls, "the comparison never loaded any player data"
+    assert [name for name in calls if name.startswith("yahoo.")] == []
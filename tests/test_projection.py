@@ -0,0 +1,74 @@
+"""Monte Carlo matchup projection: reproducible for a seed, and exact once nothing is left to play."""
+# Third-party libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local modules
+import projection
+from logic import get_season_scoreboards, stat_categories
+from projection import build_projection_inputs, project_matchups, simulate_matchups
+from replay import ReplayLeague
+from store import WeekStore
+
+
+@pytest.fixture(scope="module")
+def season():
+    return get_season_scoreboards(ReplayLeague(weeks=5, teams=6, seed=7), WeekStore(":memory:"))
+
+
+@pytest.fixture(scope="module")
+def week_df(season):
+    return season[season["week"] == 5].reset_index(drop=True)
+
+
+def test_same_seed_same_projection(week_df, season):
+    first = project_matchups(week_df, season, n_sims=20_000, seed=42)
+    second = project_matchups(week_df, season, n_sims=20_000, seed=42)
+    for a, b in zip(first, second):
+        pd.testing.assert_frame_equal(a, b)
+
+    other = project_matchups(week_df, season, n_sims=20_000, seed=43)[0]
+    assert not other.equals(first[0])
+
+
+def test_outcome_probabilities_add_up(week_df, season):
+    matchups, categories = project_matchups(week_df, season, n_sims=20_000, seed=1)
+    assert len(matchups) == len(week_df) // 2
+    totals = matchups["Win %"] + matchups["Tie %"] + matchups["Loss %"]
+    np.testing.assert_allclose(totals, 100, atol=0.15)
+    assert categories[stat_categories].apply(lambda col: col.between(0, 100).all()).all()
+
+
+def test_finished_week_is_decided_by_current_totals(week_df):
+    done = week_df.assign(remaining_games=0, live_games=0)
+    matchups, categories = project_matchups(done, n_sims=2_000, seed=1)
+
+    inputs = build_projection_inputs(done)
+    current = inputs["current"]
+    current_pct = {"FG%": current["FGM"] / current["FGA"], "FT%": current["FTM"] / current["FTA"]}
+    for i, row in matchups.iterrows():
+        first_wins = second_wins = 0
+        for category in stat_categories:
+            values = current_pct[category] if category in current_pct else current[category]
+            a, b = values[2 * i], values[2 * i + 1]
+            if category == "TO":
+                a, b = b, a
+            first_wins += a > b
+            second_wins += b > a
+            expected = 100.0 if a > b else 0.0
+            assert categories.loc[i, category] == expected, (row["Matchup"], category)
+        expected_win = 100.0 if first_wins > second_wins else 0.0
+        assert row["Win %"] == expected_win
+
+
+def test_parallel_chunks_match_serial_run(week_df, season, monkeypatch):
+    inputs = build_projection_inputs(week_df, season)
+    n_sims = projection.PARALLEL_THRESHOLD + projection.CHUNK_SIZE // 2  # ragged last chunk
+    parallel = simulate_matchups(inputs, n_sims=n_sims, seed=9, workers=2)
+    monkeypatch.setattr(projection, "PARALLEL_THRESHOLD", float("inf"))
+    serial = simulate_matchups(inputs, n_sims=n_sims, seed=9)
+    for key in serial:
+        np.testing.assert_array_equal(parallel[key], serial[key])
+    assert parallel["first_wins"].sum() + parallel["second_wins"].sum() + parallel["ties"].sum() \
+        == n_sims * len(week_df) // 2
@@ -0,0 +1,94 @@
+"""SharedCache: concurrent misses collapse into one load, and invalidation really drops entries."""
+# Standard library
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party libraries
+import pytest
+
+# Local modules
+from cache import SharedCache
+
+
+def test_concurrent_misses_share_one_load():
+    cache = SharedCache(ttls={"season": 60})
+    started, release = threading.Event(), threading.Event()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return "season frame"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get, "season", loader, key="l.1") for _ in range(8)]
+        started.wait(5)
+        time.sleep(0.05)  # let the other callers find the load in flight
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert loads == [1]
+    assert results == ["season frame"] * 8
+    assert cache.get("season", lambda: "reloaded", key="l.1") == "season frame"
+
+
+def test_failed_load_reaches_every_waiter_and_is_not_cached():
+    cache = SharedCache(ttls={"season": 60})
+
+    def loader():
+        raise RuntimeError("yahoo is down")
+
+    with pytest.raises(RuntimeError):
+        cache.get("season", loader, key="l.1")
+    assert cache.get("season", lambda: "ok", key="l.1") == "ok"
+
+
+def test_entries_expire_after_their_ttl():
+    cache = SharedCache(ttls={"matchups": 0.05})
+    assert cache.get("matchups", lambda: 1) == 1
+    assert cache.get("matchups", lambda: 2) == 1
+    time.sleep(0.06)
+    assert cache.get("matchups", lambda: 3) == 3
+
+
+def test_invalidate_is_scoped_by_dataset_and_key():
+    cache = SharedCache(ttls={"season": 60, "logos": 60}, volatile={"season"})
+    for dataset in ("season", "logos"):
+        for key in ("l.1", "l.2"):
+            cache.get(dataset, lambda: "old", key=key)
+
+    cache.invalidate_volatile("l.1")
+    assert cache.get("season", lambda: "new", key="l.1") == "new"
+    assert cache.get("season", lambda: "new", key="l.2") == "old"
+    assert cache.get("logos", lambda: "new", key="l.1") == "old"
+
+    cache.invalidate()
+    assert cache.get("logos", lambda: "new", key="l.2") == "new"
+
+
+def test_invalidate_during_a_load_does_not_resurrect_the_old_value():
+    cache = SharedCache(ttls={"season": 60})
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return "stale"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(cache.get, "season", slow_loader)
+        started.wait(5)
+        cache.invalidate("season")
+        release.set()
+        assert future.result(5) == "stale"  # the caller still gets its value...
+    assert cache.get("season", lambda: "fresh") == "fresh"  # ...but it isn't kept
+
+
+def test_versioned_entries_are_replaced_not_accumulated():
+    cache = SharedCache(ttls={"player_windows": 60})
+    assert cache.get_versioned("player_windows", "2024-25", 1, lambda: "rev 1") == "rev 1"
+    assert cache.get_versioned("player_windows", "2024-25", 1, lambda: "recomputed") == "rev 1"
+    assert cache.get_versioned("player_windows", "2024-25", 2, lambda: "rev 2") == "rev 2"
+    assert list(cache._entries) == [("player_windows", "2024-25")]
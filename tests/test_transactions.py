@@ -0,0 +1,75 @@
+"""Transaction syncs resume from the stored cursor and only fetch what's new."""
+# Local modules
+import transactions
+from replay import CallLog, ReplayLeague
+from store import TransactionStore
+from transactions import FIRST_PAGE, parse_transactions, sync_transactions
+
+
+class GrowingLeague(ReplayLeague):
+    """ReplayLeague whose transaction log can grow, recording each requested page size."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.counts = []
+
+    def transactions(self, tran_types, count):
+        self.counts.append(count)
+        return super().transactions(tran_types, count)
+
+    def add_transactions(self, n):
+        # Same seed, so the regenerated log keeps every existing transaction
+        self.n_transactions += n
+        self._transactions = None
+
+
+def all_rows(league):
+    return len(parse_transactions(league.league_id, league.transactions("", "")))
+
+
+def test_first_sync_stores_everything_and_sets_the_cursor():
+    league = GrowingLeague(teams=4, transactions=120)
+    store = TransactionStore(":memory:")
+
+    added = sync_transactions(league, store=store)
+    assert league.counts == [""]
+    assert added == all_rows(league)
+    assert store.count(league.league_id) == 120
+    assert store.cursor(league.league_id)[0] == 120
+
+
+def test_later_syncs_page_back_only_to_the_cursor():
+    league = GrowingLeague(teams=4, transactions=120)
+    store = TransactionStore(":memory:")
+    sync_transactions(league, store=store)
+    before = all_rows(league)
+
+    league.add_transactions(40)
+    league.counts.clear()
+    added = sync_transactions(league, store=store, force=True)
+    assert league.counts == [str(FIRST_PAGE), str(FIRST_PAGE * 4)]
+    assert store.cursor(league.league_id)[0] == 160
+    assert before + added == all_rows(league)  # each new row once, none of the old ones again
+    assert store.count(league.league_id) == 160
+
+    # Nothing new: one small page, nothing added, cursor unchanged
+    league.counts.clear()
+    assert sync_transactions(league, store=store, force=True) == 0
+    assert league.counts == [str(FIRST_PAGE)]
+    assert store.cursor(league.league_id)[0] == 160
+
+
+def test_sync_within_interval_skips_the_api(monkeypatch):
+    calls = CallLog()
+    league = GrowingLeague(teams=4, transactions=30, calls=calls)
+    store = TransactionStore(":memory:")
+    sync_transactions(league, store=store)
+
+    calls.reset()
+    league.add_transactions(5)
+    assert sync_transactions(league, store=store) == 0
+    assert calls.snapshot().get("yahoo.transactions", 0) == 0
+
+    monkeypatch.setattr(transactions, "SYNC_INTERVAL", 0)
+    assert sync_transactions(league, store=store) > 0
+    assert calls.snapshot()["yahoo.transactions"] == 1
@@ -0,0 +1,66 @@
+"""9-cat z-scores from the batched valuation match a per-player reference computation."""
+# Third-party libraries
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local modules
+from aggregates import compute_window_aggregates
+from replay import ReplayNBA
+from valuation import CATEGORIES, nine_cat_values, screen_players
+
+COUNTING = {"3PTM": "FG3M", "PTS": "PTS", "REB": "REB", "AST": "AST", "STL": "STL", "BLK": "BLK", "TO": "TOV"}
+PERCENT = {"FG%": ("FGM", "FGA"), "FT%": ("FTM", "FTA")}
+
+
+@pytest.fixture(scope="module")
+def aggregates():
+    game_logs = ReplayNBA(players=40, games=12, seed=3).league_log()
+    game_logs["GAME_DATE"] = pd.to_datetime(game_logs["GAME_DATE"])
+    return compute_window_aggregates(game_logs, as_of=game_logs["GAME_DATE"].max())
+
+
+def reference_z_scores(aggregates, window, min_games):
+    """Category by category, player by player: the definition nine_cat_values implements."""
+    per_game = aggregates.xs((window, "Average"), level=["window", "mode"])
+    totals = aggregates.xs((window, "Total"), level=["window", "mode"])
+    pool = [player for player in per_game.index if per_game.loc[player, "GP"] >= min_games]
+    z = pd.DataFrame(index=pool)
+    for category in CATEGORIES:
+        if category in PERCENT:
+            made, attempted = PERCENT[category]
+            pool_pct = sum(totals.loc[p, made] for p in pool) / sum(totals.loc[p, attempted] for p in pool)
+            impact = [per_game.loc[p, made] - pool_pct * per_game.loc[p, attempted] for p in pool]
+        else:
+            impact = [per_game.loc[p, COUNTING[category]] for p in pool]
+        impact = np.array(impact)
+        scores = (impact - impact.mean()) / impact.std()
+        z[category] = -scores if category == "TO" else scores
+    return z
+
+
+@pytest.mark.parametrize("window, min_games", [("season", 1), (7, 2)])
+def test_z_scores_match_reference(aggregates, window, min_games):
+    values = nine_cat_values(aggregates, window, min_games=min_games)
+    expected = reference_z_scores(aggregates, window, min_games)
+
+    assert set(values.index) == set(expected.index)
+    for category in CATEGORIES:
+        np.testing.assert_allclose(values.loc[expected.index, "z_" + category], expected[category], atol=1e-9)
+    np.testing.assert_allclose(values.loc[expected.index, "Value"], expected.sum(axis=1), atol=1e-9)
+    assert values["Value"].is_monotonic_decreasing
+    assert values["Rank"].iloc[0] == 1
+
+
+def test_turnovers_count_against_a_player(aggregates):
+    values = nine_cat_values(aggregates, "season")
+    most_turnovers = values["TO"].idxmax()
+    assert values.loc[most_turnovers, "z_TO"] == values["z_TO"].min()
+
+
+def test_punting_resums_the_other_categories(aggregates):
+    values = nine_cat_values(aggregates, "season")
+    punted = screen_players(values, punt=["FT%", "TO"])
+    kept = ["z_" + cat for cat in CATEGORIES if cat not in ("FT%", "TO")]
+    np.testing.assert_allclose(punted["Value"], punted[kept].sum(axis=1))
+    assert punted["Value"].is_monotonic_decreasing
@@ -0,0 +1,53 @@
+"""Finalized weeks are stored once and never fetched again; live weeks always are."""
+# Third-party libraries
+import pandas as pd
+
+# Local modules
+from logic import get_season_scoreboards
+from replay import CallLog, ReplayLeague
+from store import WeekStore, is_week_final
+
+
+def week_df(week, remaining=0, live=0):
+    return pd.DataFrame({"week": [week, week], "name": ["Team 1", "Team 2"],
+                         "remaining_games": [remaining, 0], "live_games": [live, None]})
+
+
+def test_week_is_final_once_behind_and_no_games_left():
+    assert is_week_final(week_df(3), curr_week_num=4)
+    assert not is_week_final(week_df(4), curr_week_num=4)              # still the current week
+    assert not is_week_final(week_df(3, remaining=2), curr_week_num=4)
+    assert not is_week_final(week_df(3, live=1), curr_week_num=4)
+    assert not is_week_final(week_df(3).iloc[:0], curr_week_num=4)
+
+
+def test_week_store_round_trip():
+    store = WeekStore(":memory:")
+    store.save_week("l.1", 2, week_df(2))
+    store.save_week("l.1", 1, week_df(1))
+    store.save_week("l.2", 5, week_df(5))
+    assert store.weeks("l.1") == [1, 2]
+    pd.testing.assert_frame_equal(store.load_week("l.1", 2), week_df(2), check_dtype=False)
+
+    store.save_week("l.1", 2, week_df(2, remaining=1))  # replaces, doesn't duplicate
+    assert store.weeks("l.1") == [1, 2]
+    assert store.load_week("l.1", 2)["remaining_games"].tolist() == [1, 0]
+
+    store.delete_week("l.1", 2)
+    assert store.weeks("l.1") == [1]
+    assert store.load_week("l.1", 2) is None
+
+
+def test_season_scoreboards_only_fetch_weeks_that_can_change():
+    calls = CallLog()
+    league = ReplayLeague(weeks=6, teams=4, calls=calls)
+    store = WeekStore(":memory:")
+
+    first = get_season_scoreboards(league, store)
+    assert calls.snapshot()["yahoo.matchups"] == 6
+    assert store.weeks(league.league_id) == [1, 2, 3, 4, 5]  # the current week isn't final
+
+    calls.reset()
+    second = get_season_scoreboards(league, store)
+    assert calls.snapshot()["yahoo.matchups"] == 1
+    pd.testing.assert_frame_equal(first, second, check_dtype=False)
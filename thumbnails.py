@@ -0,0 +1,135 @@
+"""
+Local thumbnails for team logos and player headshots.
+
+Each image is downloaded once, shrunk to its display size (times
+PIXEL_RATIO, so it stays sharp on HiDPI screens), re-encoded as WebP and
+kept in the ThumbnailStore. Pages embed the thumbnails as data URIs, so the
+browser makes no requests to Yahoo's or the NBA's CDN, and a headshot is a
+few KB instead of a 1040x760 PNG.
+"""
+# Standard library
+import base64
+import io
+import threading
+import time
+
+# Third-party libraries
+import requests
+from PIL import Image
+
+# Local modules
+from fetch import get_fetch_executor
+from metrics import get_metrics
+from store import ThumbnailStore
+from transport import CachingHTTPAdapter
+
+# Display sizes (width, height) in CSS pixels
+LOGO_SIZE = (30, 30)
+HEADSHOT_SIZE = (75, 55)
+
+# Stored at this multiple of the display size
+PIXEL_RATIO = 2
+
+# An image that failed to download is served from its URL, and retried after this long
+RETRY_FAILED_AFTER = 3600
+
+
+_session = None
+_session_lock = threading.Lock()
+
+def fetch_image(url):
+    """Downloads one image on a pooled session (images skip the HTTP cache; the thumbnail is what's kept)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = CachingHTTPAdapter()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+    response = _session.get(url, timeout=10)
+    response.raise_for_status()
+    return response.content
+
+
+def make_thumbnail(data, size):
+    """Fits image bytes inside `size` x PIXEL_RATIO, keeping the aspect ratio. Returns (mime, WebP bytes)."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGBA")
+        image.thumbnail((size[0] * PIXEL_RATIO, size[1] * PIXEL_RATIO), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, format="WEBP", quality=85)
+    return "image/webp", out.getvalue()
+
+
+def _data_uri(mime, data):
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+class ThumbnailCache:
+    """
+    Data URIs for images at a display size: from memory, else the store, else
+    downloaded and resized (missing ones side by side on the fetch executor).
+    """
+
+    def __init__(self, store=None):
+        self.store = store or ThumbnailStore()
+        self._uris = {}    # (url, size) -> data URI
+        self._failed = {}  # url -> time.monotonic() of the last failed download
+        self._lock = threading.Lock()
+
+    def data_uris(self, urls, size):
+        """Returns {url: data URI} for `urls`; images that can't be fetched map to their own URL."""
+        metrics = get_metrics()
+        size = tuple(size)
+        with self._lock:
+            uris = {url: self._uris.get((url, size)) for url in urls}
+        in_memory = sum(uri is not None for uri in uris.values())
+        if in_memory:
+            metrics.count("thumbnail_requests_total", in_memory, result="memory")
+
+        missing = []
+        for url in [url for url, uri in uris.items() if uri is None]:
+            stored = self.store.load(url, size)
+            if stored is not None:
+                uris[url] = _data_uri(*stored)
+                metrics.count("thumbnail_requests_total", result="disk")
+            else:
+                missing.append(url)
+
+        now = time.monotonic()
+        with self._lock:
+            fetch = [url for url in missing if now - self._failed.get(url, -RETRY_FAILED_AFTER) >= RETRY_FAILED_AFTER]
+        if fetch:
+            built = get_fetch_executor().map(lambda url: self._build(url, size), fetch, host="cdn", endpoint="image")
+            uris.update(zip(fetch, built))
+
+        with self._lock:
+            for url, uri in uris.items():
+                if uri is not None:
+                    self._uris[(url, size)] = uri
+        return {url: uri or url for url, uri in uris.items()}
+
+    def _build(self, url, size):
+        try:
+            mime, data = make_thumbnail(fetch_image(url), size)
+        except Exception as e:
+            print(f"⚠️ Couldn't thumbnail {url}: {e}")
+            get_metrics().count("thumbnail_requests_total", result="failed")
+            with self._lock:
+                self._failed[url] = time.monotonic()
+            return None
+        self.store.save(url, size, mime, data)
+        get_metrics().count("thumbnail_requests_total", result="fetched")
+        return _data_uri(mime, data)
+
+
+_thumbnail_cache = None
+_thumbnail_cache_lock = threading.Lock()
+
+def get_thumbnail_cache():
+    """Returns the process-wide thumbnail cache (created on first use)."""
+    global _thumbnail_cache
+    with _thumbnail_cache_lock:
+        if _thumbnail_cache is None:
+            _thumbnail_cache = ThumbnailCache()
+        return _thumbnail_cache
@@ -0,0 +1,137 @@
+"""
+Incremental ingest of the league's add/drop/trade history.
+
+The first sync downloads the whole history once. After that, only
+transactions newer than the stored cursor are kept: Yahoo has no "since"
+filter, so the newest `count` are requested and `count` grows until the
+response reaches the cursor.
+"""
+# Standard library
+import threading
+import time
+
+# Third-party libraries
+import pandas as pd
+
+# Local modules
+from fetch import get_fetch_executor
+from metrics import timed
+from store import TransactionStore
+
+TRANSACTION_TYPES = "add,drop,trade"
+
+# Newest transactions asked for on an incremental sync (grows 4x until it reaches the cursor)
+FIRST_PAGE = 25
+
+# Add/drops don't happen every minute; don't ask Yahoo more often than this
+SYNC_INTERVAL = 10 * 60
+
+# Day-of-week and hour are bucketed in league time
+LEAGUE_TIMEZONE = "US/Eastern"
+
+
+_transaction_store = None
+_transaction_store_lock = threading.Lock()
+
+# One sync at a time per league, so a slow league doesn't hold up the others
+_sync_locks = {}
+_sync_locks_lock = threading.Lock()
+
+def get_transaction_store():
+    """Returns the process-wide transaction store (created on first use)."""
+    global _transaction_store
+    with _transaction_store_lock:
+        if _transaction_store is None:
+            _transaction_store = TransactionStore()
+        return _transaction_store
+
+
+def _merge(items):
+    # Yahoo spreads one object over a list of single-key dicts (with [] fillers)
+    merged = {}
+    for item in items if isinstance(items, list) else [items]:
+        if isinstance(item, dict):
+            merged.update(item)
+    return merged
+
+
+def parse_transactions(league_key, transactions):
+    """
+    Flattens lg.transactions() output into store rows, one per player moved.
+    Only successful transactions are kept.
+    """
+    rows = []
+    for transaction in transactions:
+        if transaction.get("status") != "successful":
+            continue
+        timestamp = int(transaction["timestamp"])
+        local = pd.Timestamp(timestamp, unit="s", tz="UTC").tz_convert(LEAGUE_TIMEZONE)
+        players = transaction.get("players", {})
+        for key, value in players.items():
+            if key == "count":
+                continue
+            player = value["player"]
+            info = _merge(player[0])
+            data = _merge(player[1].get("transaction_data", {}))
+            move = data.get("type")
+            # Adds and trades belong to the receiving team, drops to the team letting go
+            if move == "drop":
+                team_key, team_name = data.get("source_team_key"), data.get("source_team_name")
+                other_team_key = None
+            else:
+                team_key, team_name = data.get("destination_team_key"), data.get("destination_team_name")
+                other_team_key = data.get("source_team_key")
+            rows.append({
+                "league_key": league_key,
+                "transaction_key": transaction["transaction_key"],
+                "transaction_id": int(transaction["transaction_id"]),
+                "transaction_type": transaction["type"],
+                "timestamp": timestamp,
+                "weekday": local.dayofweek,
+                "hour": local.hour,
+                "player_id": int(info["player_id"]),
+                "player_name": info.get("name", {}).get("full"),
+                "move": move,
+                "source_type": data.get("source_type"),
+                "team_key": team_key,
+                "team_name": team_name,
+                "other_team_key": other_team_key,
+            })
+    return rows
+
+
+def _fetch_since(lg, cursor):
+    """Newest transactions until the response reaches `cursor` (everything if cursor is None)."""
+    executor = get_fetch_executor()
+    if cursor is None:
+        return executor.call(lg.transactions, TRANSACTION_TYPES, "")
+    count = FIRST_PAGE
+    while True:
+        transactions = executor.call(lg.transactions, TRANSACTION_TYPES, str(count))
+        ids = [int(t["transaction_id"]) for t in transactions]
+        if len(transactions) < count or min(ids) <= cursor:
+            return [t for t, transaction_id in zip(transactions, ids) if transaction_id > cursor]
+        count *= 4
+
+
+@timed("transactions.sync")
+def sync_transactions(lg, store=None, force=False):
+    """
+    Appends the league's transactions newer than the stored cursor. Skips the
+    API entirely if the league was synced within SYNC_INTERVAL. Returns the
+    number of rows added.
+    """
+    store = store or get_transaction_store()
+    with _sync_locks_lock:
+        sync_lock = _sync_locks.setdefault(lg.league_id, threading.Lock())
+    with sync_lock:
+        cursor, synced_at = store.cursor(lg.league_id)
+        if not force and synced_at is not None and time.time() - synced_at < SYNC_INTERVAL:
+            return 0
+
+        transactions = _fetch_since(lg, cursor)
+        ids = [int(t["transaction_id"]) for t in transactions]
+        last_id = max(ids + ([cursor] if cursor is not None else []), default=0)
+        added = store.append(lg.league_id, parse_transactions(lg.league_id, transactions), last_id)
+        print(f"✅ Stored {added} transaction rows for {lg.league_id} (cursor {last_id})")
+        return added
@@ -0,0 +1,166 @@
+"""
+Shared HTTP transport for Yahoo (yfa) and NBA stats (nba_api) requests.
+
+One pooled adapter is mounted on both clients' sessions, so connections are
+kept alive between calls, and across Yahoo token refreshes, which swap the
+session. GET responses that carry an ETag or Last-Modified are kept on disk.
+The next request for the same URL is sent conditionally, and a 304 is
+answered with the stored body.
+"""
+# Standard library
+import threading
+from urllib.parse import urlsplit
+
+# Third-party libraries
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_ACCEPT_ENCODING, get_encoding_from_headers
+
+# Local modules
+from fetch import raise_for_retryable_status
+from metrics import get_metrics
+from store import HTTPCacheStore
+
+# Connections kept open per host; matches the fetch executor's worker count
+POOL_SIZE = 8
+
+# Headers that describe the connection or the encoded body, not the resource
+UNSTORED_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-encoding", "content-length",
+                    "set-cookie", "date", "age"}
+
+
+def _host_label(url):
+    # Same host labels as the fetch executor's rate limits
+    netloc = urlsplit(url).netloc
+    if "yahoo" in netloc:
+        return "yahoo"
+    if "nba.com" in netloc:
+        return "nba"
+    return netloc
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    `requests` adapter with a connection pool per host and a revalidating
+    disk cache. Only asks for encodings urllib3 can decode (nba_api asks for
+    brotli even when it isn't installed).
+    """
+
+    def __init__(self, cache=None, pool_maxsize=POOL_SIZE, **kwargs):
+        self.cache = cache
+        super().__init__(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, **kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        request.headers["Accept-Encoding"] = DEFAULT_ACCEPT_ENCODING
+        cacheable = self.cache is not None and request.method == "GET" and not stream
+        entry = self.cache.get(request.url) if cacheable else None
+        if entry is not None:
+            if entry["etag"]:
+                request.headers.setdefault("If-None-Match", entry["etag"])
+            if entry["last_modified"]:
+                request.headers.setdefault("If-Modified-Since", entry["last_modified"])
+
+        response = super().send(request, stream=stream, **kwargs)
+        if stream:
+            return response
+
+        metrics = get_metrics()
+        host = _host_label(request.url)
+        body = response.content  # reads (and decodes) the body, returning the connection to the pool
+        wire_bytes = response.raw.tell() if response.raw is not None else len(body)
+        metrics.count("http_bytes_received_total", wire_bytes, host=host)
+        if len(body) > wire_bytes:
+            metrics.count("http_bytes_saved_total", len(body) - wire_bytes, host=host, reason="compression")
+
+        if not cacheable:
+            return response
+        if response.status_code == 304 and entry is not None:
+            metrics.count("http_cache_requests_total", host=host, result="hit")
+            metrics.count("http_bytes_saved_total", len(entry["body"]), host=host, reason="not_modified")
+            self.cache.touch(request.url)
+            return self._from_cache(request, response, entry)
+
+        metrics.count("http_cache_requests_total", host=host, result="miss")
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified) \
+                and "no-store" not in response.headers.get("Cache-Control", ""):
+            headers = {key: value for key, value in response.headers.items() if key.lower() not in UNSTORED_HEADERS}
+            self.cache.put(request.url, etag, last_modified, headers, body)
+        return response
+
+    def _from_cache(self, request, not_modified, entry):
+        # The stored 200, with any headers the 304 refreshed
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.headers.update((key, value) for key, value in not_modified.headers.items()
+                                if key.lower() not in UNSTORED_HEADERS)
+        response._content = entry["body"]
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = not_modified.raw
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_nba_session = None
+
+def get_http_adapter():
+    """Returns the process-wide caching adapter (created on first use)."""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = CachingHTTPAdapter(HTTPCacheStore())
+        return _adapter
+
+
+def mount(session):
+    """Routes every request of a `requests` session through the shared adapter."""
+    adapter = get_http_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def install_nba_session():
+    """Points nba_api's stats endpoints at a session on the shared adapter (once per process)."""
+    global _nba_session
+    from nba_api.stats.library.http import NBAStatsHTTP
+
+    with _adapter_lock:
+        if _nba_session is not None:
+            return
+        _nba_session = requests.Session()
+        # Same as the Yahoo session: 429/5xx raise with their status, so the fetch executor retries them
+        _nba_session.hooks["response"].append(raise_for_retryable_status)
+    NBAStatsHTTP.set_session(mount(_nba_session))
+
+
+def cache_report():
+    """
+    Rows for display, one per host: conditional-cache hit rate and the bytes
+    the cache (304s) and compression saved, from the metrics counters.
+    """
+    metrics = get_metrics()
+    report = {}
+
+    def entry(host):
+        return report.setdefault(host, {"host": host, "requests": 0, "hits": 0, "received_mb": 0.0,
+                                        "saved_not_modified_mb": 0.0, "saved_compression_mb": 0.0})
+
+    for labels, value in metrics.counter_series("http_cache_requests_total"):
+        entry(labels["host"])["requests"] += value
+        if labels["result"] == "hit":
+            entry(labels["host"])["hits"] += value
+    for labels, value in metrics.counter_series("http_bytes_received_total"):
+        entry(labels["host"])["received_mb"] += value / 2 ** 20
+    for labels, value in metrics.counter_series("http_bytes_saved_total"):
+        entry(labels["host"])[f"saved_{labels['reason']}_mb"] += value / 2 ** 20
+    for row in report.values():
+        row["hit_rate"] = row["hits"] / row["requests"] if row["requests"] else 0.0
+    return list(report.values())
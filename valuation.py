@@ -0,0 +1,79 @@
+# Third-party libraries
+import numpy as np
+import pandas as pd
+
+# Local modules
+from metrics import timed
+
+# The league's 9 categories, as named in the game logs (TO counts against you)
+COUNTING_CATEGORIES = {"3PTM": "FG3M", "PTS": "PTS", "REB": "REB", "AST": "AST",
+                       "STL": "STL", "BLK": "BLK", "TO": "TOV"}
+NEGATIVE_CATEGORIES = {"TO"}
+PERCENT_CATEGORIES = {"FG%": ("FGM", "FGA"), "FT%": ("FTM", "FTA")}
+CATEGORIES = ["FG%", "FT%", "3PTM", "PTS", "REB", "AST", "STL", "BLK", "TO"]
+
+
+@timed("valuation.nine_cat_values")
+def nine_cat_values(aggregates, window, min_games=1):
+    """
+    Scores every player in `aggregates` (from compute_window_aggregates) for one
+    window with 9-cat z-scores, in a single batch of NumPy operations.
+
+    Counting stats use per-game averages. FG% and FT% are impact-weighted: a
+    player's (pct - pool pct) * attempts per game, so volume shooters move the
+    needle more than someone going 1-for-1. TO is negated. The pool is every
+    player with at least `min_games` games in the window.
+
+    Returns one row per player with GP, per-game stats, the z-score per
+    category (`z_<cat>`) and their sum as `Value`, sorted by Value.
+    """
+    per_game = aggregates.xs((window, "Average"), level=["window", "mode"])
+    totals = aggregates.xs((window, "Total"), level=["window", "mode"])
+    pool = per_game["GP"].to_numpy() >= min_games
+    per_game, totals = per_game[pool], totals[pool]
+
+    # players x categories, in CATEGORIES order
+    impact = np.empty((len(per_game), len(CATEGORIES)))
+    for j, category in enumerate(CATEGORIES):
+        if category in PERCENT_CATEGORIES:
+            made, attempted = PERCENT_CATEGORIES[category]
+            pool_pct = totals[made].sum() / totals[attempted].sum() if totals[attempted].sum() else 0.0
+            impact[:, j] = per_game[made].to_numpy() - pool_pct * per_game[attempted].to_numpy()
+        else:
+            impact[:, j] = per_game[COUNTING_CATEGORIES[category]].to_numpy()
+
+    std = impact.std(axis=0)
+    z = (impact - impact.mean(axis=0)) / np.where(std > 0, std, 1.0)
+    z[:, [CATEGORIES.index(cat) for cat in NEGATIVE_CATEGORIES]] *= -1
+
+    result = pd.DataFrame({"GP": per_game["GP"].to_numpy()}, index=per_game.index)
+    for category in CATEGORIES:
+        if category in PERCENT_CATEGORIES:
+            made, attempted = PERCENT_CATEGORIES[category]
+            result[category] = per_game[category.replace("%", "_PCT")].to_numpy()
+            result[attempted] = per_game[attempted].to_numpy()
+        else:
+            result[category] = per_game[COUNTING_CATEGORIES[category]].to_numpy()
+    for j, category in enumerate(CATEGORIES):
+        result["z_" + category] = z[:, j]
+    result["Value"] = z.sum(axis=1)
+    result["Rank"] = result["Value"].rank(ascending=False, method="min").astype(int)
+    return result.sort_values("Value", ascending=False)
+
+
+def screen_players(values, names=None, name_contains="", min_value=None, punt=(), sort_by="Value", ascending=False):
+    """
+    Filters and sorts a nine_cat_values table. `punt` drops categories from
+    Value (re-summing the remaining z-scores) without recomputing anything.
+    """
+    df = values.copy()
+    if names is not None:
+        df.insert(0, "Player", df.index.map(names))
+    if punt:
+        df["Value"] = df[["z_" + cat for cat in CATEGORIES if cat not in punt]].sum(axis=1)
+        df["Rank"] = df["Value"].rank(ascending=False, method="min").astype(int)
+    if name_contains and "Player" in df:
+        df = df[df["Player"].str.contains(name_contains, case=False, na=False)]
+    if min_value is not None:
+        df = df[df["Value"] >= min_value]
+    return df.sort_values(sort_by, ascending=ascending)